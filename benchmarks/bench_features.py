@@ -0,0 +1,153 @@
+"""
+Benchmark: gateway traffic and CPU per feature profile
+
+Replays the same busy-guild traffic (chat messages, typing, voice joins and
+leaves, role updates) against a bot built with each feature profile, and
+against the intents the bot requested before feature profiles existed
+(the defaults plus members and message content). The simulator drops
+events whose intent the bot didn't request, like the gateway does, so the
+report shows how many events each profile receives and the CPU time spent
+parsing and handling them. Payloads are built before the clock starts,
+and each profile's best of --repeat runs is reported.
+
+Usage:
+    python benchmarks/bench_features.py [--events 200000] [--members 5000] [--rate 1000]
+"""
+import argparse
+import asyncio
+import gc
+import os
+import random
+import sys
+import tempfile
+import time
+import discord
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.simulator import FakeDiscord  # noqa: E402
+from main import register_handlers  # noqa: E402
+from src.bot import create_bot  # noqa: E402
+from src.features import FeatureProfile  # noqa: E402
+
+PROFILES = {
+    'before': FeatureProfile(prefix_commands=True, voice=True),
+    'full': FeatureProfile(prefix_commands=True, voice=True),
+    'no-voice': FeatureProfile(prefix_commands=True, voice=False),
+    'no-prefix': FeatureProfile(prefix_commands=False, voice=True),
+    'minimal': FeatureProfile(prefix_commands=False, voice=False)
+}
+
+# Share of each event in the traffic of a busy guild
+TRAFFIC_MIX = (
+    ('message', 0.55),
+    ('typing', 0.30),
+    ('voice', 0.13),
+    ('role_update', 0.02)
+)
+
+
+def legacy_intents():
+    """The intents AutoKickBot requested before feature profiles"""
+    intents = discord.Intents.default()
+    intents.members = True
+    intents.message_content = True
+    intents.voice_states = True
+    return intents
+
+
+def record_traffic(fake, guild_id, event_count, seed):
+    """Build the traffic's raw gateway events without dispatching them"""
+    recorded = []
+    fake.dispatch = lambda event, payload: recorded.append((event, payload))
+    
+    rng = random.Random(seed)
+    kinds, weights = zip(*TRAFFIC_MIX)
+    member_ids = [member_id for member_id in fake.guilds[guild_id]['roles'] if member_id != fake.bot.user.id]
+    channel_id = fake.guilds[guild_id]['log_channel_id']
+    in_voice = set()
+    for kind in rng.choices(kinds, weights=weights, k=event_count):
+        member_id = rng.choice(member_ids)
+        if kind == 'message':
+            fake.message_create(guild_id, channel_id, member_id, "hello there, anyone around?")
+        elif kind == 'typing':
+            fake.typing_start(guild_id, channel_id, member_id)
+        elif kind == 'voice':
+            joined = member_id not in in_voice
+            in_voice.symmetric_difference_update((member_id,))
+            fake.voice_state_update(guild_id, member_id, channel_id if joined else None)
+        else:
+            fake.toggle_unverified(guild_id, member_id)
+    
+    del fake.dispatch
+    return recorded
+
+
+async def measure(profile, event_count, member_count, seed):
+    bot = create_bot(features=PROFILES[profile])
+    if profile == 'before':
+        bot._connection._intents = legacy_intents()
+    register_handlers(bot)
+    # Only the handlers are needed, the ready handler would scan the guild
+    bot.extra_events.pop('on_ready', None)
+    fake = FakeDiscord(bot)
+    await fake.connect()
+    guild = fake.create_guild(0, member_count, 0.0)
+    fake.ready()
+    traffic = record_traffic(fake, guild.id, event_count, seed)
+    gc.collect()
+    
+    cpu_started = time.process_time()
+    for n, (event, payload) in enumerate(traffic):
+        fake.dispatch(event, payload)
+        if n % 100 == 0:
+            # Let the scheduled event handlers run
+            await asyncio.sleep(0)
+    await asyncio.sleep(0)
+    cpu = time.process_time() - cpu_started
+    
+    await bot.close()
+    return {
+        'profile': profile,
+        'intents': bot.intents.value,
+        'delivered': fake.stats['gateway_events'],
+        'filtered': fake.stats['gateway_events_filtered'],
+        'cpu_seconds': cpu
+    }
+
+
+async def run(args):
+    best = {}
+    for _ in range(args.repeat):
+        for profile in PROFILES:
+            result = await measure(profile, args.events, args.members, args.seed)
+            if profile not in best or result['cpu_seconds'] < best[profile]['cpu_seconds']:
+                best[profile] = result
+    
+    baseline = best['before']
+    print(f"{args.events:,} gateway events offered ({args.rate:,}/s), {args.members:,} members")
+    for result in best.values():
+        share = result['delivered'] / args.events
+        print(
+            f"  {result['profile']:<10} intents={result['intents']:<9} "
+            f"delivered {result['delivered']:>8,} ({share:6.1%}, {share * args.rate:7,.0f} events/s)  "
+            f"CPU {result['cpu_seconds']:6.2f}s ({result['cpu_seconds'] / baseline['cpu_seconds']:6.1%} of before)"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--events', type=int, default=200_000, help="Gateway events offered per profile")
+    parser.add_argument('--members', type=int, default=5000)
+    parser.add_argument('--rate', type=int, default=1000, help="Offered gateway events per second, for the rate column")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+    
+    # The bot writes its data files to the working directory
+    os.chdir(tempfile.mkdtemp(prefix='strix-bench-'))
+    asyncio.run(run(args))
+
+
+if __name__ == '__main__':
+    main()
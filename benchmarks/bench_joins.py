@@ -0,0 +1,91 @@
+"""
+Benchmark: join storm throughput and memory
+
+Sends a raid of GUILD_MEMBER_ADD events (every new member gets the
+Unverified role) through benchmarks/simulator.py and measures:
+
+    ingest   how fast the handlers take the joins off the gateway
+    pending  asyncio tasks and RSS growth while the joins wait for their
+             role check
+    applied  time until every join is tracked, CPU used, and the saves
+
+Usage:
+    python benchmarks/bench_joins.py [--joins 20000] [--guilds 1]
+"""
+import argparse
+import asyncio
+import gc
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.simulator import FakeDiscord  # noqa: E402
+from src.bot import create_bot  # noqa: E402
+from src.events import setup_member_events  # noqa: E402
+
+
+def current_rss_mb():
+    with open('/proc/self/statm') as f:
+        return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+
+
+async def run(args):
+    bot = create_bot()
+    setup_member_events(bot)
+    fake = FakeDiscord(bot)
+    await fake.connect()
+    bot.persistence.start()
+    guilds = [fake.create_guild(index, args.members, 0.0) for index in range(args.guilds)]
+    fake.ready()
+    gc.collect()
+    
+    rss_before = current_rss_mb()
+    tasks_before = len(asyncio.all_tasks())
+    cpu_started = time.process_time()
+    started = time.perf_counter()
+    for n in range(args.joins):
+        fake.member_join(guilds[n % len(guilds)].id)
+        if n % 500 == 0:
+            await asyncio.sleep(0)
+    await asyncio.sleep(0)
+    ingest_s = time.perf_counter() - started
+    pending_tasks = len(asyncio.all_tasks()) - tasks_before
+    rss_pending = current_rss_mb()
+    
+    deadline = time.monotonic() + 60
+    while bot.unverified_members.total_members() < args.joins and time.monotonic() < deadline:
+        await asyncio.sleep(0.01)
+    applied_s = time.perf_counter() - started
+    cpu = time.process_time() - cpu_started
+    tracked = bot.unverified_members.total_members()
+    await bot.close()  # Writes what is still pending
+    
+    print(f"{args.joins:,} joins into {args.guilds} guild(s) of {args.members:,} members")
+    print(f"  ingest   {ingest_s:.3f}s ({args.joins / ingest_s:,.0f} joins/s)")
+    print(
+        f"  pending  {pending_tasks:,} task(s), RSS +{rss_pending - rss_before:.1f} MB "
+        f"({(rss_pending - rss_before) * 1024 * 1024 / args.joins:,.0f} bytes/join)"
+    )
+    print(
+        f"  applied  {tracked:,} tracked after {applied_s:.2f}s, CPU {cpu:.2f}s, "
+        f"{bot.metrics.save_duration.count} save(s)"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--joins', type=int, default=20_000)
+    parser.add_argument('--guilds', type=int, default=1)
+    parser.add_argument('--members', type=int, default=1000, help="Members per guild before the raid")
+    args = parser.parse_args()
+    
+    # The bot writes its data files to the working directory
+    os.chdir(tempfile.mkdtemp(prefix='strix-bench-'))
+    asyncio.run(run(args))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+"""
+Benchmark: steady-state write amplification per storage backend
+
+Loads a tracked-member state, then applies windows of track/untrack
+events spread over the guilds, flushing the persistence engine after
+each window as its debounce timer would. Reports bytes written per event
+(journal compactions included), flush time and the time to load the
+state again at startup (snapshot + journal replay for the journal).
+
+Usage:
+    python benchmarks/bench_journal.py [--guilds 10] [--members 20000] [--windows 50] [--events 200]
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.bot import create_bot  # noqa: E402
+from src.storage import create_storage_backend  # noqa: E402
+from src.utils import DataManager  # noqa: E402
+
+BACKENDS = ('json', 'sqlite', 'journal')
+
+
+async def measure(backend_name, args):
+    os.chdir(tempfile.mkdtemp(prefix='strix-bench-'))
+    DataManager.use_backend(create_storage_backend(backend_name))
+    bot = create_bot()
+    bot.persistence.start()
+    
+    rng = random.Random(args.seed)
+    guild_ids = [(index + 1) << 22 for index in range(args.guilds)]
+    now = time.time()
+    for guild_id in guild_ids:
+        bot.unverified_members[guild_id] = {member_id: now for member_id in range(1, args.members + 1)}
+    bot.save_data()
+    await bot.persistence.flush()
+    
+    metrics = bot.metrics
+    bytes_before = metrics.save_bytes.value
+    flush_seconds = 0.0
+    next_member = args.members + 1
+    for _ in range(args.windows):
+        for _ in range(args.events):
+            guild_id = rng.choice(guild_ids)
+            if rng.random() < 0.5:
+                bot.track_member(guild_id, next_member)
+                next_member += 1
+            else:
+                table = bot.unverified_members[guild_id]
+                bot.untrack_member(guild_id, table.items_by_time(0, 1)[0][0])
+            bot.save_data(guild_id)
+        started = time.perf_counter()
+        await bot.persistence.flush()
+        flush_seconds += time.perf_counter() - started
+    await bot.persistence.close()
+    expected = bot.unverified_members.total_members()
+    written = metrics.save_bytes.value - bytes_before
+    compactions = metrics.journal_compactions.value
+    DataManager.close()
+    
+    started = time.perf_counter()
+    DataManager.use_backend(create_storage_backend(backend_name))
+    members, _, _ = DataManager.load_data()
+    load_seconds = time.perf_counter() - started
+    DataManager.close()
+    assert sum(map(len, members.values())) == expected, "reloaded state differs"
+    
+    events = args.windows * args.events
+    return {
+        'backend': backend_name,
+        'bytes_per_event': written / events,
+        'flush_ms': flush_seconds / args.windows * 1000,
+        'compactions': compactions,
+        'load_seconds': load_seconds
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--guilds', type=int, default=10)
+    parser.add_argument('--members', type=int, default=20_000, help="Tracked members per guild")
+    parser.add_argument('--windows', type=int, default=50, help="Flushes")
+    parser.add_argument('--events', type=int, default=200, help="Track/untrack events per flush")
+    parser.add_argument('--backend', choices=BACKENDS, action='append', help="Backend(s) to run (default: all)")
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+    
+    print(
+        f"{args.guilds * args.members:,} tracked members in {args.guilds} guild(s), "
+        f"{args.windows} flushes of {args.events} events"
+    )
+    for backend_name in args.backend or BACKENDS:
+        result = asyncio.run(measure(backend_name, args))
+        print(
+            f"  {result['backend']:<8} {result['bytes_per_event']:>10,.1f} bytes/event  "
+            f"flush {result['flush_ms']:7.1f}ms  {result['compactions']} compaction(s)  "
+            f"load {result['load_seconds']:.2f}s"
+        )
+
+
+if __name__ == '__main__':
+    main()
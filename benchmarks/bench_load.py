@@ -0,0 +1,331 @@
+"""
+Load test: the whole bot against an offline fake gateway and REST API
+
+Drives create_bot(), setup_member_events(), setup_background_tasks() (via
+setup_hook) and scan_existing_members() against benchmarks/simulator.py, in
+four phases:
+
+    scan     startup scan of synthetic guilds
+    updates  storm of GUILD_MEMBER_UPDATE events toggling the Unverified role
+    joins    storm of GUILD_MEMBER_ADD events with the Unverified role
+    sweep    a share of the tracked members is made overdue and kicked,
+             with REST rate limits returning 429s
+
+Reports throughput, p50/p99 handler latency, sweep time, memory and
+persistence I/O. Runs in a temporary directory, no network access needed.
+With --low-memory the bot caches only unverified members and the guilds'
+members are delivered through chunk requests instead of GUILD_CREATE.
+
+Usage:
+    python benchmarks/bench_load.py [--guilds 20] [--members 2000] [--json results.json]
+    python benchmarks/bench_load.py --baseline results.json  # exit 1 on regressions
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import resource
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.simulator import FakeDiscord  # noqa: E402
+from src.bot import create_bot  # noqa: E402
+from src.commands import register_prefix_commands, register_slash_commands, register_voice_commands  # noqa: E402
+from src.events import setup_member_events, setup_role_events  # noqa: E402
+from src.storage import create_storage_backend  # noqa: E402
+from src.tasks import scan_existing_members  # noqa: E402
+from src.utils import DataManager, KickExecutor  # noqa: E402
+from src.utils.structured_logging import setup_logging, shutdown_logging  # noqa: E402
+
+
+def rss_mb():
+    """Peak resident set size of this process in MB"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def histogram_quantile(child, quantile):
+    """Estimate a quantile from a histogram child by interpolating within its bucket"""
+    if child.count == 0:
+        return 0.0
+    rank = quantile * child.count
+    cumulative = 0
+    lower = 0.0
+    for bound, bucket_count in zip(child.buckets + (float('inf'),), child.counts):
+        if cumulative + bucket_count >= rank:
+            if bound == float('inf'):
+                return lower
+            return lower + (bound - lower) * (rank - cumulative) / bucket_count
+        cumulative += bucket_count
+        lower = bound
+    return lower
+
+
+def latency_summary(child):
+    return {
+        'count': child.count,
+        'p50_ms': round(histogram_quantile(child, 0.5) * 1000, 3),
+        'p99_ms': round(histogram_quantile(child, 0.99) * 1000, 3),
+        'mean_ms': round(child.sum / child.count * 1000, 3) if child.count else 0.0
+    }
+
+
+async def wait_for(predicate, timeout):
+    """Poll until predicate() holds, returns False on timeout"""
+    deadline = time.perf_counter() + timeout
+    while not predicate():
+        if time.perf_counter() > deadline:
+            return False
+        await asyncio.sleep(0.01)
+    return True
+
+
+async def run(args):
+    results = {'config': vars(args).copy()}
+    
+    DataManager.use_backend(create_storage_backend(args.storage))
+    bot = create_bot(low_memory=args.low_memory)
+    setup_member_events(bot)
+    setup_role_events(bot)
+    register_slash_commands(bot)
+    register_prefix_commands(bot)
+    register_voice_commands(bot)
+    bot.kick_executor = KickExecutor(bucket_size=args.kick_bucket_size, bucket_seconds=args.kick_bucket_seconds)
+    
+    fake = FakeDiscord(
+        bot,
+        rate_limit=args.rest_limit,
+        rate_window=args.rest_window,
+        global_limit=args.global_limit,
+        latency=args.rest_latency_ms / 1000
+    )
+    await fake.connect()
+    
+    started = time.perf_counter()
+    guilds = [
+        fake.create_guild(index, args.members, args.unverified_share, members_in_payload=not args.low_memory)
+        for index in range(args.guilds)
+    ]
+    results['load_guilds_s'] = round(time.perf_counter() - started, 3)
+    
+    await bot.setup_hook()
+    fake.ready()
+    for guild in guilds:
+        bot.update_guild_config(guild.id, log_channel_id=fake.guilds[guild.id]['log_channel_id'])
+    
+    # Phase 1: startup scan
+    started = time.perf_counter()
+    await scan_existing_members(bot)
+    scan_s = time.perf_counter() - started
+    tracked = bot.unverified_members.total_members()
+    results['scan'] = {
+        'seconds': round(scan_s, 3),
+        'members_tracked': tracked,
+        'members_per_s': round(tracked / scan_s) if scan_s else None
+    }
+    
+    # Phase 2: role update storm, round-robin over guilds and members
+    update_latency = bot.metrics.member_update_latency
+    expected = update_latency.count + args.updates
+    member_lists = [list(fake.guilds[guild.id]['roles'])[1:] for guild in guilds]
+    started = time.perf_counter()
+    for n in range(args.updates):
+        index = n % len(guilds)
+        members = member_lists[index]
+        fake.toggle_unverified(guilds[index].id, members[(n // len(guilds)) % len(members)])
+        if n % 500 == 0:
+            await asyncio.sleep(0)
+    await wait_for(lambda: update_latency.count >= expected, 60)
+    updates_s = time.perf_counter() - started
+    results['updates'] = dict(
+        latency_summary(update_latency),
+        seconds=round(updates_s, 3),
+        events_per_s=round(args.updates / updates_s) if updates_s else None
+    )
+    
+    # Phase 3: join storm (roles are checked in batches once the join delay passed)
+    join_latency = bot.metrics.member_join_latency
+    expected = join_latency.count + args.joins
+    started = time.perf_counter()
+    for n in range(args.joins):
+        fake.member_join(guilds[n % len(guilds)].id)
+        if n % 500 == 0:
+            await asyncio.sleep(0)
+    ingest_s = time.perf_counter() - started
+    await wait_for(lambda: join_latency.count >= expected, 60)
+    results['joins'] = dict(
+        latency_summary(join_latency),
+        ingest_seconds=round(ingest_s, 3),
+        events_per_s=round(args.joins / ingest_s) if ingest_s else None
+    )
+    
+    # Phase 4: make a share of the tracked members overdue and let the sweep kick them
+    overdue_at = time.time() - 1
+    overdue = 0
+    for guild in guilds:
+        table = bot.unverified_members.get(guild.id, {})
+        kick_after = bot.get_guild_config(guild.id).kick_after_minutes * 60
+        member_ids = list(table)
+        for member_id in member_ids[:int(len(member_ids) * args.overdue_share)]:
+            bot.track_member(guild.id, member_id, overdue_at - kick_after)
+            overdue += 1
+    
+    metrics = bot.metrics
+    kick_results = (metrics.kicks_succeeded, metrics.kicks_forbidden, metrics.kicks_not_found, metrics.kicks_failed)
+    started = time.perf_counter()
+    finished = await wait_for(lambda: sum(child.value for child in kick_results) >= overdue, args.timeout)
+    sweep_s = time.perf_counter() - started
+    await bot.kick_log.close()
+    results['sweep'] = {
+        'overdue': overdue,
+        'completed': finished,
+        'seconds_to_drain': round(sweep_s, 3),
+        'sweep_seconds': round(metrics.sweep_duration.sum, 3),
+        'kicks_per_s': round(metrics.kicks_succeeded.value / sweep_s) if sweep_s else None,
+        'kicked': metrics.kicks_succeeded.value,
+        'kick_attempts': metrics.kick_attempts.value,
+        'per_member': latency_summary(metrics.member_latency)
+    }
+    
+    # Persistence
+    await bot.persistence.flush()
+    results['persistence'] = {
+        'backend': args.storage,
+        'saves': metrics.save_duration.count,
+        'bytes_written': metrics.save_bytes.value,
+        'save_seconds': round(metrics.save_duration.sum, 3)
+    }
+    
+    results['rest'] = dict(fake.stats, bot_counted_429s=metrics.rate_limited.value)
+    results['memory'] = {
+        'peak_rss_mb': round(rss_mb(), 1),
+        'tracked_store_bytes': bot.unverified_members.nbytes,
+        'cached_members': sum(len(guild.members) for guild in guilds),
+        'scheduled_deadlines': len(bot.scheduler)
+    }
+    
+    await bot.close()
+    return results
+
+
+def print_report(results):
+    scan, updates, joins, sweep = results['scan'], results['updates'], results['joins'], results['sweep']
+    print(f"Guilds loaded in {results['load_guilds_s']}s")
+    print(f"Scan:     {scan['members_tracked']:,} tracked in {scan['seconds']}s ({scan['members_per_s']:,}/s)")
+    print(
+        f"Updates:  {updates['count']:,} handled, {updates['events_per_s']:,} events/s, "
+        f"p50 {updates['p50_ms']}ms, p99 {updates['p99_ms']}ms"
+    )
+    print(
+        f"Joins:    {joins['count']:,} handled, ingested at {joins['events_per_s']:,} events/s, "
+        f"p50 {joins['p50_ms']}ms, p99 {joins['p99_ms']}ms"
+    )
+    print(
+        f"Sweep:    {sweep['kicked']:,}/{sweep['overdue']:,} kicked in {sweep['seconds_to_drain']}s "
+        f"({sweep['kicks_per_s']}/s), sweep time {sweep['sweep_seconds']}s, "
+        f"per member p50 {sweep['per_member']['p50_ms']}ms p99 {sweep['per_member']['p99_ms']}ms"
+        + ("" if sweep['completed'] else " (TIMED OUT)")
+    )
+    rest = results['rest']
+    print(
+        f"REST:     {rest['requests']:,} requests, {rest['rate_limited']:,} 429s ({rest['global_rate_limited']:,} global) "
+        f"({rest['bot_counted_429s']:,} counted by the bot), {rest['messages']:,} log messages / {rest['embeds']:,} embeds"
+    )
+    persistence = results['persistence']
+    print(
+        f"Storage:  {persistence['saves']} save(s), {persistence['bytes_written']:,} bytes "
+        f"in {persistence['save_seconds']}s ({persistence['backend']})"
+    )
+    memory = results['memory']
+    print(
+        f"Memory:   peak RSS {memory['peak_rss_mb']} MB, tracked store {memory['tracked_store_bytes']:,} bytes, "
+        f"{memory['cached_members']:,} cached members"
+    )
+
+
+# (section, key, True if higher is better) checked by --baseline
+REGRESSION_CHECKS = [
+    ('scan', 'members_per_s', True),
+    ('updates', 'events_per_s', True),
+    ('updates', 'p99_ms', False),
+    ('joins', 'events_per_s', True),
+    ('sweep', 'sweep_seconds', False),
+    ('persistence', 'bytes_written', False),
+]
+
+
+def find_regressions(results, baseline, tolerance):
+    """Compare against a previous --json run, returns a list of messages"""
+    regressions = []
+    for section, key, higher_is_better in REGRESSION_CHECKS:
+        old = baseline.get(section, {}).get(key)
+        new = results[section][key]
+        if not old or new is None:
+            continue
+        change = (new - old) / old
+        if (change < -tolerance) if higher_is_better else (change > tolerance):
+            regressions.append(f"{section}.{key}: {old} -> {new} ({change:+.0%})")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--guilds', type=int, default=20)
+    parser.add_argument('--members', type=int, default=2000, help="Members per guild")
+    parser.add_argument('--unverified-share', type=float, default=0.2)
+    parser.add_argument('--updates', type=int, default=20_000, help="GUILD_MEMBER_UPDATE events")
+    parser.add_argument('--joins', type=int, default=2_000, help="GUILD_MEMBER_ADD events")
+    parser.add_argument('--overdue-share', type=float, default=0.25, help="Share of tracked members made overdue")
+    parser.add_argument('--storage', default='json', choices=['json', 'sqlite', 'journal'])
+    parser.add_argument('--low-memory', action='store_true', help="Cache only unverified members")
+    parser.add_argument('--rest-limit', type=int, default=50, help="Requests per route bucket per window")
+    parser.add_argument('--rest-window', type=float, default=1.0)
+    parser.add_argument('--global-limit', type=int, default=500, help="Requests per second across all routes (Discord's is 50)")
+    parser.add_argument('--rest-latency-ms', type=float, default=2.0)
+    parser.add_argument('--kick-bucket-size', type=int, default=60, help="Client-side kick pacing per guild")
+    parser.add_argument('--kick-bucket-seconds', type=float, default=1.0)
+    parser.add_argument('--timeout', type=float, default=300, help="Max seconds to wait for the kicks")
+    parser.add_argument('--log-level', default='WARNING')
+    parser.add_argument('--log-file', help="Keep the bot's logs in this file")
+    parser.add_argument('--json', help="Also write the results to this file")
+    parser.add_argument('--baseline', help="Results of an earlier --json run, exit 1 on regressions")
+    parser.add_argument('--tolerance', type=float, default=0.25, help="Allowed relative change against the baseline")
+    args = parser.parse_args()
+    
+    json_path = os.path.abspath(args.json) if args.json else None
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    workdir = tempfile.mkdtemp(prefix='strix-bench-')
+    log_path = os.path.abspath(args.log_file) if args.log_file else os.path.join(workdir, 'bench.log')
+    os.chdir(workdir)
+    setup_logging(level=args.log_level, module_levels={}, stream=open(log_path, 'w'))
+    try:
+        results = asyncio.run(run(args))
+    finally:
+        shutdown_logging()
+        logging.getLogger().handlers.clear()
+        os.chdir('/')
+        shutil.rmtree(workdir, ignore_errors=True)
+    
+    print_report(results)
+    if json_path:
+        with open(json_path, 'w') as f:
+            json.dump(results, f, indent=2)
+    
+    if baseline is not None:
+        regressions = find_regressions(results, baseline, args.tolerance)
+        for message in regressions:
+            print(f"REGRESSION {message}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
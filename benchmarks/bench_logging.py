@@ -0,0 +1,121 @@
+"""
+Benchmark: event-loop stall during a 10k-member scan, print() vs structured logging
+
+A heartbeat task measures how late the loop wakes it up while a simulated
+startup scan walks the members, yielding every SCAN_YIELD_EVERY members like
+the real one. Variants:
+
+    print               one synchronous print() per member (the old output)
+    logging (default)   structured logging, per-member lines at DEBUG (off)
+    logging (DEBUG)     structured logging with per-member lines enabled
+
+Output goes to --output (a temporary file by default, '-' for the terminal).
+
+Usage:
+    python benchmarks/bench_logging.py [--members 10000] [--output -]
+"""
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.config import SCAN_YIELD_EVERY  # noqa: E402
+from src.utils.structured_logging import setup_logging, shutdown_logging  # noqa: E402
+
+
+log = logging.getLogger('src.tasks')
+
+
+class FakeMember:
+    __slots__ = ('id', 'name')
+    
+    def __init__(self, member_id):
+        self.id = member_id
+        self.name = f"user{member_id}"
+
+
+def scan_with_print(members, tracked, stream):
+    for member in members:
+        original_time = datetime.fromtimestamp(tracked[member.id])
+        print(f"[Benchmark Guild] 🔄 Already tracking {member.name} (since {original_time.strftime('%H:%M:%S')})", file=stream)
+        yield
+
+
+def scan_with_logging(members, tracked, stream):
+    debug = log.isEnabledFor(logging.DEBUG)
+    for member in members:
+        if debug:
+            log.debug("Already tracking %s", member.id, extra={'guild_id': 1})
+        yield
+
+
+async def run_scan(scan, members, tracked, stream):
+    """Run one scan next to a heartbeat, returns (scan ms, max stall ms)"""
+    stalls = []
+    done = False
+    
+    async def heartbeat():
+        while not done:
+            expected = time.perf_counter() + 0.001
+            await asyncio.sleep(0.001)
+            stalls.append(max(0.0, time.perf_counter() - expected) * 1000)
+    
+    ticker = asyncio.create_task(heartbeat())
+    await asyncio.sleep(0.01)
+    
+    started = time.perf_counter()
+    for index, _ in enumerate(scan(members, tracked, stream), 1):
+        if index % SCAN_YIELD_EVERY == 0:
+            await asyncio.sleep(0)
+    scan_ms = (time.perf_counter() - started) * 1000
+    
+    await asyncio.sleep(0.01)
+    done = True
+    await ticker
+    
+    return scan_ms, max(stalls)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--members', type=int, default=10_000)
+    parser.add_argument('--output', default=None, help="File to write log lines to, '-' for stdout")
+    args = parser.parse_args()
+    
+    members = [FakeMember(100_000_000_000_000_000 + i) for i in range(args.members)]
+    now = time.time()
+    tracked = {member.id: now for member in members}
+    
+    if args.output == '-':
+        stream = sys.stdout
+    else:
+        stream = open(args.output or tempfile.mktemp(suffix='.log'), 'w')
+    
+    results = {}
+    results['print'] = asyncio.run(run_scan(scan_with_print, members, tracked, stream))
+    
+    setup_logging(module_levels={}, stream=stream)
+    results['logging (default)'] = asyncio.run(run_scan(scan_with_logging, members, tracked, stream))
+    
+    setup_logging(module_levels={'src.tasks': 'DEBUG'}, stream=stream)
+    results['logging (DEBUG)'] = asyncio.run(run_scan(scan_with_logging, members, tracked, stream))
+    shutdown_logging()
+    
+    if stream is not sys.stdout:
+        stream.close()
+        os.unlink(stream.name)
+    
+    print(f"Event-loop stall during a {args.members:,}-member scan:")
+    print(f"  {'variant':<20} {'loop time':>10} {'max stall':>10}")
+    for name, (scan_ms, max_stall) in results.items():
+        print(f"  {name:<20} {scan_ms:8.1f}ms {max_stall:8.2f}ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+"""
+Benchmark: TrackedMemberStore vs the plain dict-of-dicts it replaced
+
+Usage:
+    python benchmarks/bench_member_store.py [--sizes 10000,1000000,10000000]
+"""
+import argparse
+import gc
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.storage.member_store import TrackedMemberStore  # noqa: E402
+
+
+MEMBERS_PER_GUILD = 10_000
+OPERATIONS = 100_000
+
+
+def build_entries(size, rng):
+    """{guild_id: {member_id: timestamp}} with snowflake-sized IDs"""
+    entries = {}
+    now = time.time()
+    for i in range(size):
+        guild_id = 10**17 + i // MEMBERS_PER_GUILD
+        member_id = rng.randrange(10**17, 10**18)
+        entries.setdefault(guild_id, {})[member_id] = now - rng.random() * 86400
+    return entries
+
+
+def measure_memory(factory):
+    """Return (object, bytes allocated while building it)"""
+    gc.collect()
+    tracemalloc.start()
+    obj = factory()
+    current, _peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return obj, current
+
+
+def ops_per_second(func, count):
+    started = time.perf_counter()
+    func()
+    return count / (time.perf_counter() - started)
+
+
+def run_operations(store, entries, rng, due_query):
+    """Time lookups, inserts, removals and 'due before' queries"""
+    guild_ids = list(entries)
+    keys = [(g, m) for g in guild_ids for m in list(entries[g])[:OPERATIONS // len(guild_ids) + 1]][:OPERATIONS]
+    new_keys = [(rng.choice(guild_ids), rng.randrange(10**17, 10**18)) for _ in range(OPERATIONS)]
+    cutoff = time.time() - 43200
+    
+    def lookups():
+        for guild_id, member_id in keys:
+            store[guild_id].get(member_id)
+    
+    def inserts():
+        for guild_id, member_id in new_keys:
+            store[guild_id][member_id] = cutoff
+    
+    def removals():
+        for guild_id, member_id in new_keys:
+            del store[guild_id][member_id]
+    
+    def due():
+        for guild_id in guild_ids:
+            due_query(store[guild_id], cutoff)
+    
+    return {
+        'lookup/s': ops_per_second(lookups, len(keys)),
+        'insert/s': ops_per_second(inserts, len(new_keys)),
+        'remove/s': ops_per_second(removals, len(new_keys)),
+        'due query/s (per guild)': ops_per_second(due, len(guild_ids)),
+    }
+
+
+def dict_due(members, cutoff):
+    return [(member_id, stamp) for member_id, stamp in members.items() if stamp <= cutoff]
+
+
+def table_due(table, cutoff):
+    return table.due_before(cutoff)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', default='10000,1000000,10000000', help='Comma separated entry counts')
+    args = parser.parse_args()
+    
+    for size in (int(value) for value in args.sizes.split(',')):
+        # Build each store from fresh objects so shared ints/floats are counted
+        dict_store, dict_bytes = measure_memory(lambda: build_entries(size, random.Random(size)))
+        compact_store, compact_bytes = measure_memory(lambda: TrackedMemberStore(build_entries(size, random.Random(size))))
+        entries = dict_store
+        
+        print(f"\n=== {size:,} entries ({len(entries):,} guilds) ===")
+        print(f"memory   dict-of-dicts: {dict_bytes / size:6.1f} B/entry ({dict_bytes / 2**20:,.1f} MiB)")
+        print(f"memory   compact store: {compact_bytes / size:6.1f} B/entry ({compact_bytes / 2**20:,.1f} MiB)")
+        
+        dict_ops = run_operations(dict_store, {g: dict(m) for g, m in entries.items()}, random.Random(1), dict_due)
+        compact_ops = run_operations(compact_store, entries, random.Random(1), table_due)
+        for name in dict_ops:
+            print(f"{name:<24} dict {dict_ops[name]:>14,.0f}   compact {compact_ops[name]:>14,.0f}")
+        
+        del dict_store, compact_store, entries
+        gc.collect()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,117 @@
+"""
+Benchmark: resident memory of the member cache, full vs. low-memory mode
+
+Each mode runs in a fresh process against benchmarks/simulator.py. The
+guilds are created like large guilds (only the bot's member in
+GUILD_CREATE), then members arrive through chunk requests:
+
+    full        every guild is chunked into the cache, as at startup,
+                then the startup scan runs
+    low-memory  the startup scan chunks each guild, keeping only the
+                holders of the Unverified role (LOW_MEMORY_MODE)
+
+RSS is read after the simulator's own server-side state is built, and
+again after the scan, so the difference is what the bot keeps.
+
+Usage:
+    python benchmarks/bench_memory.py [--members 1000000] [--guilds 10] [--unverified-share 0.01]
+"""
+import argparse
+import asyncio
+import gc
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.simulator import FakeDiscord  # noqa: E402
+from src.bot import create_bot  # noqa: E402
+from src.events import setup_member_events  # noqa: E402
+from src.tasks import scan_existing_members  # noqa: E402
+
+MODES = ('full', 'low-memory')
+
+
+def current_rss_mb():
+    with open('/proc/self/statm') as f:
+        return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+
+
+def peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+async def measure(mode, members, guild_count, unverified_share):
+    low_memory = mode == 'low-memory'
+    bot = create_bot(low_memory=low_memory)
+    setup_member_events(bot)
+    fake = FakeDiscord(bot)
+    await fake.connect()
+    
+    guilds = [
+        fake.create_guild(index, members // guild_count, unverified_share, log_channel=False, members_in_payload=False)
+        for index in range(guild_count)
+    ]
+    fake.ready()
+    gc.collect()
+    before = current_rss_mb()
+    
+    started = time.perf_counter()
+    if not low_memory:
+        # What chunk_guilds_at_startup does before on_ready
+        await asyncio.gather(*(guild.chunk() for guild in guilds))
+    await scan_existing_members(bot)
+    elapsed = time.perf_counter() - started
+    gc.collect()
+    
+    return {
+        'mode': mode,
+        'members': sum(len(fake.guilds[guild.id]['roles']) for guild in guilds),
+        'cached_members': sum(len(guild.members) for guild in guilds),
+        'tracked': bot.unverified_members.total_members(),
+        'load_seconds': round(elapsed, 2),
+        'rss_before_mb': round(before, 1),
+        'rss_after_mb': round(current_rss_mb(), 1),
+        'peak_rss_mb': round(peak_rss_mb(), 1)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--members', type=int, default=1_000_000, help="Members across all guilds")
+    parser.add_argument('--guilds', type=int, default=10)
+    parser.add_argument('--unverified-share', type=float, default=0.01)
+    parser.add_argument('--mode', choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    
+    if args.mode:
+        # Child process: measure one mode and report as JSON
+        os.chdir(tempfile.mkdtemp(prefix='strix-bench-'))
+        result = asyncio.run(measure(args.mode, args.members, args.guilds, args.unverified_share))
+        print(json.dumps(result))
+        return
+    
+    print(f"{args.members:,} members in {args.guilds} guild(s), {args.unverified_share:.0%} unverified")
+    for mode in MODES:
+        output = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), '--mode', mode, '--members', str(args.members),
+             '--guilds', str(args.guilds), '--unverified-share', str(args.unverified_share)],
+            check=True, capture_output=True, text=True
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        print(
+            f"  {mode:<10}  {result['cached_members']:>9,} cached  {result['tracked']:>7,} tracked  "
+            f"RSS {result['rss_before_mb']:7.1f} -> {result['rss_after_mb']:7.1f} MB "
+            f"(+{result['rss_after_mb'] - result['rss_before_mb']:.1f}), peak {result['peak_rss_mb']:.1f} MB, "
+            f"loaded in {result['load_seconds']}s"
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+"""
+Benchmark: has_permission() latency for staff members with many roles
+
+Compares the original name-based check (build every role name of the
+member, then scan allowed_roles) with the cached role-ID set lookup.
+Members and guilds are lightweight stand-ins whose `roles` property does
+the same work as discord.Member.roles.
+
+Usage:
+    python benchmarks/bench_permissions.py [--guild-roles 500] [--calls 20000]
+"""
+import argparse
+import os
+import sys
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from discord.utils import SnowflakeList  # noqa: E402
+from src.storage import GuildConfig  # noqa: E402
+from src.utils import StaffRoleCache, has_permission  # noqa: E402
+
+
+class FakeGuild:
+    def __init__(self, role_count):
+        self.id = 1
+        self.roles = [SimpleNamespace(id=100 + i, name=f"role-{i}", position=i) for i in range(role_count)]
+        self._by_id = {role.id: role for role in self.roles}
+    
+    def get_role(self, role_id):
+        return self._by_id.get(role_id)
+
+
+class FakeMember:
+    """Non-admin member, `roles` builds and sorts Role objects like discord.Member.roles"""
+    
+    guild_permissions = SimpleNamespace(administrator=False)
+    
+    def __init__(self, guild, role_ids):
+        self.guild = guild
+        self._roles = SnowflakeList(role_ids)
+    
+    @property
+    def roles(self):
+        result = [self.guild.get_role(role_id) for role_id in self._roles]
+        result.sort(key=lambda role: role.position)
+        return result
+
+
+def original_has_permission(bot, ctx):
+    """The check as it was: role names of the member vs. allowed_roles"""
+    member = ctx.author
+    if member.guild_permissions.administrator:
+        return True
+    allowed_roles = bot.get_guild_config(ctx.guild.id).allowed_roles
+    user_role_names = [role.name for role in member.roles]
+    for role_name in allowed_roles:
+        if role_name in user_role_names:
+            return True
+    return False
+
+
+def per_call_us(calls, func):
+    started = time.perf_counter()
+    for _ in range(calls):
+        func()
+    return (time.perf_counter() - started) / calls * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--guild-roles', type=int, default=500)
+    parser.add_argument('--calls', type=int, default=20_000)
+    args = parser.parse_args()
+    
+    guild = FakeGuild(args.guild_roles)
+    # The staff role is the member's highest role, the worst case for the old scan
+    config = GuildConfig(allowed_roles=[f"role-{args.guild_roles - 1 - i}" for i in range(5)])
+    bot = SimpleNamespace(get_guild_config=lambda guild_id: config, staff_roles=StaffRoleCache())
+    
+    print(f"has_permission() per call, {args.guild_roles} guild roles, {len(config.allowed_roles)} staff roles:")
+    for member_roles in (5, 50, 200):
+        role_ids = [role.id for role in guild.roles[:member_roles - 1]] + [guild.roles[-1].id]
+        ctx = SimpleNamespace(author=FakeMember(guild, role_ids), guild=guild)
+        assert original_has_permission(bot, ctx) and has_permission(bot, ctx)
+        
+        original = per_call_us(args.calls, lambda: original_has_permission(bot, ctx))
+        cached = per_call_us(args.calls, lambda: has_permission(bot, ctx))
+        print(f"  {member_roles:>3} member roles   original {original:7.2f} us   cached {cached:6.2f} us   ({original / cached:5.1f}x)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,575 @@
+"""
+Offline stand-ins for the Discord gateway and REST API
+
+FakeDiscord keeps the server-side view of synthetic guilds and plugs into a
+real AutoKickBot without a network connection:
+
+- REST: discord.py's HTTPClient is given a fake aiohttp session, so every
+  request still goes through the library's own rate limit handling. The
+  fake answers with X-RateLimit-* headers and returns 429s (with
+  Retry-After) once a route bucket is exhausted.
+- Gateway: events are fed to the connection state's parsers as raw
+  payloads, exactly as the websocket would deliver them, and the bot's
+  event handlers run through the normal dispatch path.
+"""
+import asyncio
+import json
+import re
+import time
+from datetime import datetime, timezone
+import discord
+from multidict import CIMultiDict
+
+
+GUILD_BASE_ID = 100_000_000_000_000_000
+ROLE_BASE_ID = 200_000_000_000_000_000
+USER_BASE_ID = 300_000_000_000_000_000
+CHANNEL_BASE_ID = 400_000_000_000_000_000
+MESSAGE_BASE_ID = 500_000_000_000_000_000
+DM_CHANNEL_BASE_ID = 600_000_000_000_000_000
+APPLICATION_ID = 600_000_000_000_000_000
+BOT_USER_ID = APPLICATION_ID
+
+API_PREFIX = '/api/v10'
+
+KICK_ROUTE = re.compile(r'^/guilds/(\d+)/members/(\d+)$')
+MESSAGE_ROUTE = re.compile(r'^/channels/(\d+)/messages$')
+COMMANDS_ROUTE = re.compile(r'^/applications/(\d+)/commands$')
+DM_CHANNEL_ROUTE = '/users/@me/channels'
+
+# Intent a gateway event needs to be delivered, events not listed are always sent
+EVENT_INTENTS = {
+    'GUILD_MEMBER_ADD': 'members',
+    'GUILD_MEMBER_UPDATE': 'members',
+    'GUILD_MEMBER_REMOVE': 'members',
+    'MESSAGE_CREATE': 'guild_messages',
+    'TYPING_START': 'guild_typing',
+    'VOICE_STATE_UPDATE': 'voice_states'
+}
+
+BOT_PERMISSIONS = discord.Permissions(kick_members=True, send_messages=True, embed_links=True, view_channel=True)
+
+
+def _iso_now():
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _user_payload(user_id, bot=False):
+    return {
+        'id': str(user_id),
+        'username': f"user{user_id % 1_000_000}",
+        'discriminator': '0',
+        'global_name': None,
+        'avatar': None,
+        'bot': bot
+    }
+
+
+def _member_payload(user_id, roles, joined_at, bot=False):
+    return {
+        'user': _user_payload(user_id, bot=bot),
+        'roles': list(roles),
+        'joined_at': joined_at,
+        'deaf': False,
+        'mute': False,
+        'flags': 0
+    }
+
+
+def _role_payload(role_id, name, position, permissions=0):
+    return {
+        'id': str(role_id),
+        'name': name,
+        'color': 0,
+        'hoist': False,
+        'position': position,
+        'permissions': str(permissions),
+        'managed': False,
+        'mentionable': False,
+        'flags': 0
+    }
+
+
+class FakeResponse:
+    """The parts of aiohttp.ClientResponse discord.py's HTTPClient reads"""
+    
+    def __init__(self, status, headers, body, latency):
+        self.status = status
+        self.reason = {200: 'OK', 204: 'No Content', 404: 'Not Found', 429: 'Too Many Requests'}.get(status, 'Error')
+        self.headers = CIMultiDict(headers)
+        self._body = body
+        self._latency = latency
+    
+    async def text(self, encoding='utf-8'):
+        return self._body
+    
+    async def __aenter__(self):
+        if self._latency:
+            await asyncio.sleep(self._latency)
+        return self
+    
+    async def __aexit__(self, *exc_info):
+        return False
+
+
+class FakeSession:
+    """Replaces HTTPClient's aiohttp session, requests are answered by FakeDiscord"""
+    
+    def __init__(self, server):
+        self.server = server
+        self.closed = False
+    
+    def request(self, method, url, **kwargs):
+        status, headers, body = self.server.handle_request(method, url, kwargs)
+        return FakeResponse(status, headers, body, self.server.latency)
+    
+    async def close(self):
+        self.closed = True
+
+
+class FakeGatewaySocket:
+    """Stands in for DiscordWebSocket, only outgoing presence updates are needed"""
+    
+    def __init__(self, server):
+        self.server = server
+        self.open = True
+        self.latency = 0.0
+    
+    def is_ratelimited(self):
+        return False
+    
+    async def change_presence(self, *, activity=None, status=None, since=0.0):
+        self.server.stats['presence_updates'] += 1
+    
+    async def request_chunks(self, guild_id, query=None, *, limit, user_ids=None, presences=False, nonce=None):
+        self.server.request_member_chunks(guild_id, user_ids, nonce)
+    
+    async def close(self, code=1000):
+        self.open = False
+
+
+class FakeShard:
+    """Stands in for discord.shard.Shard, holding one fake socket"""
+    
+    def __init__(self, ws, shard_id=0):
+        self.id = shard_id
+        self.ws = ws
+    
+    async def close(self):
+        await self.ws.close()
+
+
+class RouteLimiter:
+    """Server-side fixed-window rate limit per route bucket"""
+    
+    def __init__(self, limit, window):
+        self.limit = limit
+        self.window = window
+        self._windows = {}  # {bucket_key: [remaining, reset_at]}
+    
+    def hit(self, bucket_key, now):
+        """Returns (allowed, remaining, reset_after)"""
+        state = self._windows.get(bucket_key)
+        if state is None or now >= state[1]:
+            state = self._windows[bucket_key] = [self.limit, now + self.window]
+        
+        if state[0] <= 0:
+            return False, 0, state[1] - now
+        state[0] -= 1
+        return True, state[0], state[1] - now
+
+
+class FakeDiscord:
+    """
+    Server-side state of the synthetic guilds plus the fake REST and gateway
+    
+    Args:
+        bot: The AutoKickBot to connect
+        rate_limit: Requests allowed per route bucket per window
+        rate_window: Rate limit window in seconds
+        global_limit: Requests per second across all routes (Discord's global limit)
+        latency: Simulated REST round trip in seconds
+        closed_dm_share: Fraction of users whose DMs are closed (403 on send)
+    """
+    
+    def __init__(self, bot, rate_limit=5, rate_window=5.0, global_limit=50, latency=0.0, closed_dm_share=0.0):
+        self.bot = bot
+        self.closed_dm_share = closed_dm_share
+        self.latency = latency
+        self.limiter = RouteLimiter(rate_limit, rate_window)
+        self.global_limiter = RouteLimiter(global_limit, 1.0)
+        self.guilds = {}  # {guild_id: {'roles': {member_id: (role_id,)}, 'unverified_role_id': ..., 'log_channel_id': ..., 'joined_at': ...}}
+        self.stats = {
+            'requests': 0,
+            'rate_limited': 0,
+            'global_rate_limited': 0,
+            'kicks': 0,
+            'unknown_members': 0,
+            'messages': 0,
+            'embeds': 0,
+            'dm_channels': 0,
+            'dms': 0,
+            'dms_refused': 0,
+            'presence_updates': 0,
+            'member_chunks': 0,
+            'gateway_events': 0,
+            'gateway_events_filtered': 0
+        }
+        self._next_user_id = USER_BASE_ID
+        self._chunk_tasks = set()
+        self._next_message_id = MESSAGE_BASE_ID
+    
+    # Connection
+    
+    async def connect(self):
+        """Attach the fake session and socket, as login() and connect() would"""
+        bot = self.bot
+        await bot._async_setup_hook()
+        bot.http._HTTPClient__session = FakeSession(self)
+        bot.http._global_over = asyncio.Event()
+        bot.http._global_over.set()
+        bot.http.token = 'offline'
+        # AutoShardedBot sends presence updates through each shard's socket
+        bot._AutoShardedClient__shards = {0: FakeShard(FakeGatewaySocket(self))}
+        if bot.shard_count is None:
+            bot.shard_count = 1
+        
+        state = bot._connection
+        state.application_id = APPLICATION_ID
+        state.user = discord.ClientUser(state=state, data=_user_payload(BOT_USER_ID, bot=True))
+    
+    def ready(self):
+        """Mark the bot ready once the initial guilds are loaded"""
+        self.bot._ready.set()
+    
+    # Synthetic data
+    
+    def create_guild(self, index, member_count, unverified_share, log_channel=True, members_in_payload=True):
+        """
+        Build a guild with an Unverified role and load it like GUILD_CREATE at startup
+        
+        With members_in_payload=False the GUILD_CREATE only holds the bot's
+        own member, as for a large guild, and the rest arrive through member
+        chunk requests. Returns the discord.Guild
+        """
+        guild_id = GUILD_BASE_ID + index
+        everyone = _role_payload(guild_id, '@everyone', 0)
+        unverified_role_id = ROLE_BASE_ID + index * 2
+        unverified = _role_payload(unverified_role_id, 'Unverified', 1)
+        bot_role = _role_payload(ROLE_BASE_ID + index * 2 + 1, 'Strix', 2, BOT_PERMISSIONS.value)
+        
+        log_channel_id = CHANNEL_BASE_ID + index if log_channel else None
+        channels = []
+        if log_channel_id:
+            channels.append({
+                'id': str(log_channel_id),
+                'type': 0,
+                'name': 'strix-logs',
+                'position': 0,
+                'permission_overwrites': [],
+                'guild_id': str(guild_id)
+            })
+        
+        joined_at = _iso_now()
+        # Server-side roles per user, tuples shared between members with the same roles
+        roles = {BOT_USER_ID: (bot_role['id'],)}
+        members = [_member_payload(BOT_USER_ID, roles[BOT_USER_ID], joined_at, bot=True)]
+        unverified_every = max(1, round(1 / unverified_share)) if unverified_share > 0 else 0
+        unverified_roles = (str(unverified_role_id),)
+        for n in range(member_count):
+            user_id = self._new_user_id()
+            member_roles = unverified_roles if unverified_every and n % unverified_every == 0 else ()
+            roles[user_id] = member_roles
+            if members_in_payload:
+                members.append(_member_payload(user_id, member_roles, joined_at))
+        
+        payload = {
+            'id': str(guild_id),
+            'name': f"Simulated Guild {index}",
+            'owner_id': str(USER_BASE_ID),
+            'roles': [everyone, unverified, bot_role],
+            'members': members,
+            'member_count': len(roles),
+            'channels': channels,
+            'emojis': [],
+            'stickers': [],
+            'features': [],
+            'large': len(roles) > 250,
+            'unavailable': False
+        }
+        
+        self.guilds[guild_id] = {
+            'roles': roles,
+            'unverified_role_id': unverified_role_id,
+            'log_channel_id': log_channel_id,
+            'joined_at': joined_at
+        }
+        return self.bot._connection._add_guild_from_data(payload)
+    
+    def _new_user_id(self):
+        self._next_user_id += 1
+        return self._next_user_id
+    
+    # Gateway events
+    
+    def dispatch(self, event, payload):
+        """
+        Feed a raw gateway event to the connection state
+        
+        Like the gateway, events of intents the bot didn't request are not
+        sent, and message content is blanked without the message content
+        intent. Returns whether the event was delivered
+        """
+        intents = self.bot.intents
+        intent = EVENT_INTENTS.get(event)
+        if intent is not None and not getattr(intents, intent):
+            self.stats['gateway_events_filtered'] += 1
+            return False
+        if event == 'MESSAGE_CREATE' and not intents.message_content:
+            payload['content'] = ''
+        self.stats['gateway_events'] += 1
+        self.bot._connection.parsers[event](payload)
+        return True
+    
+    def member_join(self, guild_id, unverified=True):
+        """GUILD_MEMBER_ADD for a brand new user, returns the user ID"""
+        guild = self.guilds[guild_id]
+        user_id = self._new_user_id()
+        roles = (str(guild['unverified_role_id']),) if unverified else ()
+        guild['roles'][user_id] = roles
+        self.dispatch('GUILD_MEMBER_ADD', dict(_member_payload(user_id, roles, _iso_now()), guild_id=str(guild_id)))
+        return user_id
+    
+    def toggle_unverified(self, guild_id, user_id):
+        """GUILD_MEMBER_UPDATE adding or removing the Unverified role, returns True if added"""
+        guild = self.guilds[guild_id]
+        role_id = str(guild['unverified_role_id'])
+        roles = guild['roles'][user_id]
+        added = role_id not in roles
+        roles = roles + (role_id,) if added else tuple(role for role in roles if role != role_id)
+        guild['roles'][user_id] = roles
+        self.dispatch('GUILD_MEMBER_UPDATE', {
+            'guild_id': str(guild_id),
+            'user': _user_payload(user_id),
+            'roles': list(roles),
+            'joined_at': _iso_now(),
+            'flags': 0
+        })
+        return added
+    
+    def request_member_chunks(self, guild_id, user_ids=None, nonce=None):
+        """Answer REQUEST_GUILD_MEMBERS (op 8) with GUILD_MEMBERS_CHUNK events"""
+        task = asyncio.get_running_loop().create_task(self._send_member_chunks(guild_id, user_ids, nonce))
+        self._chunk_tasks.add(task)
+        task.add_done_callback(self._chunk_tasks.discard)
+    
+    async def _send_member_chunks(self, guild_id, user_ids, nonce, chunk_size=1000):
+        guild = self.guilds[guild_id]
+        roles = guild['roles']
+        not_found = []
+        if user_ids is None:
+            user_ids = list(roles)
+        else:
+            not_found = [str(user_id) for user_id in user_ids if user_id not in roles]
+            user_ids = [user_id for user_id in user_ids if user_id in roles]
+        
+        chunk_count = max(1, -(-len(user_ids) // chunk_size))
+        for index in range(chunk_count):
+            # One chunk at a time, like frames arriving from the socket
+            await asyncio.sleep(0)
+            batch = user_ids[index * chunk_size:(index + 1) * chunk_size]
+            payload = {
+                'guild_id': str(guild_id),
+                'members': [
+                    _member_payload(user_id, roles[user_id], guild['joined_at'], bot=user_id == BOT_USER_ID)
+                    for user_id in batch
+                ],
+                'chunk_index': index,
+                'chunk_count': chunk_count,
+                'nonce': nonce
+            }
+            if index == 0 and not_found:
+                payload['not_found'] = not_found
+            self.stats['member_chunks'] += 1
+            self.dispatch('GUILD_MEMBERS_CHUNK', payload)
+    
+    def message_create(self, guild_id, channel_id, user_id, content):
+        """MESSAGE_CREATE for a plain message from a member"""
+        self._next_message_id += 1
+        self.dispatch('MESSAGE_CREATE', {
+            'id': str(self._next_message_id),
+            'type': 0,
+            'channel_id': str(channel_id),
+            'guild_id': str(guild_id),
+            'author': _user_payload(user_id),
+            'member': {'roles': list(self.guilds[guild_id]['roles'][user_id]), 'joined_at': _iso_now(), 'flags': 0},
+            'content': content,
+            'timestamp': _iso_now(),
+            'edited_timestamp': None,
+            'tts': False,
+            'mention_everyone': False,
+            'mentions': [],
+            'mention_roles': [],
+            'attachments': [],
+            'embeds': [],
+            'pinned': False
+        })
+    
+    def typing_start(self, guild_id, channel_id, user_id):
+        """TYPING_START from a member"""
+        self.dispatch('TYPING_START', {
+            'guild_id': str(guild_id),
+            'channel_id': str(channel_id),
+            'user_id': str(user_id),
+            'timestamp': int(time.time()),
+            'member': _member_payload(user_id, self.guilds[guild_id]['roles'][user_id], _iso_now())
+        })
+    
+    def voice_state_update(self, guild_id, user_id, channel_id=None):
+        """VOICE_STATE_UPDATE for a member joining (channel_id) or leaving voice"""
+        self.dispatch('VOICE_STATE_UPDATE', {
+            'guild_id': str(guild_id),
+            'channel_id': str(channel_id) if channel_id else None,
+            'user_id': str(user_id),
+            'member': _member_payload(user_id, self.guilds[guild_id]['roles'][user_id], _iso_now()),
+            'session_id': 'offline',
+            'deaf': False,
+            'mute': False,
+            'self_deaf': False,
+            'self_mute': False,
+            'self_video': False,
+            'suppress': False,
+            'request_to_speak_timestamp': None
+        })
+    
+    def member_remove(self, guild_id, user_id):
+        """GUILD_MEMBER_REMOVE, sent after a kick"""
+        self.guilds[guild_id]['roles'].pop(user_id, None)
+        self.dispatch('GUILD_MEMBER_REMOVE', {'guild_id': str(guild_id), 'user': _user_payload(user_id)})
+    
+    # REST
+    
+    def handle_request(self, method, url, kwargs):
+        """Answer one REST request, returns (status, headers, body)"""
+        self.stats['requests'] += 1
+        path = url.split(API_PREFIX, 1)[-1]
+        
+        match = KICK_ROUTE.match(path)
+        if method == 'DELETE' and match:
+            guild_id, user_id = int(match.group(1)), int(match.group(2))
+            return self._limited(f"kick:{guild_id}", lambda: self._kick(guild_id, user_id))
+        
+        match = MESSAGE_ROUTE.match(path)
+        if method == 'POST' and match:
+            channel_id = int(match.group(1))
+            return self._limited(f"message:{channel_id}", lambda: self._message(channel_id, kwargs))
+        
+        if method == 'POST' and path == DM_CHANNEL_ROUTE:
+            return self._limited('dm_channel', lambda: self._create_dm(kwargs))
+        
+        match = COMMANDS_ROUTE.match(path)
+        if method == 'PUT' and match:
+            return self._limited('commands', lambda: self._sync_commands(kwargs))
+        
+        return 404, {'Content-Type': 'application/json'}, json.dumps({'message': '404: Not Found', 'code': 0})
+    
+    def _limited(self, bucket_key, handler):
+        """Apply the global and route limits, answering 429 with Retry-After when one is exhausted"""
+        now = time.monotonic()
+        allowed, _remaining, retry_after = self.global_limiter.hit('global', now)
+        if not allowed:
+            self.stats['rate_limited'] += 1
+            self.stats['global_rate_limited'] += 1
+            headers = {
+                'Content-Type': 'application/json',
+                'Via': '1.1 google',
+                'Retry-After': f"{retry_after:.3f}",
+                'X-RateLimit-Global': 'true',
+                'X-RateLimit-Scope': 'global'
+            }
+            body = {'message': 'You are being rate limited.', 'retry_after': retry_after, 'global': True}
+            return 429, headers, json.dumps(body)
+        
+        allowed, remaining, reset_after = self.limiter.hit(bucket_key, now)
+        headers = {
+            'Content-Type': 'application/json',
+            'Via': '1.1 google',
+            'X-RateLimit-Bucket': bucket_key.split(':', 1)[0],
+            'X-RateLimit-Limit': str(self.limiter.limit),
+            'X-RateLimit-Remaining': str(remaining),
+            'X-RateLimit-Reset': f"{time.time() + reset_after:.3f}",
+            'X-RateLimit-Reset-After': f"{reset_after:.3f}"
+        }
+        if not allowed:
+            self.stats['rate_limited'] += 1
+            headers['Retry-After'] = f"{reset_after:.3f}"
+            headers['X-RateLimit-Scope'] = 'user'
+            body = {'message': 'You are being rate limited.', 'retry_after': reset_after, 'global': False}
+            return 429, headers, json.dumps(body)
+        
+        status, body = handler()
+        if not body:
+            del headers['Content-Type']
+        return status, headers, body
+    
+    def _kick(self, guild_id, user_id):
+        guild = self.guilds.get(guild_id)
+        if guild is None or user_id not in guild['roles']:
+            self.stats['unknown_members'] += 1
+            return 404, json.dumps({'message': 'Unknown Member', 'code': 10007})
+        
+        self.stats['kicks'] += 1
+        # Discord follows up with a gateway event once the member is gone
+        asyncio.get_running_loop().call_soon(self.member_remove, guild_id, user_id)
+        return 204, ''
+    
+    def _create_dm(self, kwargs):
+        user_id = int(json.loads(kwargs.get('data') or '{}')['recipient_id'])
+        self.stats['dm_channels'] += 1
+        return 200, json.dumps({
+            'id': str(DM_CHANNEL_BASE_ID + user_id - USER_BASE_ID),
+            'type': 1,
+            'last_message_id': None,
+            'recipients': [_user_payload(user_id)]
+        })
+    
+    def _message(self, channel_id, kwargs):
+        if channel_id >= DM_CHANNEL_BASE_ID:
+            self.stats['dms'] += 1
+            # Deterministic per user, so retries see the same answer
+            if (channel_id * 2654435761) % 1000 < self.closed_dm_share * 1000:
+                self.stats['dms_refused'] += 1
+                return 403, json.dumps({'message': 'Cannot send messages to this user', 'code': 50007})
+        
+        body = json.loads(kwargs.get('data') or '{}')
+        self.stats['messages'] += 1
+        self.stats['embeds'] += len(body.get('embeds', []))
+        self._next_message_id += 1
+        return 200, json.dumps({
+            'id': str(self._next_message_id),
+            'channel_id': str(channel_id),
+            'author': _user_payload(BOT_USER_ID, bot=True),
+            'content': body.get('content') or '',
+            'embeds': body.get('embeds', []),
+            'attachments': [],
+            'mentions': [],
+            'mention_roles': [],
+            'mention_everyone': False,
+            'pinned': False,
+            'tts': False,
+            'timestamp': _iso_now(),
+            'edited_timestamp': None,
+            'type': 0,
+            'flags': 0,
+            'components': []
+        })
+    
+    def _sync_commands(self, kwargs):
+        commands = json.loads(kwargs.get('data') or '[]')
+        for offset, command in enumerate(commands):
+            command.setdefault('type', 1)
+            command.setdefault('description', '')
+            command['id'] = str(APPLICATION_ID + 1 + offset)
+            command['application_id'] = str(APPLICATION_ID)
+            command['version'] = '1'
+        return 200, json.dumps(commands)
@@ -2,8 +2,13 @@
 Auto-Kick Bot - Main Entry Point
 A Discord bot that automatically kicks members who don't verify within a set time.
 """
+import argparse
+import functools
 import os
+import signal
 import sys
+import logging
+import time
 from dotenv import load_dotenv
 import discord
 
@@ -12,52 +17,135 @@ load_dotenv()
 
 # Import bot components
 from src.bot import create_bot
-from src.events import setup_member_events
-from src.commands import register_slash_commands, register_prefix_commands
+from src.cluster import ClusterCoordinator, ClusterLink
+from src.events import setup_member_events, setup_role_events
+from src.commands import register_slash_commands, register_prefix_commands, register_voice_commands
+from src.features import FeatureProfile
 from src.tasks import scan_existing_members
-from src.config import UNVERIFIED_ROLE_NAME, KICK_AFTER_MINUTES, CHECK_INTERVAL_MINUTES
+from src.config import UNVERIFIED_ROLE_NAME, KICK_AFTER_MINUTES, CHECK_INTERVAL_MINUTES, LOW_MEMORY_MODE, ENABLE_PREFIX_COMMANDS, ENABLE_VOICE
+from src.utils.structured_logging import setup_logging, shutdown_logging
 
 
-def main():
-    """Main entry point for the bot"""
-    
-    # Get bot token
-    if len(sys.argv) > 1:
-        TOKEN = sys.argv[1]
-    else:
-        TOKEN = os.getenv('DISCORD_BOT_TOKEN')
-        
-        if not TOKEN:
-            print("❌ ERROR: No bot token provided!")
-            print("Usage: python main.py YOUR_BOT_TOKEN")
-            print("Or set DISCORD_BOT_TOKEN environment variable")
-            sys.exit(1)
-    
-    # Create bot instance
-    bot = create_bot()
+log = logging.getLogger(__name__)
+
+
+def register_handlers(bot):
+    """Register events, commands and the ready handler on a bot"""
     
     # Register events
     setup_member_events(bot)
+    setup_role_events(bot)
     
-    # Register commands
+    # Register commands (a disabled feature's events are not received)
     register_slash_commands(bot)
-    register_prefix_commands(bot)
+    if bot.features.prefix_commands:
+        register_prefix_commands(bot)
+    if bot.features.voice:
+        register_voice_commands(bot)
     
     # Setup ready event
     @bot.event
     async def on_ready():
-        print('=' * 50)
-        print(f'✅ Bot is ready! Logged in as {bot.user.name} (ID: {bot.user.id})')
-        print(f'📊 Connected to {len(bot.guilds)} server(s)')
-        print(f'🎯 Default role: {UNVERIFIED_ROLE_NAME}')
-        print(f'⏱️  Default kick timer: {KICK_AFTER_MINUTES} minutes')
-        print(f'🔄 Check interval: {CHECK_INTERVAL_MINUTES} minutes')
-        print('💡 Use /setup or !setup to configure settings')
-        print('💡 Use /help or !autokick_help for all commands')
-        print('=' * 50)
+        if bot.cluster is not None:
+            log.info(
+                "Worker %d ready with %d server(s)", bot.cluster.worker_index, len(bot.guilds),
+                extra={'shards': list(bot.shard_ids)}
+            )
+            await scan_existing_members(bot)
+            return
+        
+        log.info("Bot is ready, logged in as %s (ID: %s)", bot.user.name, bot.user.id)
+        log.info("Connected to %d server(s)", len(bot.guilds))
+        log.info(
+            "Default role: %s, kick timer: %d minutes, check interval: %d minutes",
+            UNVERIFIED_ROLE_NAME, KICK_AFTER_MINUTES, CHECK_INTERVAL_MINUTES
+        )
+        log.info("Use /setup or !setup to configure settings, /help or !autokick_help for all commands")
         
         # Scan existing members
         await scan_existing_members(bot)
+
+
+def run_worker(
+    token, worker_index, shard_ids, shard_count, status, start_delay,
+    force_sync=False, low_memory=LOW_MEMORY_MODE, features=None
+):
+    """Entry point of a cluster worker process"""
+    # The coordinator stops workers with SIGTERM, close them like Ctrl+C
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+    setup_logging(fields={'worker': worker_index})
+    
+    try:
+        # Only the first worker syncs the (global) slash command tree
+        bot = create_bot(
+            shard_ids=shard_ids, shard_count=shard_count,
+            sync_commands=worker_index == 0, force_sync=force_sync, low_memory=low_memory,
+            features=features
+        )
+        bot.cluster = ClusterLink(worker_index, status)
+        if bot.metrics_port is not None:
+            bot.metrics_port += worker_index
+        register_handlers(bot)
+        
+        time.sleep(start_delay)
+        bot.run(token, log_handler=None)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        shutdown_logging()
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Auto-Kick Bot")
+    parser.add_argument('token', nargs='?', default=os.getenv('DISCORD_BOT_TOKEN'),
+                        help="Bot token (default: DISCORD_BOT_TOKEN environment variable)")
+    parser.add_argument('--shards', type=int, default=None,
+                        help="Total shard count (default: recommended by Discord)")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="Worker processes, each running a contiguous range of shards")
+    parser.add_argument('--force-sync', action='store_true',
+                        help="Sync slash commands even if they did not change since the last sync")
+    parser.add_argument('--low-memory', action='store_true', default=LOW_MEMORY_MODE,
+                        help="Cache only unverified members instead of every member")
+    parser.add_argument('--no-prefix-commands', dest='prefix_commands', action='store_false', default=ENABLE_PREFIX_COMMANDS,
+                        help="Disable ! commands and the message content intent")
+    parser.add_argument('--no-voice', dest='voice', action='store_false', default=ENABLE_VOICE,
+                        help="Disable the voice commands and the voice states intent")
+    return parser.parse_args()
+
+
+def main():
+    """Main entry point for the bot"""
+    args = parse_args()
+    
+    # Get bot token
+    TOKEN = args.token
+    if not TOKEN:
+        print("❌ ERROR: No bot token provided!")
+        print("Usage: python main.py YOUR_BOT_TOKEN [--shards N] [--workers N] [--force-sync] [--low-memory] [--no-prefix-commands] [--no-voice]")
+        print("Or set DISCORD_BOT_TOKEN environment variable")
+        sys.exit(1)
+    
+    # Structured logs are written from a background thread
+    setup_logging()
+    features = FeatureProfile(prefix_commands=args.prefix_commands, voice=args.voice)
+    
+    if args.workers > 1:
+        print(f"🚀 Starting Auto-Kick Bot cluster with {args.workers} workers...")
+        try:
+            worker = functools.partial(
+                run_worker, force_sync=args.force_sync, low_memory=args.low_memory, features=features
+            )
+            ClusterCoordinator(TOKEN, args.workers, args.shards, worker).run()
+        finally:
+            shutdown_logging()
+        return
+    
+    # Create bot instance
+    bot = create_bot(
+        shard_count=args.shards, force_sync=args.force_sync, low_memory=args.low_memory, features=features
+    )
+    register_handlers(bot)
     
     # Start the bot
     print("🚀 Starting Auto-Kick Bot...")
@@ -70,13 +158,16 @@ def main():
     print()
     
     try:
-        bot.run(TOKEN)
+        # Logging is already configured, keep discord.py from adding its own handler
+        bot.run(TOKEN, log_handler=None)
     except KeyboardInterrupt:
         print("\n\n👋 Bot shutting down...")
         sys.exit(0)
     except Exception as e:
         print(f"\n❌ Error starting bot: {e}")
         sys.exit(1)
+    finally:
+        shutdown_logging()
 
 
 if __name__ == "__main__":
@@ -1,142 +1,297 @@
 """
 Main bot class and initialization
 """
+import logging
+import time
 import discord
 from discord.ext import commands
 from datetime import datetime
-from src.config import (
-    BOT_PREFIX, 
-    UNVERIFIED_ROLE_NAME, 
-    KICK_AFTER_MINUTES,
-    SEND_DM_BEFORE_KICK
-)
-from .utils import DataManager
+from src.config import BOT_PREFIX, METRICS_PORT, LOW_MEMORY_MODE
+from .features import FeatureProfile
+from .storage import DEFAULT_GUILD_CONFIG, GuildConfig, TrackedMemberStore
+from .utils import BotMetrics, DataManager, DMWarningSender, ExpiryScheduler, FailureTracker, KickExecutor, KickLogAggregator, MemberEventQueue, MemberResolver, PersistenceEngine, PresenceManager, RoleCache, StaffRoleCache, StatusPageCache, TrackedMemberCache, next_warning_time, sync_command_tree
 
 
-class AutoKickBot(commands.Bot):
-    """Main bot class for Auto-Kick functionality"""
+log = logging.getLogger(__name__)
+
+
+class AutoKickBot(commands.AutoShardedBot):
+    """
+    Main bot class for Auto-Kick functionality
     
-    def __init__(self):
-        intents = discord.Intents.default()
-        intents.members = True
-        intents.guilds = True
-        intents.message_content = True
-        intents.voice_states = True  # Enable voice channel functionality
+    Args:
+        shard_ids: Shards this process connects, all of them when None
+        shard_count: Total shards, asked from Discord when None
+        sync_commands: Sync the slash command tree on startup (one process per cluster)
+        force_sync: Sync even when the tree matches the last synced one
+        low_memory: Cache only unverified members, fetched on demand
+        features: FeatureProfile, decides the gateway intents (config defaults when None)
+    """
+    
+    def __init__(
+        self, shard_ids=None, shard_count=None, sync_commands=True, force_sync=False,
+        low_memory=LOW_MEMORY_MODE, features=None
+    ):
+        self.features = features or FeatureProfile()
+        intents = self.features.intents()
+        
+        cache_options = {}
+        if low_memory:
+            # discord.py keeps only the bot's own member, see TrackedMemberCache
+            cache_options = {'member_cache_flags': discord.MemberCacheFlags.none(), 'chunk_guilds_at_startup': False}
+        
+        super().__init__(
+            command_prefix=BOT_PREFIX, intents=intents, help_command=None,
+            shard_ids=shard_ids, shard_count=shard_count, **cache_options
+        )
+        self.sync_commands = sync_commands
+        self.force_sync = force_sync
+        self.metrics_port = METRICS_PORT
+        
+        # Set by a cluster worker, publishes status to the coordinator
+        self.cluster = None
+        
+        # Unverified members fetched on demand in low-memory mode, None otherwise
+        self.member_cache = None
+        if low_memory:
+            self.member_cache = TrackedMemberCache(self)
+            self.member_cache.install()
         
-        super().__init__(command_prefix=BOT_PREFIX, intents=intents, help_command=None)
+        # Due and listed members looked up in batches when not cached
+        self.member_resolver = MemberResolver(self)
         
-        # Store member join times: {guild_id: {member_id: join_timestamp}}
-        self.unverified_members = {}
+        # Store member join times: {guild_id: {member_id: join_timestamp}} in compact arrays
+        self.unverified_members = TrackedMemberStore()
         
-        # Store guild-specific configurations
+        # Store guild-specific configurations: {guild_id: GuildConfig}
         self.guild_configs = {}
         
+        # Counters and histograms for the auto-kick pipeline
+        self.metrics = BotMetrics(self)
+        
+        # Kick deadlines for every tracked member
+        self.scheduler = ExpiryScheduler()
+        
+        # Next DM warning time of tracked members in guilds with DMs enabled
+        self.warning_scheduler = ExpiryScheduler()
+        
+        # Debounced background writes of changed guilds
+        self.persistence = PersistenceEngine(self)
+        
+        # Member joins, role updates and removals applied in batches
+        self.member_events = MemberEventQueue(self)
+        
+        # Tracked member count shown in the status of every shard
+        self.presence = PresenceManager(self)
+        
+        # Resolved unverified role per guild
+        self.role_cache = RoleCache()
+        
+        # Role IDs of each guild's allowed staff roles
+        self.staff_roles = StaffRoleCache()
+        
+        # Rendered /status pages
+        self.status_pages = StatusPageCache()
+        
+        # Per-guild kick queues
+        self.kick_executor = KickExecutor()
+        
+        # Batched messages to log channels
+        self.kick_log = KickLogAggregator()
+        
+        # Throttled pre-kick warning DMs
+        self.dm_warnings = DMWarningSender(self)
+        
+        # Guild-level kick failures that were already reported
+        self.failures = FailureTracker()
+        
         # Load data from files
         self.load_data()
     
     def load_data(self):
-        """Load saved data from JSON files"""
-        self.unverified_members = DataManager.load_tracked_members()
-        self.guild_configs = DataManager.load_guild_configs()
+        """Load saved data of the guilds on this process's shards"""
+        members, configs, migrated = DataManager.load_data(self.shard_ids, self.shard_count)
+        self.unverified_members = TrackedMemberStore(members)
+        # Older configs lack some keys, they get the defaults here once
+        self.guild_configs = {guild_id: GuildConfig.from_dict(config) for guild_id, config in configs.items()}
+        
+        if migrated:
+            log.info("Migrating legacy data files into the storage backend")
+            self.persistence.mark_dirty()
         
-        member_count = sum(len(m) for m in self.unverified_members.values())
+        for guild_id in self.unverified_members:
+            self.reschedule_guild(guild_id)
+        
+        member_count = self.unverified_members.total_members()
         config_count = len(self.guild_configs)
         
         if member_count > 0:
-            print(f"✅ Loaded {member_count} tracked member(s)")
+            log.info("Loaded %d tracked member(s)", member_count)
         if config_count > 0:
-            print(f"✅ Loaded configs for {config_count} server(s)")
+            log.info("Loaded configs for %d server(s)", config_count)
     
-    def save_data(self):
-        """Save data to JSON files"""
-        DataManager.save_data(self.unverified_members, self.guild_configs)
+    def save_data(self, guild_id=None):
+        """Queue a guild's data (or everything when None) for the next background save"""
+        self.persistence.mark_dirty(guild_id)
     
     def get_guild_config(self, guild_id):
-        """Get configuration for a guild, returns defaults if not set"""
-        if guild_id not in self.guild_configs:
-            self.guild_configs[guild_id] = {
-                'role_name': UNVERIFIED_ROLE_NAME,
-                'kick_after_minutes': KICK_AFTER_MINUTES,
-                'send_dm': SEND_DM_BEFORE_KICK,
-                'log_channel_id': None,
-                'allowed_roles': []  # Staff roles that can use bot commands
-            }
-            self.save_data()
-        # Ensure allowed_roles exists for older configs
-        if 'allowed_roles' not in self.guild_configs[guild_id]:
-            self.guild_configs[guild_id]['allowed_roles'] = []
-            self.save_data()
-        return self.guild_configs[guild_id]
+        """Get configuration for a guild, returns the shared defaults if not set (read-only)"""
+        return self.guild_configs.get(guild_id, DEFAULT_GUILD_CONFIG)
+    
+    def update_guild_config(self, guild_id, **changes):
+        """Change a guild's settings and queue them for saving, returns the new config"""
+        config = self.get_guild_config(guild_id).replace(**changes)
+        self.guild_configs[guild_id] = config
+        self.persistence.journal_config(guild_id, config)
+        self.save_data(guild_id)
+        if 'send_dm' in changes:
+            self.reschedule_guild(guild_id)
+        return config
+    
+    def get_unverified_role(self, guild):
+        """Return the guild's configured unverified role, or None"""
+        config = self.get_guild_config(guild.id)
+        return self.role_cache.get_role(guild, config.role_name)
+    
+    def track_member(self, guild_id, member_id, join_timestamp=None):
+        """Start tracking a member and schedule their kick deadline"""
+        if join_timestamp is None:
+            join_timestamp = datetime.now().timestamp()
+        
+        self.unverified_members.setdefault(guild_id, {})[member_id] = join_timestamp
+        self.persistence.journal_track(guild_id, member_id, join_timestamp)
+        
+        config = self.get_guild_config(guild_id)
+        deadline = join_timestamp + config.kick_after_minutes * 60
+        self.scheduler.schedule(guild_id, member_id, deadline)
+        if config.send_dm:
+            self.schedule_warning(guild_id, member_id, deadline, first=True)
+    
+    def schedule_warning(self, guild_id, member_id, deadline, now=None, first=False):
+        """Schedule a member's next DM warning before their deadline, if one is left (first: just tracked)"""
+        warn_at = next_warning_time(deadline, now or time.time(), first=first)
+        if warn_at is None:
+            self.warning_scheduler.cancel(guild_id, member_id)
+        else:
+            self.warning_scheduler.schedule(guild_id, member_id, warn_at)
+    
+    def untrack_member(self, guild_id, member_id):
+        """Stop tracking a member, returns True if they were tracked"""
+        self.scheduler.cancel(guild_id, member_id)
+        self.warning_scheduler.cancel(guild_id, member_id)
+        if self.member_cache is not None:
+            self.member_cache.discard(guild_id, member_id)
+        
+        members = self.unverified_members.get(guild_id)
+        if not members or member_id not in members:
+            return False
+        
+        del members[member_id]
+        self.persistence.journal_untrack(guild_id, member_id)
+        return True
+    
+    def reset_guild_tracking(self, guild_id):
+        """Forget every tracked member of a guild"""
+        self.scheduler.cancel_guild(guild_id)
+        if len(self.warning_scheduler):
+            self.warning_scheduler.cancel_guild(guild_id)
+        if self.member_cache is not None:
+            self.member_cache.clear_guild(guild_id)
+        self.failures.clear_guild(guild_id)
+        self.unverified_members[guild_id] = {}
+        self.persistence.journal_clear(guild_id)
+        self.save_data(guild_id)
+    
+    def reschedule_guild(self, guild_id):
+        """Recompute kick deadlines for a guild from its current threshold"""
+        config = self.get_guild_config(guild_id)
+        tracked = self.unverified_members.get(guild_id, {})
+        self.scheduler.reschedule_guild(guild_id, tracked, config.kick_after_minutes)
+        
+        if config.send_dm:
+            now = time.time()
+            offset = config.kick_after_minutes * 60
+            for member_id, join_timestamp in tracked.items():
+                self.schedule_warning(guild_id, member_id, join_timestamp + offset, now)
+        elif len(self.warning_scheduler):
+            self.warning_scheduler.cancel_guild(guild_id)
     
     async def setup_hook(self):
         """Called when the bot is starting up"""
         from src.tasks import setup_background_tasks
         
         # Start background tasks
+        self.persistence.start()
+        await self.metrics.start_server(port=self.metrics_port)
         setup_background_tasks(self)
+        if self.cluster is not None:
+            self.cluster.start(self)
         
-        # Sync slash commands
+        # Sync slash commands, only when they changed since the last sync
+        if not self.sync_commands:
+            return
         try:
-            synced = await self.tree.sync()
-            print(f"✅ Synced {len(synced)} slash command(s)")
-        except Exception as e:
-            print(f"❌ Failed to sync slash commands: {e}")
-
-    async def log_kick(self, guild, member, time_unverified_minutes):
-        """Send a professional log message to the configured log channel"""
-        config = self.get_guild_config(guild.id)
-        log_channel_id = config.get('log_channel_id')
+            await sync_command_tree(self, force=self.force_sync)
+        except Exception:
+            log.exception("Failed to sync slash commands")
+    
+    async def close(self):
+        """Write pending data before shutting down"""
+        try:
+            self.member_events.close()
+            await self.kick_executor.close()
+            await self.dm_warnings.close()
+            await self.kick_log.close()
+            await self.persistence.close()
+            await self.metrics.close()
+            if self.cluster is not None:
+                await self.cluster.close()
+            DataManager.close()
+        finally:
+            await super().close()
+    
+    async def on_shard_ready(self, shard_id):
+        """A shard identified with a new session, which starts without a presence"""
+        self.presence.forget_shard(shard_id)
+        await self.presence.refresh()
+    
+    async def on_guild_remove(self, guild):
+        """Drop the guild's failure conditions, they must not suppress reports if it comes back"""
+        self.failures.clear_guild(guild.id)
+    
+    def get_log_channel(self, guild):
+        """Return the guild's configured log channel, or None"""
+        log_channel_id = self.get_guild_config(guild.id).log_channel_id
         
         if not log_channel_id:
-            return  # No log channel configured
+            return None  # No log channel configured
         
-        log_channel = guild.get_channel(log_channel_id)
+        return guild.get_channel(log_channel_id)  # None if deleted
+    
+    async def log_kick(self, guild, member, time_unverified_minutes):
+        """Queue a kick log for the next batched message to the log channel"""
+        log_channel = self.get_log_channel(guild)
         if not log_channel:
-            return  # Channel not found or deleted
+            return
         
-        # Calculate time components
-        hours = time_unverified_minutes // 60
-        minutes = time_unverified_minutes % 60
-        
-        if hours > 0:
-            time_str = f"{hours}h {minutes}m"
-        else:
-            time_str = f"{minutes}m"
-        
-        # Create clean, professional embed
-        embed = discord.Embed(
-            description=f"**{member.mention}** was removed for not verifying within {config['kick_after_minutes']} minutes.",
-            color=0x2b2d31,  # Discord dark gray
-            timestamp=datetime.now()
-        )
-        
-        embed.set_author(
-            name=f"{member.name}",
-            icon_url=member.display_avatar.url if member.display_avatar else None
-        )
-        
-        embed.add_field(
-            name="Duration Unverified",
-            value=f"`{time_str}`",
-            inline=True
-        )
-        
-        embed.add_field(
-            name="User ID",
-            value=f"`{member.id}`",
-            inline=True
-        )
-        
-        embed.set_footer(text="Auto-Kick System")
+        config = self.get_guild_config(guild.id)
+        self.kick_log.add_kick(log_channel, member, time_unverified_minutes, config.kick_after_minutes)
+    
+    def send_log_embed(self, guild, embed):
+        """Queue an embed for the guild's log channel, returns False if there is none"""
+        log_channel = self.get_log_channel(guild)
+        if not log_channel:
+            return False
         
-        try:
-            await log_channel.send(embed=embed)
-        except discord.Forbidden:
-            print(f"  ⚠️ Missing permissions to send logs to channel {log_channel.name}")
-        except Exception as e:
-            print(f"  ⚠️ Error sending log: {e}")
+        self.kick_log.add_embed(log_channel, embed)
+        return True
 
 
-def create_bot():
+def create_bot(
+    shard_ids=None, shard_count=None, sync_commands=True, force_sync=False, low_memory=LOW_MEMORY_MODE, features=None
+):
     """Factory function to create and configure the bot"""
-    return AutoKickBot()
+    return AutoKickBot(
+        shard_ids=shard_ids, shard_count=shard_count, sync_commands=sync_commands,
+        force_sync=force_sync, low_memory=low_memory, features=features
+    )
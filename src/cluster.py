@@ -0,0 +1,227 @@
+"""
+Multi-process shard clustering
+
+The coordinator (the main process) splits the shards into contiguous ranges
+and runs one worker process per range. Each worker is an AutoKickBot that
+connects only its own shards and loads only the tracked members and configs
+of guilds on those shards. Workers publish a small status record to a
+shared dict, which the coordinator aggregates.
+"""
+import asyncio
+import logging
+import math
+import multiprocessing
+import time
+import discord
+from src.config import CLUSTER_STATUS_SECONDS
+from src.utils import DataManager
+
+
+log = logging.getLogger(__name__)
+
+# Discord allows one IDENTIFY per rate limit key every 5 seconds
+IDENTIFY_SECONDS = 5
+
+
+def shard_ranges(shard_count, workers):
+    """Split shard IDs 0..shard_count-1 into `workers` contiguous ranges"""
+    workers = max(1, min(workers, shard_count))
+    base, extra = divmod(shard_count, workers)
+    ranges = []
+    start = 0
+    for index in range(workers):
+        size = base + (1 if index < extra else 0)
+        ranges.append(list(range(start, start + size)))
+        start += size
+    return ranges
+
+
+def fetch_gateway_info(token):
+    """Return (recommended shard count, max_concurrency) from GET /gateway/bot"""
+    async def fetch():
+        http = discord.http.HTTPClient(asyncio.get_running_loop())
+        try:
+            await http.static_login(token)
+            shards, _url, session_start_limit = await http.get_bot_gateway()
+            return shards, session_start_limit.get('max_concurrency', 1)
+        finally:
+            await http.close()
+    
+    return asyncio.run(fetch())
+
+
+class ClusterLink:
+    """
+    Worker side of the cluster: publishes this worker's status and keeps
+    the latest cluster-wide totals for display
+    """
+    
+    def __init__(self, worker_index, status, interval=CLUSTER_STATUS_SECONDS):
+        self.worker_index = worker_index
+        self.interval = interval
+        self._status = status  # Manager dict shared with the coordinator
+        self._totals = {}
+        self._task = None
+    
+    def start(self, bot):
+        """Start publishing status in the background"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(bot))
+        return self._task
+    
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+    
+    def total(self, key, default=0):
+        """Cluster-wide sum of a status field as of the last sync"""
+        return self._totals.get(key, default)
+    
+    async def sync(self, bot):
+        """Publish this worker's status and refresh the cluster totals"""
+        record = {
+            'shards': list(bot.shard_ids or ()),
+            'guilds': len(bot.guilds),
+            'tracked_members': bot.unverified_members.total_members(),
+            'pending_kicks': bot.kick_executor.pending,
+            'kicks': bot.metrics.kicks_succeeded.value,
+            'latency_ms': None if math.isnan(bot.latency) else round(bot.latency * 1000, 1),
+            'updated': time.time()
+        }
+        loop = asyncio.get_running_loop()
+        # Manager proxies do blocking IPC, keep it off the event loop
+        await loop.run_in_executor(None, self._status.__setitem__, self.worker_index, record)
+        statuses = await loop.run_in_executor(None, self._status.copy)
+        self._totals = aggregate_status(statuses)
+    
+    async def _run(self, bot):
+        await bot.wait_until_ready()
+        while True:
+            try:
+                await self.sync(bot)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                log.exception("Could not publish cluster status")
+            await asyncio.sleep(self.interval)
+
+
+def aggregate_status(statuses):
+    """Sum the numeric fields of every worker's status record"""
+    totals = {'workers': len(statuses)}
+    for record in statuses.values():
+        for key in ('guilds', 'tracked_members', 'pending_kicks', 'kicks'):
+            totals[key] = totals.get(key, 0) + record.get(key, 0)
+    return totals
+
+
+def prepare_storage():
+    """
+    Migrate legacy data files before the workers start
+    
+    Each worker only loads its own guilds, so a worker would otherwise see
+    the half-migrated data directory another worker just created.
+    """
+    members, configs, migrated = DataManager.load_data()
+    if migrated:
+        log.info("Migrating legacy data files into the storage backend")
+        DataManager.save_data(members, configs)
+    DataManager.close()
+
+
+class ClusterCoordinator:
+    """
+    Runs and supervises the worker processes
+    
+    Args:
+        token: Bot token
+        workers: Number of worker processes
+        shard_count: Total shards, fetched from Discord when None
+        worker_target: Worker entry point, called in the child process as
+            worker_target(token, worker_index, shard_ids, shard_count, status, start_delay)
+    """
+    
+    def __init__(self, token, workers, shard_count, worker_target):
+        self.token = token
+        self.workers = workers
+        self.shard_count = shard_count
+        self.worker_target = worker_target
+        self._context = multiprocessing.get_context('spawn')
+        self._processes = {}  # {worker_index: Process}
+    
+    def run(self):
+        """Start every worker and supervise them until interrupted"""
+        max_concurrency = 1
+        if self.shard_count is None:
+            self.shard_count, max_concurrency = fetch_gateway_info(self.token)
+        
+        prepare_storage()
+        ranges = shard_ranges(self.shard_count, self.workers)
+        log.info(
+            "Starting %d worker(s) for %d shard(s)", len(ranges), self.shard_count,
+            extra={'ranges': [f"{shards[0]}-{shards[-1]}" for shards in ranges]}
+        )
+        
+        with self._context.Manager() as manager:
+            status = manager.dict()
+            for index, shard_ids in enumerate(ranges):
+                # Workers identify one after another instead of all at once
+                start_delay = shard_ids[0] // max_concurrency * IDENTIFY_SECONDS
+                self._start_worker(index, shard_ids, status, start_delay)
+            
+            try:
+                self._supervise(ranges, status)
+            except KeyboardInterrupt:
+                log.info("Stopping workers")
+            finally:
+                self._stop_workers()
+    
+    def _start_worker(self, index, shard_ids, status, start_delay):
+        process = self._context.Process(
+            target=self.worker_target,
+            args=(self.token, index, shard_ids, self.shard_count, status, start_delay),
+            name=f"strix-worker-{index}",
+            daemon=False
+        )
+        process.start()
+        self._processes[index] = process
+    
+    def _supervise(self, ranges, status):
+        """Log aggregate status and restart workers that died"""
+        while self._processes:
+            time.sleep(CLUSTER_STATUS_SECONDS)
+            
+            for index, process in list(self._processes.items()):
+                if process.is_alive():
+                    continue
+                if process.exitcode == 0:
+                    log.info("Worker %d exited", index)
+                    del self._processes[index]
+                    continue
+                log.error("Worker %d died with exit code %s, restarting", index, process.exitcode)
+                self._start_worker(index, ranges[index], status, 0)
+            
+            totals = aggregate_status(status.copy())
+            log.info(
+                "Cluster: %d worker(s), %d guild(s), %d tracked member(s)",
+                totals['workers'], totals.get('guilds', 0), totals.get('tracked_members', 0),
+                extra=totals
+            )
+    
+    def _stop_workers(self):
+        """Give workers time to flush their data, then terminate the stragglers"""
+        # Ctrl+C reaches the whole process group, workers are already closing
+        for process in self._processes.values():
+            process.join(timeout=30)
+        for process in self._processes.values():
+            if process.is_alive():
+                process.terminate()  # Workers treat SIGTERM like Ctrl+C
+                process.join(timeout=30)
+            if process.is_alive():
+                process.kill()
+        self._processes.clear()
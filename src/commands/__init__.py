@@ -3,5 +3,6 @@ Bot commands (slash and prefix)
 """
 from .slash_commands import register_slash_commands
 from .prefix_commands import register_prefix_commands
+from .voice_commands import register_voice_commands
 
-__all__ = ['register_slash_commands', 'register_prefix_commands']
+__all__ = ['register_slash_commands', 'register_prefix_commands', 'register_voice_commands']
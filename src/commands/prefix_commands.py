@@ -3,9 +3,9 @@ Legacy prefix commands for backward compatibility
 """
 import discord
 from discord.ext import commands
-from datetime import datetime, timedelta
-from src.config import COLOR_INFO, COLOR_SUCCESS, COLOR_WARNING, CHECK_INTERVAL_MINUTES
-from src.utils import has_permission, get_permission_error_message
+from datetime import datetime
+from src.config import COLOR_INFO, COLOR_SUCCESS
+from src.utils import build_status_message, has_permission, get_permission_error_message
 
 
 def register_prefix_commands(bot):
@@ -29,17 +29,17 @@ def register_prefix_commands(bot):
                 description=f"Current settings for **{ctx.guild.name}**\n\n💡 **Tip:** Use `/setup` for slash commands!",
                 color=COLOR_INFO
             )
-            embed.add_field(name="Target Role", value=f"`{config['role_name']}`", inline=False)
-            embed.add_field(name="Kick After", value=f"`{config['kick_after_minutes']}` minutes", inline=False)
+            embed.add_field(name="Target Role", value=f"`{config.role_name}`", inline=False)
+            embed.add_field(name="Kick After", value=f"`{config.kick_after_minutes}` minutes", inline=False)
             
-            dm_status = "✅ Enabled" if config.get('send_dm', False) else "❌ Disabled"
+            dm_status = "✅ Enabled" if config.send_dm else "❌ Disabled"
             embed.add_field(name="DM Notifications", value=dm_status, inline=False)
             
-            log_channel = ctx.guild.get_channel(config.get('log_channel_id')) if config.get('log_channel_id') else None
+            log_channel = ctx.guild.get_channel(config.log_channel_id) if config.log_channel_id else None
             log_status = log_channel.mention if log_channel else "❌ Not set"
             embed.add_field(name="Log Channel", value=log_status, inline=False)
             
-            allowed_roles = config.get('allowed_roles', [])
+            allowed_roles = config.allowed_roles
             if allowed_roles:
                 roles_text = "\n".join([f"• `{role}`" for role in allowed_roles])
                 embed.add_field(name="Staff Roles", value=roles_text, inline=False)
@@ -53,23 +53,28 @@ def register_prefix_commands(bot):
             return
         
         # Update config
+        changes = {}
         if role_name is not None:
-            config['role_name'] = role_name
+            changes['role_name'] = role_name
         
         if kick_after_minutes is not None:
             if kick_after_minutes < 1:
                 await ctx.send("❌ Kick time must be at least 1 minute.")
                 return
-            config['kick_after_minutes'] = kick_after_minutes
+            changes['kick_after_minutes'] = kick_after_minutes
         
-        bot.guild_configs[guild_id] = config
-        bot.save_data()
+        config = bot.update_guild_config(guild_id, **changes)
         
-        await ctx.send(f"✅ Configuration updated! Role: `{config['role_name']}`, Kick after: `{config['kick_after_minutes']}` minutes")
+        await ctx.send(f"✅ Configuration updated! Role: `{config.role_name}`, Kick after: `{config.kick_after_minutes}` minutes")
         
-        bot.unverified_members[guild_id] = {}
-        from src.tasks import scan_existing_members
-        await scan_existing_members(bot)
+        # A new role means a fresh scan, a new threshold only moves deadlines
+        if role_name is not None:
+            bot.role_cache.invalidate(guild_id)
+            bot.reset_guild_tracking(guild_id)
+            from src.tasks import scan_existing_members
+            await scan_existing_members(bot, [ctx.guild])
+        else:
+            bot.reschedule_guild(guild_id)
     
     @bot.command(name='status')
     async def status_command(ctx):
@@ -79,52 +84,15 @@ def register_prefix_commands(bot):
             await ctx.send(get_permission_error_message(bot, ctx.guild.id))
             return
         
-        guild_id = ctx.guild.id
-        config = bot.get_guild_config(guild_id)
-        
-        if guild_id not in bot.unverified_members or not bot.unverified_members[guild_id]:
+        embed, view = await build_status_message(bot, ctx.guild)
+        if embed is None:
             await ctx.send("✅ No unverified members currently being tracked.")
             return
         
-        embed = discord.Embed(
-            title="📊 Auto-Kick Status",
-            description=f"Members with `{config['role_name']}` role",
-            color=COLOR_WARNING
-        )
-        
-        now = datetime.now()
-        kick_threshold = timedelta(minutes=config['kick_after_minutes'])
-        
-        tracked_count = 0
-        for member_id, join_timestamp in bot.unverified_members[guild_id].items():
-            member = ctx.guild.get_member(member_id)
-            
-            if member:
-                join_time = datetime.fromtimestamp(join_timestamp)
-                time_elapsed = now - join_time
-                time_remaining = kick_threshold - time_elapsed
-                
-                if time_remaining.total_seconds() > 0:
-                    minutes_remaining = int(time_remaining.total_seconds() / 60)
-                    seconds_remaining = int(time_remaining.total_seconds() % 60)
-                    embed.add_field(
-                        name=f"{member.name}",
-                        value=f"⏱️ {minutes_remaining}m {seconds_remaining}s",
-                        inline=True
-                    )
-                else:
-                    embed.add_field(
-                        name=f"{member.name}",
-                        value=f"⚠️ Overdue",
-                        inline=True
-                    )
-                
-                tracked_count += 1
-                if tracked_count >= 25:
-                    break
-        
-        embed.set_footer(text=f"Total: {len(bot.unverified_members[guild_id])} | Next check in ~{CHECK_INTERVAL_MINUTES} min")
-        await ctx.send(embed=embed)
+        if view is None:
+            await ctx.send(embed=embed)
+            return
+        view.message = await ctx.send(embed=embed, view=view)
     
     @bot.command(name='setlogchannel')
     async def set_log_channel(ctx, channel: discord.TextChannel):
@@ -134,12 +102,7 @@ def register_prefix_commands(bot):
             await ctx.send(get_permission_error_message(bot, ctx.guild.id))
             return
         
-        guild_id = ctx.guild.id
-        config = bot.get_guild_config(guild_id)
-        
-        config['log_channel_id'] = channel.id
-        bot.guild_configs[guild_id] = config
-        bot.save_data()
+        bot.update_guild_config(ctx.guild.id, log_channel_id=channel.id)
         
         await ctx.send(f"✅ Log channel set to {channel.mention}")
         
@@ -164,21 +127,17 @@ def register_prefix_commands(bot):
             await ctx.send(get_permission_error_message(bot, ctx.guild.id))
             return
         
-        guild_id = ctx.guild.id
-        config = bot.get_guild_config(guild_id)
-        
         if enabled.lower() in ['on', 'enable', 'enabled', 'yes', 'true']:
-            config['send_dm'] = True
+            send_dm = True
             status = "enabled ✅"
         elif enabled.lower() in ['off', 'disable', 'disabled', 'no', 'false']:
-            config['send_dm'] = False
+            send_dm = False
             status = "disabled ❌"
         else:
             await ctx.send("❌ Invalid option. Use `on` or `off`")
             return
         
-        bot.guild_configs[guild_id] = config
-        bot.save_data()
+        bot.update_guild_config(ctx.guild.id, send_dm=send_dm)
         
         await ctx.send(f"📬 DM notifications are now **{status}**")
     
@@ -193,16 +152,13 @@ def register_prefix_commands(bot):
         guild_id = ctx.guild.id
         config = bot.get_guild_config(guild_id)
         
-        allowed_roles = config.get('allowed_roles', [])
+        allowed_roles = config.allowed_roles
         
         if role.name in allowed_roles:
             await ctx.send(f"⚠️ Role {role.mention} already has bot permissions!")
             return
         
-        allowed_roles.append(role.name)
-        config['allowed_roles'] = allowed_roles
-        bot.guild_configs[guild_id] = config
-        bot.save_data()
+        bot.update_guild_config(guild_id, allowed_roles=allowed_roles + (role.name,))
         
         await ctx.send(f"✅ {role.mention} can now use bot commands!")
     
@@ -217,16 +173,13 @@ def register_prefix_commands(bot):
         guild_id = ctx.guild.id
         config = bot.get_guild_config(guild_id)
         
-        allowed_roles = config.get('allowed_roles', [])
+        allowed_roles = config.allowed_roles
         
         if role.name not in allowed_roles:
             await ctx.send(f"⚠️ Role {role.mention} doesn't have bot permissions!")
             return
         
-        allowed_roles.remove(role.name)
-        config['allowed_roles'] = allowed_roles
-        bot.guild_configs[guild_id] = config
-        bot.save_data()
+        bot.update_guild_config(guild_id, allowed_roles=[name for name in allowed_roles if name != role.name])
         
         await ctx.send(f"✅ {role.mention} can no longer use bot commands!")
     
@@ -241,7 +194,7 @@ def register_prefix_commands(bot):
         guild_id = ctx.guild.id
         config = bot.get_guild_config(guild_id)
         
-        allowed_roles = config.get('allowed_roles', [])
+        allowed_roles = config.allowed_roles
         
         embed = discord.Embed(
             title="👥 Staff Roles with Bot Permissions",
@@ -294,12 +247,13 @@ def register_prefix_commands(bot):
             inline=False
         )
         
-        embed.add_field(
-            name="🔊 Voice Commands",
-            value="`!join #channel` - Join voice channel\n"
-                  "`!disconnect` - Leave voice channel",
-            inline=False
-        )
+        if bot.features.voice:
+            embed.add_field(
+                name="🔊 Voice Commands",
+                value="`!join #channel` - Join voice channel\n"
+                      "`!disconnect` - Leave voice channel",
+                inline=False
+            )
         
         # Check permissions
         if has_permission(bot, ctx):
@@ -309,54 +263,6 @@ def register_prefix_commands(bot):
         
         await ctx.send(embed=embed)
     
-    @bot.command(name='join')
-    async def join_voice(ctx, channel: discord.VoiceChannel):
-        """Join a voice channel"""
-        # Check permissions
-        if not has_permission(bot, ctx):
-            await ctx.send(get_permission_error_message(bot, ctx.guild.id))
-            return
-        
-        # Check if bot is already in a voice channel
-        if ctx.guild.voice_client:
-            if ctx.guild.voice_client.channel.id == channel.id:
-                await ctx.send(f"✅ Already connected to {channel.mention}")
-                return
-            else:
-                # Move to new channel
-                await ctx.guild.voice_client.move_to(channel)
-                await ctx.send(f"🔊 Moved to {channel.mention}")
-                return
-        
-        # Join the voice channel
-        try:
-            await channel.connect()
-            await ctx.send(f"🔊 Connected to {channel.mention}")
-        except discord.ClientException:
-            await ctx.send("❌ Already connected to a voice channel. Use `!disconnect` first.")
-        except discord.Forbidden:
-            await ctx.send(f"❌ Missing permissions to join {channel.mention}")
-        except Exception as e:
-            await ctx.send(f"❌ Error joining voice channel: {e}")
-    
-    @bot.command(name='disconnect')
-    async def disconnect_voice(ctx):
-        """Disconnect from voice channel"""
-        # Check permissions
-        if not has_permission(bot, ctx):
-            await ctx.send(get_permission_error_message(bot, ctx.guild.id))
-            return
-        
-        # Check if bot is in a voice channel
-        if not ctx.guild.voice_client:
-            await ctx.send("❌ Not connected to any voice channel")
-            return
-        
-        # Disconnect
-        channel_name = ctx.guild.voice_client.channel.name
-        await ctx.guild.voice_client.disconnect()
-        await ctx.send(f"🔊 Disconnected from **{channel_name}**")
-    
     @bot.event
     async def on_command_error(ctx, error):
         """Handle command errors"""
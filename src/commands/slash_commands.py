@@ -1,10 +1,10 @@
 
 import discord
 from discord import app_commands
-from datetime import datetime, timedelta
+from datetime import datetime
 from typing import Optional
-from src.config import COLOR_INFO, COLOR_SUCCESS, COLOR_ERROR, COLOR_WARNING
-from src.utils import has_permission, get_permission_error_message
+from src.config import COLOR_INFO, COLOR_SUCCESS, COLOR_ERROR
+from src.utils import build_status_message, has_permission, get_permission_error_message
 
 
 def register_slash_commands(bot):
@@ -41,23 +41,23 @@ def register_slash_commands(bot):
             )
             
             # Show current role with mention if it exists
-            current_role = discord.utils.get(interaction.guild.roles, name=config['role_name'])
+            current_role = bot.get_unverified_role(interaction.guild)
             if current_role:
-                embed.add_field(name="Target Role", value=f"{current_role.mention} (`{config['role_name']}`)", inline=False)
+                embed.add_field(name="Target Role", value=f"{current_role.mention} (`{config.role_name}`)", inline=False)
             else:
-                embed.add_field(name="Target Role", value=f"`{config['role_name']}` ⚠️ (Role not found)", inline=False)
+                embed.add_field(name="Target Role", value=f"`{config.role_name}` ⚠️ (Role not found)", inline=False)
             
-            embed.add_field(name="Kick After", value=f"`{config['kick_after_minutes']}` minutes", inline=False)
+            embed.add_field(name="Kick After", value=f"`{config.kick_after_minutes}` minutes", inline=False)
             
-            dm_status = "✅ Enabled" if config.get('send_dm', False) else "❌ Disabled"
+            dm_status = "✅ Enabled" if config.send_dm else "❌ Disabled"
             embed.add_field(name="DM Notifications", value=dm_status, inline=False)
             
-            log_channel = interaction.guild.get_channel(config.get('log_channel_id')) if config.get('log_channel_id') else None
+            log_channel = interaction.guild.get_channel(config.log_channel_id) if config.log_channel_id else None
             log_status = log_channel.mention if log_channel else "❌ Not set"
             embed.add_field(name="Log Channel", value=log_status, inline=False)
             
             # Show allowed roles
-            allowed_roles = config.get('allowed_roles', [])
+            allowed_roles = config.allowed_roles
             if allowed_roles:
                 roles_text = "\n".join([f"• `{role}`" for role in allowed_roles])
                 embed.add_field(name="Staff Roles (Can Use Bot)", value=roles_text, inline=False)
@@ -71,17 +71,17 @@ def register_slash_commands(bot):
             return
         
         # Update configuration
+        changes = {}
         if role is not None:
-            config['role_name'] = role.name
+            changes['role_name'] = role.name
         
         if kick_after_minutes is not None:
             if kick_after_minutes < 1:
                 await interaction.response.send_message("❌ Kick time must be at least 1 minute.", ephemeral=False)
                 return
-            config['kick_after_minutes'] = kick_after_minutes
+            changes['kick_after_minutes'] = kick_after_minutes
         
-        bot.guild_configs[guild_id] = config
-        bot.save_data()
+        bot.update_guild_config(guild_id, **changes)
         
         embed = discord.Embed(
             title="✅ Configuration Updated",
@@ -97,10 +97,14 @@ def register_slash_commands(bot):
         
         await interaction.response.send_message(embed=embed, ephemeral=False)
         
-        # Rescan
-        bot.unverified_members[guild_id] = {}
-        from src.tasks import scan_existing_members
-        await scan_existing_members(bot)
+        # A new role means a fresh scan, a new threshold only moves deadlines
+        if role is not None:
+            bot.role_cache.invalidate(guild_id)
+            bot.reset_guild_tracking(guild_id)
+            from src.tasks import scan_existing_members
+            await scan_existing_members(bot, [interaction.guild])
+        else:
+            bot.reschedule_guild(guild_id)
     
     @bot.tree.command(name="status", description="View all tracked unverified members")
     async def slash_status(interaction: discord.Interaction):
@@ -113,53 +117,16 @@ def register_slash_commands(bot):
             )
             return
         
-        guild_id = interaction.guild.id
-        config = bot.get_guild_config(guild_id)
-        
-        if guild_id not in bot.unverified_members or not bot.unverified_members[guild_id]:
+        embed, view = await build_status_message(bot, interaction.guild)
+        if embed is None:
             await interaction.response.send_message("✅ No unverified members currently being tracked.", ephemeral=False)
             return
         
-        embed = discord.Embed(
-            title="📊 Auto-Kick Status",
-            description=f"Members with `{config['role_name']}` role",
-            color=COLOR_WARNING
-        )
-        
-        now = datetime.now()
-        kick_threshold = timedelta(minutes=config['kick_after_minutes'])
-        
-        tracked_count = 0
-        for member_id, join_timestamp in bot.unverified_members[guild_id].items():
-            member = interaction.guild.get_member(member_id)
-            
-            if member:
-                join_time = datetime.fromtimestamp(join_timestamp)
-                time_elapsed = now - join_time
-                time_remaining = kick_threshold - time_elapsed
-                
-                if time_remaining.total_seconds() > 0:
-                    minutes_remaining = int(time_remaining.total_seconds() / 60)
-                    seconds_remaining = int(time_remaining.total_seconds() % 60)
-                    embed.add_field(
-                        name=f"{member.name}",
-                        value=f"⏱️ {minutes_remaining}m {seconds_remaining}s",
-                        inline=True
-                    )
-                else:
-                    embed.add_field(
-                        name=f"{member.name}",
-                        value=f"⚠️ Overdue",
-                        inline=True
-                    )
-                
-                tracked_count += 1
-                if tracked_count >= 25:
-                    break
-        
-        from src.config import CHECK_INTERVAL_MINUTES
-        embed.set_footer(text=f"Total: {len(bot.unverified_members[guild_id])} | Next check in ~{CHECK_INTERVAL_MINUTES} min")
-        await interaction.response.send_message(embed=embed, ephemeral=False)
+        if view is None:
+            await interaction.response.send_message(embed=embed, ephemeral=False)
+            return
+        await interaction.response.send_message(embed=embed, view=view, ephemeral=False)
+        view.message = await interaction.original_response()
     
     @bot.tree.command(name="setlogchannel", description="Set the channel for kick logs")
     @app_commands.describe(channel="The channel where kick logs will be sent")
@@ -173,12 +140,7 @@ def register_slash_commands(bot):
             )
             return
         
-        guild_id = interaction.guild.id
-        config = bot.get_guild_config(guild_id)
-        
-        config['log_channel_id'] = channel.id
-        bot.guild_configs[guild_id] = config
-        bot.save_data()
+        bot.update_guild_config(interaction.guild.id, log_channel_id=channel.id)
         
         embed = discord.Embed(
             title="✅ Log Channel Set",
@@ -213,12 +175,7 @@ def register_slash_commands(bot):
             )
             return
         
-        guild_id = interaction.guild.id
-        config = bot.get_guild_config(guild_id)
-        
-        config['send_dm'] = enabled
-        bot.guild_configs[guild_id] = config
-        bot.save_data()
+        bot.update_guild_config(interaction.guild.id, send_dm=enabled)
         
         status = "enabled ✅" if enabled else "disabled ❌"
         embed = discord.Embed(
@@ -251,7 +208,7 @@ def register_slash_commands(bot):
         guild_id = interaction.guild.id
         config = bot.get_guild_config(guild_id)
         
-        allowed_roles = config.get('allowed_roles', [])
+        allowed_roles = config.allowed_roles
         
         if role.name in allowed_roles:
             await interaction.response.send_message(
@@ -260,10 +217,7 @@ def register_slash_commands(bot):
             )
             return
         
-        allowed_roles.append(role.name)
-        config['allowed_roles'] = allowed_roles
-        bot.guild_configs[guild_id] = config
-        bot.save_data()
+        allowed_roles = bot.update_guild_config(guild_id, allowed_roles=allowed_roles + (role.name,)).allowed_roles
         
         embed = discord.Embed(
             title="✅ Staff Role Added",
@@ -292,7 +246,7 @@ def register_slash_commands(bot):
         guild_id = interaction.guild.id
         config = bot.get_guild_config(guild_id)
         
-        allowed_roles = config.get('allowed_roles', [])
+        allowed_roles = config.allowed_roles
         
         if role.name not in allowed_roles:
             await interaction.response.send_message(
@@ -301,10 +255,8 @@ def register_slash_commands(bot):
             )
             return
         
-        allowed_roles.remove(role.name)
-        config['allowed_roles'] = allowed_roles
-        bot.guild_configs[guild_id] = config
-        bot.save_data()
+        allowed_roles = [name for name in allowed_roles if name != role.name]
+        bot.update_guild_config(guild_id, allowed_roles=allowed_roles)
         
         embed = discord.Embed(
             title="✅ Staff Role Removed",
@@ -334,7 +286,7 @@ def register_slash_commands(bot):
         guild_id = interaction.guild.id
         config = bot.get_guild_config(guild_id)
         
-        allowed_roles = config.get('allowed_roles', [])
+        allowed_roles = config.allowed_roles
         
         # Filter out deleted roles and keep only existing ones
         existing_roles = []
@@ -345,9 +297,7 @@ def register_slash_commands(bot):
         
         # Update config if any roles were deleted
         if len(existing_roles) != len(allowed_roles):
-            config['allowed_roles'] = existing_roles
-            bot.guild_configs[guild_id] = config
-            bot.save_data()
+            bot.update_guild_config(guild_id, allowed_roles=existing_roles)
         
         embed = discord.Embed(
             title="👥 Staff Roles with Bot Permissions",
@@ -400,12 +350,13 @@ def register_slash_commands(bot):
             inline=False
         )
         
-        embed.add_field(
-            name="🔊 Voice Commands",
-            value="`/join` - Join a voice channel\n"
-                  "`/disconnect` - Leave voice channel",
-            inline=False
-        )
+        if bot.features.voice:
+            embed.add_field(
+                name="🔊 Voice Commands",
+                value="`/join` - Join a voice channel\n"
+                      "`/disconnect` - Leave voice channel",
+                inline=False
+            )
         
         # Check if user has permissions
         if has_permission(bot, interaction):
@@ -414,90 +365,3 @@ def register_slash_commands(bot):
             embed.set_footer(text="⚠️ You don't have permission to use these commands")
         
         await interaction.response.send_message(embed=embed, ephemeral=False)
-    
-    @bot.tree.command(name="join", description="Join a voice channel")
-    @app_commands.describe(channel="The voice channel to join")
-    async def slash_join(interaction: discord.Interaction, channel: discord.VoiceChannel):
-        """Join a voice channel"""
-        # Check permissions
-        if not has_permission(bot, interaction):
-            await interaction.response.send_message(
-                get_permission_error_message(bot, interaction.guild.id),
-                ephemeral=True
-            )
-            return
-        
-        # Check if bot is already in a voice channel in this guild
-        if interaction.guild.voice_client:
-            if interaction.guild.voice_client.channel.id == channel.id:
-                await interaction.response.send_message(
-                    f"✅ Already connected to {channel.mention}",
-                    ephemeral=False
-                )
-                return
-            else:
-                # Move to new channel
-                await interaction.guild.voice_client.move_to(channel)
-                embed = discord.Embed(
-                    title="🔊 Voice Channel",
-                    description=f"Moved to {channel.mention}",
-                    color=COLOR_SUCCESS
-                )
-                await interaction.response.send_message(embed=embed, ephemeral=False)
-                return
-        
-        # Join the voice channel
-        try:
-            await channel.connect()
-            embed = discord.Embed(
-                title="🔊 Voice Channel",
-                description=f"Connected to {channel.mention}",
-                color=COLOR_SUCCESS
-            )
-            embed.set_footer(text="Use /disconnect to leave")
-            await interaction.response.send_message(embed=embed, ephemeral=False)
-        except discord.ClientException:
-            await interaction.response.send_message(
-                "❌ Already connected to a voice channel. Use `/disconnect` first.",
-                ephemeral=False
-            )
-        except discord.Forbidden:
-            await interaction.response.send_message(
-                f"❌ Missing permissions to join {channel.mention}",
-                ephemeral=False
-            )
-        except Exception as e:
-            await interaction.response.send_message(
-                f"❌ Error joining voice channel: {e}",
-                ephemeral=False
-            )
-    
-    @bot.tree.command(name="disconnect", description="Leave the voice channel")
-    async def slash_disconnect(interaction: discord.Interaction):
-        """Disconnect from voice channel"""
-        # Check permissions
-        if not has_permission(bot, interaction):
-            await interaction.response.send_message(
-                get_permission_error_message(bot, interaction.guild.id),
-                ephemeral=True
-            )
-            return
-        
-        # Check if bot is in a voice channel
-        if not interaction.guild.voice_client:
-            await interaction.response.send_message(
-                "❌ Not connected to any voice channel",
-                ephemeral=False
-            )
-            return
-        
-        # Disconnect
-        channel_name = interaction.guild.voice_client.channel.name
-        await interaction.guild.voice_client.disconnect()
-        
-        embed = discord.Embed(
-            title="🔊 Voice Channel",
-            description=f"Disconnected from **{channel_name}**",
-            color=COLOR_SUCCESS
-        )
-        await interaction.response.send_message(embed=embed, ephemeral=False)
\ No newline at end of file
@@ -0,0 +1,149 @@
+"""
+Voice channel commands (slash and prefix)
+"""
+import discord
+from discord import app_commands
+from src.config import COLOR_SUCCESS
+from src.utils import has_permission, get_permission_error_message
+
+
+def register_voice_commands(bot):
+    """Register /join and /disconnect, and their ! versions when prefix commands are enabled"""
+    
+    @bot.tree.command(name="join", description="Join a voice channel")
+    @app_commands.describe(channel="The voice channel to join")
+    async def slash_join(interaction: discord.Interaction, channel: discord.VoiceChannel):
+        """Join a voice channel"""
+        # Check permissions
+        if not has_permission(bot, interaction):
+            await interaction.response.send_message(
+                get_permission_error_message(bot, interaction.guild.id),
+                ephemeral=True
+            )
+            return
+        
+        # Check if bot is already in a voice channel in this guild
+        if interaction.guild.voice_client:
+            if interaction.guild.voice_client.channel.id == channel.id:
+                await interaction.response.send_message(
+                    f"✅ Already connected to {channel.mention}",
+                    ephemeral=False
+                )
+                return
+            else:
+                # Move to new channel
+                await interaction.guild.voice_client.move_to(channel)
+                embed = discord.Embed(
+                    title="🔊 Voice Channel",
+                    description=f"Moved to {channel.mention}",
+                    color=COLOR_SUCCESS
+                )
+                await interaction.response.send_message(embed=embed, ephemeral=False)
+                return
+        
+        # Join the voice channel
+        try:
+            await channel.connect()
+            embed = discord.Embed(
+                title="🔊 Voice Channel",
+                description=f"Connected to {channel.mention}",
+                color=COLOR_SUCCESS
+            )
+            embed.set_footer(text="Use /disconnect to leave")
+            await interaction.response.send_message(embed=embed, ephemeral=False)
+        except discord.ClientException:
+            await interaction.response.send_message(
+                "❌ Already connected to a voice channel. Use `/disconnect` first.",
+                ephemeral=False
+            )
+        except discord.Forbidden:
+            await interaction.response.send_message(
+                f"❌ Missing permissions to join {channel.mention}",
+                ephemeral=False
+            )
+        except Exception as e:
+            await interaction.response.send_message(
+                f"❌ Error joining voice channel: {e}",
+                ephemeral=False
+            )
+    
+    @bot.tree.command(name="disconnect", description="Leave the voice channel")
+    async def slash_disconnect(interaction: discord.Interaction):
+        """Disconnect from voice channel"""
+        # Check permissions
+        if not has_permission(bot, interaction):
+            await interaction.response.send_message(
+                get_permission_error_message(bot, interaction.guild.id),
+                ephemeral=True
+            )
+            return
+        
+        # Check if bot is in a voice channel
+        if not interaction.guild.voice_client:
+            await interaction.response.send_message(
+                "❌ Not connected to any voice channel",
+                ephemeral=False
+            )
+            return
+        
+        # Disconnect
+        channel_name = interaction.guild.voice_client.channel.name
+        await interaction.guild.voice_client.disconnect()
+        
+        embed = discord.Embed(
+            title="🔊 Voice Channel",
+            description=f"Disconnected from **{channel_name}**",
+            color=COLOR_SUCCESS
+        )
+        await interaction.response.send_message(embed=embed, ephemeral=False)
+    
+    if not bot.features.prefix_commands:
+        return
+    
+    @bot.command(name='join')
+    async def join_voice(ctx, channel: discord.VoiceChannel):
+        """Join a voice channel"""
+        # Check permissions
+        if not has_permission(bot, ctx):
+            await ctx.send(get_permission_error_message(bot, ctx.guild.id))
+            return
+        
+        # Check if bot is already in a voice channel
+        if ctx.guild.voice_client:
+            if ctx.guild.voice_client.channel.id == channel.id:
+                await ctx.send(f"✅ Already connected to {channel.mention}")
+                return
+            else:
+                # Move to new channel
+                await ctx.guild.voice_client.move_to(channel)
+                await ctx.send(f"🔊 Moved to {channel.mention}")
+                return
+        
+        # Join the voice channel
+        try:
+            await channel.connect()
+            await ctx.send(f"🔊 Connected to {channel.mention}")
+        except discord.ClientException:
+            await ctx.send("❌ Already connected to a voice channel. Use `!disconnect` first.")
+        except discord.Forbidden:
+            await ctx.send(f"❌ Missing permissions to join {channel.mention}")
+        except Exception as e:
+            await ctx.send(f"❌ Error joining voice channel: {e}")
+    
+    @bot.command(name='disconnect')
+    async def disconnect_voice(ctx):
+        """Disconnect from voice channel"""
+        # Check permissions
+        if not has_permission(bot, ctx):
+            await ctx.send(get_permission_error_message(bot, ctx.guild.id))
+            return
+        
+        # Check if bot is in a voice channel
+        if not ctx.guild.voice_client:
+            await ctx.send("❌ Not connected to any voice channel")
+            return
+        
+        # Disconnect
+        channel_name = ctx.guild.voice_client.channel.name
+        await ctx.guild.voice_client.disconnect()
+        await ctx.send(f"🔊 Disconnected from **{channel_name}**")
@@ -8,15 +8,86 @@ BOT_PREFIX = '!'
 # Default Server Settings
 UNVERIFIED_ROLE_NAME = "Unverified"
 KICK_AFTER_MINUTES = 2880
-CHECK_INTERVAL_MINUTES = 30
+CHECK_INTERVAL_MINUTES = 30  # Retry delay for failed kicks and max sleep between deadline checks
 SEND_DM_BEFORE_KICK = False
 
+# Features (each one adds the gateway intents it needs)
+ENABLE_PREFIX_COMMANDS = True  # Legacy ! commands, receive every guild message
+ENABLE_VOICE = True  # /join and /disconnect, receive every voice state change
+
+# Memory
+LOW_MEMORY_MODE = False  # Cache only unverified members instead of every member (no startup chunking)
+MEMBER_RESOLVE_CACHE_SECONDS = 60  # Low-memory mode: remember members a query did not find this long
+
+# Member Event Ingestion
+INGEST_FLUSH_SECONDS = 0.5  # Max time a member join/update/leave waits before being applied
+INGEST_BATCH_SIZE = 1000  # Queued records that trigger an immediate batch
+JOIN_CHECK_DELAY_SECONDS = 2  # New members' roles are checked this long after they joined
+
+# Startup Scan
+SCAN_CONCURRENCY = 8  # Guilds scanned in parallel
+SCAN_YIELD_EVERY = 1000  # Members tracked before yielding to the event loop
+
+# Kick Execution
+KICK_CONCURRENCY = 10  # Kick requests in flight across all guilds
+KICK_BUCKET_SIZE = 5  # Kicks allowed per guild per KICK_BUCKET_SECONDS
+KICK_BUCKET_SECONDS = 5
+KICK_MAX_RETRIES = 3  # Retries for rate limits, 5xx and network errors
+KICK_RETRY_BASE_SECONDS = 2  # Backoff doubles after every retry
+
+# DM Warnings (servers with DM notifications enabled)
+DM_WARNING_LEAD_MINUTES = [1440, 60]  # Warn this long before the kick deadline
+DM_CONCURRENCY = 2  # Warning DMs in flight
+DM_BUCKET_SIZE = 5  # Warning DMs allowed per DM_BUCKET_SECONDS across all servers
+DM_BUCKET_SECONDS = 5
+DM_CHANNEL_CACHE_SIZE = 10000  # DM channel IDs kept to skip channel creation
+DM_FAILURE_COOLDOWN_MINUTES = 1440  # Don't retry members with closed DMs for this long
+
+# Failure Reports
+FAILURE_REPORT_COOLDOWN_MINUTES = 360  # Repeat an unchanged failure report at most this often
+
+# Log Channel Batching
+LOG_FLUSH_SECONDS = 10  # Max time a log entry waits before being sent
+LOG_BATCH_SIZE = 50  # Entries that trigger an immediate flush
+
+# Logging
+LOG_LEVEL = 'INFO'
+LOG_FORMAT = 'json'  # 'json' (one record per line) or 'text'
+LOG_MODULE_LEVELS = {  # Per-module overrides, set a module to 'DEBUG' for per-member lines
+    'discord': 'WARNING',
+}
+
+# Metrics
+METRICS_HOST = '127.0.0.1'
+METRICS_PORT = None  # e.g. 9100 to serve Prometheus metrics on /metrics
+
+# Sharding
+CLUSTER_STATUS_SECONDS = 60  # How often cluster workers report status to the coordinator
+
+# Presence
+PRESENCE_MIN_INTERVAL_SECONDS = 60  # Presence updates per shard at most this often
+PRESENCE_MIN_CHANGE = 0.01  # Update right away when the count moved by this fraction
+PRESENCE_MAX_STALE_SECONDS = 600  # Smaller changes are shown after this long
+
+# Status Command
+STATUS_PAGE_SIZE = 25  # Members per /status page (Discord allows 25 embed fields)
+STATUS_CACHE_SECONDS = 30  # Reuse a rendered page this long unless tracking changed
+STATUS_VIEW_TIMEOUT_SECONDS = 300  # Page buttons stop working after this
+
 # Permission Settings
 ALLOWED_ROLE_NAMES = []  # Staff roles that can use bot commands (empty = admin only)
 
 # Data Files
-MEMBERS_DATA_FILE = 'unverified_members.json'
-GUILD_CONFIG_FILE = 'guild_configs.json'
+STORAGE_BACKEND = 'json'  # 'json' (one file per guild), 'sqlite' or 'journal' (binary change log + snapshots)
+SQLITE_DATABASE_FILE = 'strix.db'
+DATA_DIR = 'data'  # One JSON file per guild
+MEMBERS_DATA_FILE = 'unverified_members.json'  # Legacy, migrated into DATA_DIR
+GUILD_CONFIG_FILE = 'guild_configs.json'  # Legacy, migrated into DATA_DIR
+SAVE_DEBOUNCE_SECONDS = 5  # Delay used to coalesce writes of changed guilds
+JOURNAL_DIR = 'journal'  # Journal backend: snapshots and change logs
+JOURNAL_FLUSH_SECONDS = 1  # Journal backend: batch window, the most a crash can lose
+JOURNAL_COMPACT_MIN_BYTES = 4 * 1024 * 1024  # Compact once the journal is this big and larger than the snapshot
+COMMAND_TREE_HASH_FILE = 'command_tree.json'  # Hash of the last synced slash commands
 
 # Embed Colors (Discord color codes)
 COLOR_INFO = 0x3498db      # Blue
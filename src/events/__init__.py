@@ -2,5 +2,6 @@
 Discord event handlers
 """
 from .member_events import setup_member_events
+from .role_events import setup_role_events
 
-__all__ = ['setup_member_events']
+__all__ = ['setup_member_events', 'setup_role_events']
@@ -0,0 +1,34 @@
+"""
+Discord role event handlers
+"""
+import discord
+
+
+def setup_role_events(bot):
+    """Register role event handlers that keep the role caches fresh"""
+    
+    @bot.event
+    async def on_guild_role_create(role: discord.Role):
+        """A new role may match the configured unverified or staff role names"""
+        bot.role_cache.invalidate(role.guild.id)
+        bot.staff_roles.invalidate(role.guild.id)
+    
+    @bot.event
+    async def on_guild_role_update(before: discord.Role, after: discord.Role):
+        """A rename can make a role start or stop matching"""
+        if before.name != after.name:
+            guild_id = after.guild.id
+            bot.role_cache.invalidate(guild_id)
+            bot.staff_roles.invalidate(guild_id)
+            
+            # Staff roles keep their permissions when renamed
+            allowed_roles = bot.get_guild_config(guild_id).allowed_roles
+            if before.name in allowed_roles:
+                renamed = [after.name if name == before.name else name for name in allowed_roles]
+                bot.update_guild_config(guild_id, allowed_roles=list(dict.fromkeys(renamed)))
+    
+    @bot.event
+    async def on_guild_role_delete(role: discord.Role):
+        """Drop the cached roles if one was deleted"""
+        bot.role_cache.invalidate(role.guild.id)
+        bot.staff_roles.invalidate(role.guild.id)
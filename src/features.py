@@ -0,0 +1,35 @@
+"""
+Optional bot features and the gateway intents they need
+"""
+import discord
+from src.config import ENABLE_PREFIX_COMMANDS, ENABLE_VOICE
+
+
+class FeatureProfile:
+    """
+    Which optional features a bot runs
+    
+    The auto-kick pipeline needs only the guilds and members intents.
+    Prefix commands add guild messages and message content, voice adds
+    voice states; the gateway doesn't deliver the events of intents that
+    are left out, so they cost neither bandwidth nor parsing.
+    """
+    
+    def __init__(self, prefix_commands=ENABLE_PREFIX_COMMANDS, voice=ENABLE_VOICE):
+        self.prefix_commands = prefix_commands  # Legacy ! commands
+        self.voice = voice  # /join and /disconnect (and their ! versions)
+    
+    def intents(self):
+        """The smallest intents set that covers the enabled features"""
+        intents = discord.Intents.none()
+        intents.guilds = True
+        intents.members = True
+        if self.prefix_commands:
+            intents.guild_messages = True
+            intents.message_content = True
+        if self.voice:
+            intents.voice_states = True
+        return intents
+    
+    def __repr__(self):
+        return f"<FeatureProfile prefix_commands={self.prefix_commands} voice={self.voice}>"
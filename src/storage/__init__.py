@@ -0,0 +1,29 @@
+"""
+Storage backends for tracked members and guild configs
+"""
+from src.config import STORAGE_BACKEND
+from .base import StorageBackend, shard_of
+from .guild_config import DEFAULT_GUILD_CONFIG, GuildConfig
+from .journal_backend import JournalStorageBackend
+from .json_backend import JsonStorageBackend
+from .member_store import GuildMemberTable, TrackedMemberStore
+from .sqlite_backend import SqliteStorageBackend
+
+BACKENDS = {
+    JsonStorageBackend.name: JsonStorageBackend,
+    SqliteStorageBackend.name: SqliteStorageBackend,
+    JournalStorageBackend.name: JournalStorageBackend,
+}
+
+
+def create_storage_backend(name=STORAGE_BACKEND):
+    """Create the storage backend selected in config.py"""
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown storage backend '{name}' (expected one of: {', '.join(BACKENDS)})")
+    return BACKENDS[name]()
+
+
+__all__ = [
+    'StorageBackend', 'JsonStorageBackend', 'SqliteStorageBackend', 'JournalStorageBackend', 'create_storage_backend',
+    'GuildMemberTable', 'TrackedMemberStore', 'GuildConfig', 'DEFAULT_GUILD_CONFIG', 'shard_of'
+]
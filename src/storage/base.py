@@ -0,0 +1,44 @@
+"""
+Storage backend interface
+"""
+
+
+def shard_of(guild_id, shard_count):
+    """Shard a guild is assigned to by Discord"""
+    return (guild_id >> 22) % shard_count
+
+
+class StorageBackend:
+    """
+    Base class for places tracked members and guild configs are persisted
+    
+    A snapshot passed to save_guilds has the shape
+    {guild_id: {'members': {member_id: join_timestamp}, 'config': {...} or None}}
+    and fully replaces the stored data of each guild it contains.
+    
+    Journaled backends also accept individual changes through append(),
+    the persistence engine then sends those instead of guild snapshots.
+    """
+    
+    name = 'base'
+    journaled = False
+    
+    def load(self, shard_ids=None, shard_count=None):
+        """
+        Load every stored guild, or only those on the given shards
+        
+        Returns:
+            (unverified_members, guild_configs, needs_full_save)
+        """
+        raise NotImplementedError
+    
+    def save_guilds(self, snapshot):
+        """Persist the given guilds, returns the (approximate) number of bytes written"""
+        raise NotImplementedError
+    
+    def append(self, records):
+        """Persist (type, guild_id, key, value) change records, journaled backends only"""
+        raise NotImplementedError
+    
+    def close(self):
+        """Release any resources held by the backend"""
@@ -0,0 +1,58 @@
+"""
+Typed per-guild configuration
+"""
+from src.config import UNVERIFIED_ROLE_NAME, KICK_AFTER_MINUTES, SEND_DM_BEFORE_KICK
+
+
+class GuildConfig:
+    """
+    Settings of one guild
+    
+    Instances are treated as immutable: readers share them (guilds without
+    a config all get DEFAULT_GUILD_CONFIG) and changes go through replace(),
+    which returns a new object. Stored dicts are converted once at load,
+    keys missing from older files fall back to the defaults.
+    """
+    
+    __slots__ = ('role_name', 'kick_after_minutes', 'send_dm', 'log_channel_id', 'allowed_roles')
+    
+    def __init__(
+        self,
+        role_name=UNVERIFIED_ROLE_NAME,
+        kick_after_minutes=KICK_AFTER_MINUTES,
+        send_dm=SEND_DM_BEFORE_KICK,
+        log_channel_id=None,
+        allowed_roles=()
+    ):
+        self.role_name = role_name
+        self.kick_after_minutes = kick_after_minutes
+        self.send_dm = send_dm
+        self.log_channel_id = log_channel_id
+        self.allowed_roles = tuple(allowed_roles)  # Staff role names that can use bot commands
+    
+    @classmethod
+    def from_dict(cls, data):
+        """Build a config from its stored form, unknown keys are ignored"""
+        return cls(**{key: data[key] for key in cls.__slots__ if key in data})
+    
+    def to_dict(self):
+        """Stored form of the config"""
+        return {
+            'role_name': self.role_name,
+            'kick_after_minutes': self.kick_after_minutes,
+            'send_dm': self.send_dm,
+            'log_channel_id': self.log_channel_id,
+            'allowed_roles': list(self.allowed_roles)
+        }
+    
+    def replace(self, **changes):
+        """Return a copy with the given fields changed"""
+        values = {key: getattr(self, key) for key in self.__slots__}
+        values.update(changes)
+        return GuildConfig(**values)
+    
+    def __repr__(self):
+        return f"<GuildConfig role_name={self.role_name!r} kick_after_minutes={self.kick_after_minutes}>"
+
+
+DEFAULT_GUILD_CONFIG = GuildConfig()
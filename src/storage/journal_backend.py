@@ -0,0 +1,447 @@
+"""
+Append-only binary journal storage backend
+"""
+import json
+import logging
+import os
+import struct
+import sys
+import threading
+import time
+import zlib
+from array import array
+from src.config import JOURNAL_DIR, JOURNAL_COMPACT_MIN_BYTES
+from .base import StorageBackend, shard_of
+from .json_backend import JsonStorageBackend
+
+
+log = logging.getLogger(__name__)
+
+# Record types
+TRACK = 1  # guild_id, member_id, join_timestamp
+UNTRACK = 2  # guild_id, member_id
+CLEAR = 3  # guild_id, every tracked member forgotten
+CONFIG = 4  # guild_id, config dict
+GUILD = 5  # guild_id, full member table and config (snapshots and full saves)
+
+_TRACK = struct.Struct('<BQQd')
+_UNTRACK = struct.Struct('<BQQ')
+_CLEAR = struct.Struct('<BQ')
+_CONFIG = struct.Struct('<BQI')  # + JSON
+_GUILD = struct.Struct('<BQII')  # + member IDs, timestamps, JSON config (length 0 = none)
+_BATCH = struct.Struct('<II')  # payload length, CRC32 of the payload
+
+SNAPSHOT_MAGIC = b'STRXSNAP'
+SNAPSHOT_VERSION = 1
+_SNAPSHOT_HEADER = struct.Struct('<8sII')  # magic, version, meta length (+ JSON meta)
+
+# Writer directory of a single process owning every guild
+ALL_SHARDS = 'all'
+
+
+def _little_endian(arr):
+    """Array in little-endian byte order, as stored on disk"""
+    if sys.byteorder == 'big':
+        arr = array(arr.typecode, arr)
+        arr.byteswap()
+    return arr
+
+
+def _encode_guild(guild_id, ids, stamps, config):
+    config_bytes = json.dumps(config, separators=(',', ':')).encode() if config is not None else b''
+    return b''.join((
+        _GUILD.pack(GUILD, guild_id, len(ids), len(config_bytes)),
+        _little_endian(ids).tobytes(),
+        _little_endian(stamps).tobytes(),
+        config_bytes
+    ))
+
+
+def encode_records(records):
+    """Encode (type, guild_id, key, value) records into one journal payload"""
+    parts = []
+    for kind, guild_id, key, value in records:
+        if kind == TRACK:
+            parts.append(_TRACK.pack(TRACK, guild_id, key, value))
+        elif kind == UNTRACK:
+            parts.append(_UNTRACK.pack(UNTRACK, guild_id, key))
+        elif kind == CLEAR:
+            parts.append(_CLEAR.pack(CLEAR, guild_id))
+        elif kind == CONFIG:
+            config_bytes = json.dumps(key, separators=(',', ':')).encode()
+            parts.append(_CONFIG.pack(CONFIG, guild_id, len(config_bytes)) + config_bytes)
+        elif kind == GUILD:
+            # key: (member IDs array, timestamps array), value: config dict or None
+            parts.append(_encode_guild(guild_id, key[0], key[1], value))
+        else:
+            raise ValueError(f"Unknown journal record type {kind}")
+    return b''.join(parts)
+
+
+def apply_payload(payload, members, configs):
+    """Replay an encoded payload into {guild_id: {member_id: timestamp}} and {guild_id: config}"""
+    view = memoryview(payload)
+    offset = 0
+    end = len(payload)
+    while offset < end:
+        kind = payload[offset]
+        if kind == TRACK:
+            _, guild_id, member_id, stamp = _TRACK.unpack_from(payload, offset)
+            offset += _TRACK.size
+            table = members.get(guild_id)
+            if table is None:
+                table = members[guild_id] = {}
+            table[member_id] = stamp
+        elif kind == UNTRACK:
+            _, guild_id, member_id = _UNTRACK.unpack_from(payload, offset)
+            offset += _UNTRACK.size
+            table = members.get(guild_id)
+            if table is not None:
+                table.pop(member_id, None)
+        elif kind == CLEAR:
+            _, guild_id = _CLEAR.unpack_from(payload, offset)
+            offset += _CLEAR.size
+            members[guild_id] = {}
+        elif kind == CONFIG:
+            _, guild_id, length = _CONFIG.unpack_from(payload, offset)
+            offset += _CONFIG.size
+            configs[guild_id] = json.loads(bytes(view[offset:offset + length]))
+            offset += length
+        elif kind == GUILD:
+            _, guild_id, count, length = _GUILD.unpack_from(payload, offset)
+            offset += _GUILD.size
+            ids = array('Q')
+            ids.frombytes(view[offset:offset + count * 8])
+            offset += count * 8
+            stamps = array('d')
+            stamps.frombytes(view[offset:offset + count * 8])
+            offset += count * 8
+            ids, stamps = _little_endian(ids), _little_endian(stamps)
+            members[guild_id] = dict(zip(ids, stamps))
+            if length:
+                configs[guild_id] = json.loads(bytes(view[offset:offset + length]))
+            else:
+                configs.pop(guild_id, None)
+            offset += length
+        else:
+            raise ValueError(f"Unknown journal record type {kind} at offset {offset}")
+
+
+class JournalStorageBackend(StorageBackend):
+    """
+    Stores changes as binary records appended to a journal
+    
+    Every flush appends one CRC-framed batch of records (track, untrack,
+    clear, config) and fsyncs once, so a save costs bytes per change
+    instead of a rewrite of the changed guilds. A batch torn by a crash
+    fails its CRC and is cut off at the next start; everything before it
+    is intact.
+    
+    The journal is compacted into a snapshot of the whole state once it
+    outgrows the last snapshot (and JOURNAL_COMPACT_MIN_BYTES): rotate()
+    starts a new journal generation, then write_snapshot() writes the
+    state in the background and deletes the older journals. Recovery
+    loads the snapshot and replays every journal of its generation or
+    later, records are assignments so replaying one that the snapshot
+    already contains is harmless.
+    
+    Each process writes its own directory under JOURNAL_DIR: 'all' for a
+    single process, one per shard range for cluster workers. Loading every
+    shard (a single process, or the cluster coordinator before starting
+    workers) merges the directories of earlier workers back into 'all'.
+    """
+    
+    name = 'journal'
+    journaled = True
+    
+    def __init__(self, directory=JOURNAL_DIR, compact_min_bytes=JOURNAL_COMPACT_MIN_BYTES):
+        self.directory = directory
+        self.compact_min_bytes = compact_min_bytes
+        self._lock = threading.Lock()
+        self._writer_dir = None
+        self._meta = None  # Owner of the writer directory, stored in its snapshots
+        self._generation = 0
+        self._file = None
+        self.journal_bytes = 0  # Appended since the last snapshot
+        self.snapshot_bytes = 0
+    
+    # Reading
+    
+    @staticmethod
+    def _writer_name(shard_ids, shard_count):
+        if shard_ids is None:
+            return ALL_SHARDS
+        shard_ids = sorted(shard_ids)
+        return f"shards-{shard_count}-{shard_ids[0]}-{shard_ids[-1]}"
+    
+    @staticmethod
+    def _generation_of(filename):
+        """Generation of a journal-<generation>.bin file name, or None"""
+        if filename.startswith('journal-') and filename.endswith('.bin'):
+            try:
+                return int(filename[8:-4])
+            except ValueError:
+                return None
+        return None
+    
+    def _read_snapshot(self, path, members, configs):
+        """Load a snapshot file, returns its meta dict (None when missing or damaged)"""
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            return None
+        
+        try:
+            magic, version, meta_length = _SNAPSHOT_HEADER.unpack_from(data, 0)
+            body_end = len(data) - 4
+            (crc,) = struct.unpack_from('<I', data, body_end)
+            if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION or zlib.crc32(data[:body_end]) != crc:
+                raise ValueError("bad header or checksum")
+            start = _SNAPSHOT_HEADER.size
+            meta = json.loads(data[start:start + meta_length])
+            apply_payload(data[start + meta_length:body_end], members, configs)
+        except Exception as e:
+            log.error("Ignoring damaged journal snapshot %s: %s", path, e)
+            return None
+        self.snapshot_bytes = len(data)
+        return meta
+    
+    def _read_journal(self, path, members, configs, repair=False):
+        """Replay a journal file's intact batches, returns the bytes replayed"""
+        with open(path, 'rb') as f:
+            data = f.read()
+        
+        offset = 0
+        while offset + _BATCH.size <= len(data):
+            length, crc = _BATCH.unpack_from(data, offset)
+            start = offset + _BATCH.size
+            payload = data[start:start + length]
+            if len(payload) < length or zlib.crc32(payload) != crc:
+                break
+            apply_payload(payload, members, configs)
+            offset = start + length
+        
+        if offset < len(data):
+            log.warning("Journal %s ends with a torn batch, dropping %d byte(s)", path, len(data) - offset)
+            if repair:
+                with open(path, 'r+b') as f:
+                    f.truncate(offset)
+                    os.fsync(f.fileno())
+        return offset
+    
+    def _read_writer(self, writer_dir, members, configs, repair=False):
+        """
+        Apply a writer directory's snapshot and journals to the given state
+        
+        Returns (meta, generation of the newest journal, journal bytes), meta
+        is None when the directory has no usable snapshot.
+        """
+        meta = self._read_snapshot(os.path.join(writer_dir, 'snapshot.bin'), members, configs)
+        first = meta['generation'] if meta else 0
+        
+        generations = sorted(
+            generation for generation in map(self._generation_of, os.listdir(writer_dir))
+            if generation is not None and generation >= first
+        )
+        journal_bytes = 0
+        for generation in generations:
+            journal_bytes += self._read_journal(
+                os.path.join(writer_dir, f"journal-{generation}.bin"), members, configs, repair
+            )
+        return meta, (generations[-1] if generations else first), journal_bytes
+    
+    def _read_state(self, shard_ids=None, shard_count=None, repair=False):
+        """
+        Merged state of the writer directories a process may read
+        
+        Returns (members, configs, writer directories read, newest generation
+        of this process's writer). A worker reads 'all' and its own
+        directory, loading every shard also merges every other directory.
+        """
+        members = {}
+        configs = {}
+        own_name = self._writer_name(shard_ids, shard_count)
+        base_dir = os.path.join(self.directory, ALL_SHARDS)
+        
+        writers = []
+        generation = 0
+        if os.path.isdir(base_dir):
+            _, base_generation, _ = self._read_writer(base_dir, members, configs, repair)
+            writers.append(base_dir)
+            if own_name == ALL_SHARDS:
+                generation = base_generation
+        
+        # Workers' state overrides 'all' for the guilds they own
+        others = []
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            if name == ALL_SHARDS or not os.path.isdir(path):
+                continue
+            if own_name != ALL_SHARDS and name != own_name:
+                continue
+            worker_members, worker_configs = {}, {}
+            meta, worker_generation, _ = self._read_writer(path, worker_members, worker_configs, repair)
+            if meta is None:
+                log.error("Journal directory %s has no snapshot, skipping it", path)
+                continue
+            others.append((meta.get('created', 0), path, meta, worker_members, worker_configs))
+            if name == own_name:
+                generation = worker_generation
+        
+        for _, path, meta, worker_members, worker_configs in sorted(others, key=lambda entry: entry[0]):
+            owned = frozenset(meta['shard_ids'])
+            count = meta['shard_count']
+            for state in (members, configs):
+                for guild_id in [guild_id for guild_id in state if shard_of(guild_id, count) in owned]:
+                    del state[guild_id]
+            members.update(worker_members)
+            configs.update(worker_configs)
+            writers.append(path)
+        
+        if shard_ids is not None:
+            shard_ids = frozenset(shard_ids)
+            members = {guild_id: data for guild_id, data in members.items() if shard_of(guild_id, shard_count) in shard_ids}
+            configs = {guild_id: data for guild_id, data in configs.items() if shard_of(guild_id, shard_count) in shard_ids}
+        return members, configs, writers, generation
+    
+    def load(self, shard_ids=None, shard_count=None):
+        """
+        Recover the state (snapshot + journal replay) and start a fresh journal
+        
+        The recovered state is written as a new snapshot right away, so this
+        process's journal starts empty. Without a journal directory the JSON
+        data files are imported.
+        """
+        if os.path.isdir(self.directory):
+            members, configs, writers, generation = self._read_state(shard_ids, shard_count, repair=True)
+        else:
+            members, configs, _ = JsonStorageBackend().load(shard_ids, shard_count)
+            writers, generation = [], 0
+            if members or configs:
+                log.info("Importing %d guild(s) from JSON into %s", len(set(members) | set(configs)), self.directory)
+        
+        name = self._writer_name(shard_ids, shard_count)
+        self._writer_dir = os.path.join(self.directory, name)
+        self._meta = {
+            'shard_ids': sorted(shard_ids) if shard_ids is not None else None,
+            'shard_count': shard_count
+        }
+        os.makedirs(self._writer_dir, exist_ok=True)
+        
+        self._generation = generation
+        generation = self.rotate()
+        state = {
+            guild_id: (
+                array('Q', members.get(guild_id, {}).keys()),
+                array('d', members.get(guild_id, {}).values()),
+                configs.get(guild_id)
+            )
+            for guild_id in set(members) | set(configs)
+        }
+        self.write_snapshot(state, generation)
+        
+        if name == ALL_SHARDS:
+            # Merged into 'all', earlier workers' directories are no longer needed
+            for path in writers:
+                if path != self._writer_dir:
+                    self._remove_writer(path)
+        return members, configs, False
+    
+    # Writing
+    
+    def append(self, records):
+        """Append records as one batch and fsync, returns the bytes written"""
+        if not records:
+            return 0
+        payload = encode_records(records)
+        frame = _BATCH.pack(len(payload), zlib.crc32(payload)) + payload
+        with self._lock:
+            start = self._file.tell()
+            try:
+                self._file.write(frame)
+                self._file.flush()
+                os.fsync(self._file.fileno())
+            except Exception:
+                # Don't leave a torn batch in front of the next one
+                self._file.truncate(start)
+                raise
+            self.journal_bytes += len(frame)
+        return len(frame)
+    
+    def save_guilds(self, snapshot):
+        """Append a full-guild record for each guild of the snapshot"""
+        records = []
+        for guild_id, data in snapshot.items():
+            members = data.get('members', {})
+            records.append((GUILD, guild_id, (array('Q', members.keys()), array('d', members.values())), data.get('config')))
+        return self.append(records)
+    
+    def needs_compaction(self):
+        """Whether the journal outgrew the last snapshot"""
+        return self.journal_bytes >= max(self.compact_min_bytes, self.snapshot_bytes)
+    
+    def rotate(self):
+        """Start the next journal generation, returns it for write_snapshot()"""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+            self._generation += 1
+            self._file = open(os.path.join(self._writer_dir, f"journal-{self._generation}.bin"), 'ab')
+            self.journal_bytes = 0
+            return self._generation
+    
+    def write_snapshot(self, state, generation):
+        """
+        Write the state as the snapshot journals from `generation` on build upon
+        
+        state: {guild_id: (member IDs array, timestamps array, config dict or None)}
+        The snapshot is written to a temporary file and renamed, then the
+        journals it replaces are deleted. Returns the bytes written.
+        """
+        meta = dict(self._meta, generation=generation, created=time.time())
+        meta_bytes = json.dumps(meta).encode()
+        parts = [_SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, len(meta_bytes)), meta_bytes]
+        parts.extend(_encode_guild(guild_id, ids, stamps, config) for guild_id, (ids, stamps, config) in state.items())
+        body = b''.join(parts)
+        data = body + struct.pack('<I', zlib.crc32(body))
+        
+        path = os.path.join(self._writer_dir, 'snapshot.bin')
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+        self._fsync_dir(self._writer_dir)
+        self.snapshot_bytes = len(data)
+        
+        for filename in os.listdir(self._writer_dir):
+            old = self._generation_of(filename)
+            if old is not None and old < generation:
+                os.remove(os.path.join(self._writer_dir, filename))
+        return len(data)
+    
+    @staticmethod
+    def _fsync_dir(path):
+        """Make a rename in the directory durable (not supported on Windows)"""
+        if os.name != 'posix':
+            return
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+    
+    @staticmethod
+    def _remove_writer(path):
+        for filename in os.listdir(path):
+            os.remove(os.path.join(path, filename))
+        os.rmdir(path)
+    
+    def close(self):
+        """Close the journal file"""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
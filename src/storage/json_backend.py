@@ -0,0 +1,122 @@
+"""
+JSON file storage backend (default)
+"""
+import json
+import logging
+import os
+from src.config import MEMBERS_DATA_FILE, GUILD_CONFIG_FILE, DATA_DIR
+from .base import StorageBackend, shard_of
+
+
+log = logging.getLogger(__name__)
+
+
+class JsonStorageBackend(StorageBackend):
+    """Stores each guild in its own JSON file under DATA_DIR"""
+    
+    name = 'json'
+    
+    def __init__(self, data_dir=DATA_DIR):
+        self.data_dir = data_dir
+    
+    def load(self, shard_ids=None, shard_count=None):
+        """
+        Load tracked members and guild configs
+        
+        Reads the per-guild files in the data directory. When that directory
+        does not exist yet the legacy flat JSON files are loaded instead, and
+        the caller is expected to save everything once to migrate them.
+        With shard_ids only the guilds on those shards are loaded.
+        """
+        if shard_ids is None:
+            owned = None
+        else:
+            shard_ids = frozenset(shard_ids)
+            owned = lambda guild_id: shard_of(guild_id, shard_count) in shard_ids
+        
+        if not os.path.isdir(self.data_dir):
+            members = self.load_legacy_members()
+            configs = self.load_legacy_configs()
+            if owned is not None:
+                members = {guild_id: data for guild_id, data in members.items() if owned(guild_id)}
+                configs = {guild_id: data for guild_id, data in configs.items() if owned(guild_id)}
+            return members, configs, bool(members or configs)
+        
+        unverified_members = {}
+        guild_configs = {}
+        for filename in os.listdir(self.data_dir):
+            if not filename.endswith('.json'):
+                continue
+            try:
+                guild_id = int(filename[:-5])
+                if owned is not None and not owned(guild_id):
+                    continue
+                with open(os.path.join(self.data_dir, filename), 'r') as f:
+                    data = json.load(f)
+            except Exception as e:
+                log.error("Error loading guild data from %s: %s", filename, e)
+                continue
+            
+            if data.get('config') is not None:
+                guild_configs[guild_id] = data['config']
+            unverified_members[guild_id] = {
+                int(member_id): timestamp
+                for member_id, timestamp in data.get('members', {}).items()
+            }
+        return unverified_members, guild_configs, False
+    
+    @staticmethod
+    def load_legacy_members():
+        """Load tracked members from the legacy JSON file"""
+        if os.path.exists(MEMBERS_DATA_FILE):
+            try:
+                with open(MEMBERS_DATA_FILE, 'r') as f:
+                    data = json.load(f)
+                    # Convert string keys to integers
+                    return {
+                        int(guild_id): {
+                            int(member_id): timestamp
+                            for member_id, timestamp in members.items()
+                        }
+                        for guild_id, members in data.items()
+                    }
+            except Exception as e:
+                log.error("Error loading member data: %s", e)
+                return {}
+        return {}
+    
+    @staticmethod
+    def load_legacy_configs():
+        """Load guild configurations from the legacy JSON file"""
+        if os.path.exists(GUILD_CONFIG_FILE):
+            try:
+                with open(GUILD_CONFIG_FILE, 'r') as f:
+                    data = json.load(f)
+                    # Convert string keys to integers
+                    return {
+                        int(guild_id): config
+                        for guild_id, config in data.items()
+                    }
+            except Exception as e:
+                log.error("Error loading guild configs: %s", e)
+                return {}
+        return {}
+    
+    def save_guilds(self, snapshot):
+        """Atomically write the data file of each guild (temp file + rename)"""
+        os.makedirs(self.data_dir, exist_ok=True)
+        bytes_written = 0
+        
+        for guild_id, data in snapshot.items():
+            path = os.path.join(self.data_dir, f"{guild_id}.json")
+            tmp_path = f"{path}.tmp"
+            payload = json.dumps(data, separators=(',', ':'))
+            
+            with open(tmp_path, 'w') as f:
+                f.write(payload)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, path)
+            bytes_written += len(payload)
+        
+        return bytes_written
@@ -0,0 +1,233 @@
+"""
+Compact array-backed in-memory store for tracked members
+"""
+from array import array
+from bisect import bisect_left, bisect_right
+from collections.abc import MutableMapping
+
+
+class GuildMemberTable(MutableMapping):
+    """
+    Mapping of member ID -> join timestamp for one guild
+    
+    Entries live in two pairs of parallel arrays instead of Python objects:
+    sorted member IDs ('Q') with their timestamps ('d'), and the same
+    entries ordered by (timestamp, member ID) for range queries. That is 32
+    bytes per entry. Lookups are binary searches; inserts and removals are a
+    binary search plus a memmove of the array tail.
+    
+    `version` changes on every modification so views derived from the
+    table (e.g. rendered /status pages) can tell when they are stale, and
+    the owning TrackedMemberStore's running total follows inserts and
+    removals.
+    """
+    
+    __slots__ = ('_ids', '_stamps', '_by_time', '_time_ids', 'version', '_store')
+    
+    def __init__(self, entries=None):
+        self._ids = array('Q')
+        self._stamps = array('d')
+        self._by_time = array('d')
+        self._time_ids = array('Q')
+        self.version = 0
+        self._store = None  # TrackedMemberStore holding this table
+        if entries:
+            self._bulk_load(entries.items() if hasattr(entries, 'items') else entries)
+    
+    def _bulk_load(self, items):
+        """Build both indexes at once from (member_id, timestamp) pairs"""
+        by_id = sorted(dict(items).items())
+        self._ids = array('Q', (member_id for member_id, _ in by_id))
+        self._stamps = array('d', (stamp for _, stamp in by_id))
+        
+        by_time = sorted(by_id, key=lambda entry: (entry[1], entry[0]))
+        self._by_time = array('d', (stamp for _, stamp in by_time))
+        self._time_ids = array('Q', (member_id for member_id, _ in by_time))
+    
+    def _index(self, member_id):
+        """Position of member_id in the ID index, or -1"""
+        i = bisect_left(self._ids, member_id)
+        if i < len(self._ids) and self._ids[i] == member_id:
+            return i
+        return -1
+    
+    def _time_index(self, member_id, stamp):
+        """Position of (stamp, member_id) in the time index"""
+        lo = bisect_left(self._by_time, stamp)
+        hi = bisect_right(self._by_time, stamp, lo)
+        # Entries with equal timestamps are ordered by member ID
+        return bisect_left(self._time_ids, member_id, lo, hi)
+    
+    def __getitem__(self, member_id):
+        i = self._index(member_id)
+        if i < 0:
+            raise KeyError(member_id)
+        return self._stamps[i]
+    
+    def __setitem__(self, member_id, stamp):
+        i = bisect_left(self._ids, member_id)
+        if i < len(self._ids) and self._ids[i] == member_id:
+            old = self._stamps[i]
+            if old == stamp:
+                return
+            j = self._time_index(member_id, old)
+            del self._by_time[j]
+            del self._time_ids[j]
+            self._stamps[i] = stamp
+        else:
+            self._ids.insert(i, member_id)
+            self._stamps.insert(i, stamp)
+            if self._store is not None:
+                self._store._total += 1
+        
+        j = self._time_index(member_id, stamp)
+        self._by_time.insert(j, stamp)
+        self._time_ids.insert(j, member_id)
+        self.version += 1
+    
+    def __delitem__(self, member_id):
+        i = self._index(member_id)
+        if i < 0:
+            raise KeyError(member_id)
+        
+        j = self._time_index(member_id, self._stamps[i])
+        del self._ids[i]
+        del self._stamps[i]
+        del self._by_time[j]
+        del self._time_ids[j]
+        self.version += 1
+        if self._store is not None:
+            self._store._total -= 1
+    
+    def __contains__(self, member_id):
+        return self._index(member_id) >= 0
+    
+    def __len__(self):
+        return len(self._ids)
+    
+    def __iter__(self):
+        return iter(self._ids)
+    
+    def get(self, member_id, default=None):
+        i = self._index(member_id)
+        return self._stamps[i] if i >= 0 else default
+    
+    def items(self):
+        """(member_id, timestamp) pairs in member ID order"""
+        return zip(self._ids, self._stamps)
+    
+    def values(self):
+        """Timestamps in member ID order"""
+        return iter(self._stamps)
+    
+    def timestamps(self):
+        """The raw timestamp array in member ID order (read-only use)"""
+        return self._stamps
+    
+    def arrays(self):
+        """Copies of the member ID and timestamp arrays, in member ID order"""
+        return self._ids[:], self._stamps[:]
+    
+    def due_before(self, stamp):
+        """[(member_id, timestamp)] joined at or before stamp, oldest first"""
+        hi = bisect_right(self._by_time, stamp)
+        return list(zip(self._time_ids[:hi], self._by_time[:hi]))
+    
+    def items_by_time(self, start=0, stop=None):
+        """(member_id, timestamp) pairs ordered by timestamp, sliced [start:stop]"""
+        return list(zip(self._time_ids[start:stop], self._by_time[start:stop]))
+    
+    def clear(self):
+        if self._store is not None:
+            self._store._total -= len(self._ids)
+        self._ids = array('Q')
+        self._stamps = array('d')
+        self._by_time = array('d')
+        self._time_ids = array('Q')
+        self.version += 1
+    
+    @property
+    def nbytes(self):
+        """Bytes used by the entry arrays"""
+        return sum(
+            len(arr) * arr.itemsize
+            for arr in (self._ids, self._stamps, self._by_time, self._time_ids)
+        )
+    
+    def __repr__(self):
+        return f"<GuildMemberTable entries={len(self)}>"
+
+
+class TrackedMemberStore(MutableMapping):
+    """
+    Mapping of guild ID -> GuildMemberTable
+    
+    Drop-in replacement for the {guild_id: {member_id: timestamp}} dict:
+    assigning a plain dict to a guild converts it to a table. The number of
+    tracked members across all guilds is kept as a running total.
+    """
+    
+    def __init__(self, data=None):
+        self._guilds = {}
+        self._total = 0
+        if data:
+            for guild_id, members in data.items():
+                self[guild_id] = members
+    
+    def __getitem__(self, guild_id):
+        return self._guilds[guild_id]
+    
+    def __setitem__(self, guild_id, members):
+        if not isinstance(members, GuildMemberTable):
+            members = GuildMemberTable(members)
+        elif members._store is not None and members._store is not self:
+            raise ValueError("table already belongs to another store")
+        if guild_id in self._guilds:
+            self._detach(self._guilds[guild_id])
+        members._store = self
+        self._total += len(members)
+        self._guilds[guild_id] = members
+    
+    def __delitem__(self, guild_id):
+        self._detach(self._guilds.pop(guild_id))
+    
+    def _detach(self, table):
+        table._store = None
+        self._total -= len(table)
+    
+    def __contains__(self, guild_id):
+        return guild_id in self._guilds
+    
+    def __iter__(self):
+        return iter(self._guilds)
+    
+    def __len__(self):
+        return len(self._guilds)
+    
+    def get(self, guild_id, default=None):
+        return self._guilds.get(guild_id, default)
+    
+    def setdefault(self, guild_id, default=None):
+        table = self._guilds.get(guild_id)
+        if table is None:
+            self[guild_id] = default or {}
+            table = self._guilds[guild_id]
+        return table
+    
+    def items(self):
+        return self._guilds.items()
+    
+    def values(self):
+        return self._guilds.values()
+    
+    def keys(self):
+        return self._guilds.keys()
+    
+    def total_members(self):
+        """Number of tracked members across all guilds"""
+        return self._total
+    
+    @property
+    def nbytes(self):
+        """Bytes used by the entry arrays of every guild"""
+        return sum(table.nbytes for table in self._guilds.values())
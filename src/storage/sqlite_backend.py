@@ -0,0 +1,140 @@
+"""
+SQLite storage backend
+"""
+import json
+import logging
+import sqlite3
+import threading
+from src.config import KICK_AFTER_MINUTES, SQLITE_DATABASE_FILE
+from .base import StorageBackend
+from .json_backend import JsonStorageBackend
+
+
+log = logging.getLogger(__name__)
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tracked_members (
+    guild_id INTEGER NOT NULL,
+    member_id INTEGER NOT NULL,
+    joined_at REAL NOT NULL,
+    deadline REAL NOT NULL,
+    PRIMARY KEY (guild_id, member_id)
+);
+DROP INDEX IF EXISTS idx_tracked_members_deadline;
+CREATE TABLE IF NOT EXISTS guild_configs (
+    guild_id INTEGER PRIMARY KEY,
+    config TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+class SqliteStorageBackend(StorageBackend):
+    """
+    Stores tracked members and guild configs in a SQLite database
+    
+    Runs in WAL mode so a crash mid-write never leaves a half-written file,
+    and writes each snapshot in a single transaction. Members are indexed by
+    (guild_id, member_id).
+    """
+    
+    name = 'sqlite'
+    
+    def __init__(self, path=SQLITE_DATABASE_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        # Saves run on a worker thread, access is serialized by _lock
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._conn.commit()
+        self._migrated_from_json = self._migrate_from_json()
+    
+    def _migrate_from_json(self):
+        """Import the JSON data files once, the first time the database is used"""
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = 'json_migrated'").fetchone()
+        if row is not None:
+            return False
+        
+        members, configs, _ = JsonStorageBackend().load()
+        if members or configs:
+            guild_ids = set(members) | set(configs)
+            self.save_guilds({
+                guild_id: {
+                    'members': members.get(guild_id, {}),
+                    'config': configs.get(guild_id)
+                }
+                for guild_id in guild_ids
+            })
+            log.info("Migrated %d guild(s) from JSON into %s", len(guild_ids), self.path)
+        
+        with self._lock, self._conn:
+            self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('json_migrated', '1')")
+        return bool(members or configs)
+    
+    def load(self, shard_ids=None, shard_count=None):
+        """Load every tracked member and guild config, or those of the given shards"""
+        unverified_members = {}
+        guild_configs = {}
+        
+        where, params = '', ()
+        if shard_ids is not None:
+            shard_ids = list(shard_ids)
+            where = f" WHERE ((guild_id >> 22) % ?) IN ({', '.join('?' * len(shard_ids))})"
+            params = (shard_count, *shard_ids)
+        
+        with self._lock:
+            for guild_id, config in self._conn.execute("SELECT guild_id, config FROM guild_configs" + where, params):
+                guild_configs[guild_id] = json.loads(config)
+            
+            for guild_id, member_id, joined_at in self._conn.execute(
+                "SELECT guild_id, member_id, joined_at FROM tracked_members" + where, params
+            ):
+                members = unverified_members.get(guild_id)
+                if members is None:
+                    members = unverified_members[guild_id] = {}
+                members[member_id] = joined_at
+        
+        return unverified_members, guild_configs, False
+    
+    def save_guilds(self, snapshot):
+        """Replace the stored rows of each guild in one transaction"""
+        bytes_written = 0
+        
+        with self._lock, self._conn:
+            for guild_id, data in snapshot.items():
+                config = data.get('config')
+                kick_after = (config or {}).get('kick_after_minutes', KICK_AFTER_MINUTES)
+                offset = kick_after * 60
+                
+                rows = [
+                    (guild_id, member_id, joined_at, joined_at + offset)
+                    for member_id, joined_at in data.get('members', {}).items()
+                ]
+                self._conn.execute("DELETE FROM tracked_members WHERE guild_id = ?", (guild_id,))
+                self._conn.executemany(
+                    "INSERT INTO tracked_members (guild_id, member_id, joined_at, deadline) VALUES (?, ?, ?, ?)",
+                    rows
+                )
+                bytes_written += len(rows) * 32
+                
+                if config is not None:
+                    payload = json.dumps(config, separators=(',', ':'))
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO guild_configs (guild_id, config) VALUES (?, ?)",
+                        (guild_id, payload)
+                    )
+                    bytes_written += len(payload)
+        
+        return bytes_written
+    
+    def close(self):
+        """Close the database connection"""
+        with self._lock:
+            self._conn.close()
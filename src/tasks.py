@@ -1,314 +1,522 @@
 """
 Background tasks for the Auto-Kick Bot
 """
+import asyncio
+import logging
+import time
 import discord
-from discord import activity
-from discord.ext import tasks
-from datetime import datetime, timedelta
-from src.config import CHECK_INTERVAL_MINUTES
+from datetime import datetime
+from src.config import CHECK_INTERVAL_MINUTES, PRESENCE_MIN_INTERVAL_SECONDS, SCAN_CONCURRENCY, SCAN_YIELD_EVERY
+from src.utils import has_role
+from src.utils.failure_tracker import MISSING_PERMISSION, ROLE_HIERARCHY, FORBIDDEN
 
 
-async def scan_existing_members(bot):
-    """Scan all guilds for existing members with the unverified role"""
-    print("\n🔍 Scanning for existing unverified members...")
-    total_found = 0
-    newly_tracked = 0
+log = logging.getLogger(__name__)
+
+
+async def _scan_guild(bot, guild, semaphore):
+    """
+    Track every member holding the unverified role in one guild
     
-    for guild in bot.guilds:
-        try:
+    Returns a dict with the counts and a timing breakdown (milliseconds)
+    """
+    async with semaphore:
+        result = {'guild': guild, 'found': 0, 'new': 0, 'role_ms': 0.0, 'members_ms': 0.0, 'track_ms': 0.0}
+        
+        started = time.perf_counter()
+        unverified_role = bot.get_unverified_role(guild)
+        result['role_ms'] = (time.perf_counter() - started) * 1000
+        
+        if not unverified_role:
             config = bot.get_guild_config(guild.id)
-            unverified_role = discord.utils.get(guild.roles, name=config['role_name'])
+            log.warning("Role %r not found", config.role_name, extra={'guild_id': guild.id})
+            return result
+        
+        # Only the role's holders are visited, not every cached member
+        started = time.perf_counter()
+        if bot.member_cache is not None:
+            # Low-memory mode: chunk the guild, keeping only the role's holders
+            await bot.member_cache.load_guild(guild)
+        holders = unverified_role.members
+        result['members_ms'] = (time.perf_counter() - started) * 1000
+        
+        started = time.perf_counter()
+        tracked = bot.unverified_members.setdefault(guild.id, {})
+        join_timestamp = datetime.now().timestamp()
+        # Per-member lines are only built when DEBUG is enabled for this module
+        debug = log.isEnabledFor(logging.DEBUG)
+        for index, member in enumerate(holders, 1):
+            if member.id not in tracked:
+                bot.track_member(guild.id, member.id, join_timestamp)
+                result['new'] += 1
+                if debug:
+                    log.debug("Started tracking %s", member.id, extra={'guild_id': guild.id})
+            elif debug:
+                log.debug("Already tracking %s", member.id, extra={'guild_id': guild.id})
             
-            if not unverified_role:
-                print(f"[{guild.name}] ⚠️ Warning: '{config['role_name']}' role not found")
-                continue
-            
-            guild_id = guild.id
-            if guild_id not in bot.unverified_members:
-                bot.unverified_members[guild_id] = {}
-            
-            found_in_guild = 0
-            for member in guild.members:
-                if unverified_role in member.roles:
-                    if member.id not in bot.unverified_members[guild_id]:
-                        bot.unverified_members[guild_id][member.id] = datetime.now().timestamp()
-                        newly_tracked += 1
-                        print(f"[{guild.name}] 🆕 New unverified member: {member.name}")
-                    else:
-                        original_time = datetime.fromtimestamp(bot.unverified_members[guild_id][member.id])
-                        print(f"[{guild.name}] 🔄 Already tracking {member.name} (since {original_time.strftime('%H:%M:%S')})")
-                    found_in_guild += 1
+            # Let other guilds and events run during very large scans
+            if index % SCAN_YIELD_EVERY == 0:
+                await asyncio.sleep(0)
+        result['track_ms'] = (time.perf_counter() - started) * 1000
+        result['found'] = len(holders)
+        return result
+
+
+async def scan_existing_members(bot, guilds=None):
+    """Scan guilds (all by default) for existing members with the unverified role"""
+    if guilds is None:
+        guilds = bot.guilds
+    
+    log.info("Scanning %d server(s) for existing unverified members", len(guilds))
+    started = time.perf_counter()
+    semaphore = asyncio.Semaphore(SCAN_CONCURRENCY)
+    
+    results = await asyncio.gather(
+        *(_scan_guild(bot, guild, semaphore) for guild in guilds),
+        return_exceptions=True
+    )
+    
+    total_found = 0
+    newly_tracked = 0
+    timings = []
+    for guild, result in zip(guilds, results):
+        if isinstance(result, Exception):
+            log.error("Error in scan", exc_info=result, extra={'guild_id': guild.id})
+            continue
+        
+        total_found += result['found']
+        newly_tracked += result['new']
+        total_ms = result['role_ms'] + result['members_ms'] + result['track_ms']
+        timings.append((total_ms, result))
+        
+        if result['new'] > 0:
+            bot.save_data(guild.id)
+        if result['found'] > 0:
+            log.info(
+                "Scanned %d unverified (%d new) in %.1fms", result['found'], result['new'], total_ms,
+                extra={
+                    'guild_id': guild.id,
+                    'role_ms': round(result['role_ms'], 1),
+                    'members_ms': round(result['members_ms'], 1),
+                    'track_ms': round(result['track_ms'], 1)
+                }
+            )
+    
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    
+    # Show where startup time went when many guilds are scanned
+    if len(timings) > 5:
+        slowest = sorted(timings, key=lambda item: item[0], reverse=True)[:5]
+        log.info("Slowest servers: %s", ", ".join(
+            f"{result['guild'].id} ({total_ms:.1f}ms)" for total_ms, result in slowest
+        ))
+    
+    log.info(
+        "Scan complete in %.0fms, tracking %d member(s) total (%d newly added)", elapsed_ms, total_found, newly_tracked,
+        extra={'guilds': len(guilds), 'found': total_found, 'new': newly_tracked}
+    )
+
+
+def _retry_later(bot, guild_id, member_id):
+    """Reschedule a member that could not be handled yet"""
+    if member_id not in bot.unverified_members.get(guild_id, {}):
+        return
+    bot.scheduler.schedule(guild_id, member_id, time.time() + CHECK_INTERVAL_MINUTES * 60)
+
+
+def _hierarchy_embed(bot_member, blocked):
+    """Summary embed for members whose top role is above the bot's"""
+    highest = max((member.top_role for member in blocked), key=lambda role: role.position)
+    names = ", ".join(f"`{member.name}`" for member in blocked[:10])
+    if len(blocked) > 10:
+        names += f" and {len(blocked) - 10} more"
+    
+    error_embed = discord.Embed(
+        title="⚠️ Auto-Kick Failed - Role Hierarchy",
+        description=f"Cannot kick **{len(blocked)}** overdue member(s): {names}",
+        color=0xe74c3c,
+        timestamp=datetime.now()
+    )
+    error_embed.add_field(
+        name="❌ Issue",
+        value=f"Bot role: `{bot_member.top_role.name}` (pos: {bot_member.top_role.position})\n"
+              f"Highest user role: `{highest.name}` (pos: {highest.position})\n\n"
+              f"Bot's role must have a **higher position number**",
+        inline=False
+    )
+    error_embed.add_field(
+        name="✅ Fix",
+        value=f"1. Go to **Server Settings → Roles**\n"
+              f"2. Drag `{bot_member.top_role.name}` **ABOVE** `{highest.name}`\n"
+              f"3. Save changes",
+        inline=False
+    )
+    error_embed.set_footer(text="Members remain tracked • Reported again only if this changes")
+    return error_embed
+
+
+def _missing_permission_embed(bot_member, overdue_count):
+    """Summary embed for a bot without the Kick Members permission"""
+    error_embed = discord.Embed(
+        title="⚠️ Auto-Kick Failed - Missing Permission",
+        description=f"Cannot kick **{overdue_count}** overdue member(s)",
+        color=0xe74c3c,
+        timestamp=datetime.now()
+    )
+    error_embed.add_field(
+        name="❌ Issue",
+        value="Bot is missing **Kick Members** permission",
+        inline=False
+    )
+    error_embed.add_field(
+        name="✅ Fix",
+        value=f"1. Go to **Server Settings → Roles**\n"
+              f"2. Find `{bot_member.top_role.name}` role\n"
+              f"3. Enable **Kick Members** permission",
+        inline=False
+    )
+    error_embed.set_footer(text="Members remain tracked • Kicks resume once the permission is granted")
+    return error_embed
+
+
+def _forbidden_embed(member, error):
+    """Embed for a kick Discord rejected with 403"""
+    error_embed = discord.Embed(
+        title="⚠️ Auto-Kick Failed - Forbidden",
+        description=f"Cannot kick **{member.mention}** `{member.name}`",
+        color=0xe74c3c,
+        timestamp=datetime.now()
+    )
+    error_embed.add_field(
+        name="❌ Error",
+        value=f"```{str(error)}```",
+        inline=False
+    )
+    error_embed.add_field(
+        name="Possible Causes",
+        value="• User is server owner (cannot be kicked)\n"
+              "• Hidden role hierarchy issue\n"
+              "• Bot permissions issue",
+        inline=False
+    )
+    error_embed.set_footer(text="User remains tracked • Similar errors are suppressed for a while")
+    return error_embed
+
+
+def _submit_kick(bot, guild, member, config, minutes_elapsed):
+    """Queue a kick on the guild's executor queue and handle its outcome"""
+    guild_id = guild.id
+    member_id = member.id
+    
+    async def kick():
+        # The member may have verified or left while the kick was queued
+        if member_id not in bot.unverified_members.get(guild_id, {}):
+            return False
+        bot.metrics.kick_attempts.inc()
+        await member.kick(reason=f"Auto-kick: Did not verify within {config.kick_after_minutes} minutes")
+        return True
+    
+    async def on_done(kicked, error):
+        if error is None:
+            if not kicked:
+                return
             
-            if found_in_guild > 0:
-                total_found += found_in_guild
+            bot.metrics.kicks_succeeded.inc()
+            log.info("Kicked %s after %d min", member_id, minutes_elapsed, extra={'guild_id': guild_id})
+            bot.failures.resolve(guild_id, FORBIDDEN)
+            try:
+                await bot.log_kick(guild, member, minutes_elapsed)
+            except Exception as e:
+                log.warning("Could not log kick: %s", e, extra={'guild_id': guild_id})
             
-            bot.save_data()
-        except Exception as e:
-            print(f"[{guild.name}] ❌ Error in scan: {e}")
-            import traceback
-            traceback.print_exc()
+            if bot.untrack_member(guild_id, member_id):
+                bot.save_data(guild_id)
+            return
+        
+        if isinstance(error, discord.NotFound):
+            bot.metrics.kicks_not_found.inc()
+            log.debug("Member %s already gone, removing from tracking", member_id, extra={'guild_id': guild_id})
+            if bot.untrack_member(guild_id, member_id):
+                bot.save_data(guild_id)
+            return
+        
+        if isinstance(error, discord.Forbidden):
+            bot.metrics.kicks_forbidden.inc()
+            if bot.failures.should_report(guild_id, FORBIDDEN, error.code):
+                log.error("Forbidden kicking %s: %s", member_id, error, extra={'guild_id': guild_id})
+                bot.send_log_embed(guild, _forbidden_embed(member, error))
+        else:
+            bot.metrics.kicks_failed.inc()
+            log.error(
+                "Unexpected error kicking %s: %s: %s", member_id, type(error).__name__, error,
+                extra={'guild_id': guild_id}
+            )
+        
+        # Keep the member tracked for a retry
+        _retry_later(bot, guild_id, member_id)
     
-    if newly_tracked > 0:
-        print(f"✅ Scan complete! Tracking {total_found} member(s) total ({newly_tracked} newly added)\n")
-    else:
-        print(f"✅ Scan complete! Tracking {total_found} member(s) total (all timestamps preserved)\n")
+    bot.kick_executor.submit(guild_id, kick, on_done)
 
 
-def setup_background_tasks(bot):
-    """Setup and start background tasks"""
+async def process_due_members(bot, due):
+    """Handle members whose kick deadline has passed"""
+    now = datetime.now()
+    started = time.perf_counter()
     
-    print("🔧 Setting up background tasks...")
+    total_queued = 0
+    total_checked = 0
     
-    @tasks.loop(minutes=CHECK_INTERVAL_MINUTES)
-    async def check_unverified_task():
-        """Periodically check and kick members who have exceeded the time limit"""
+    # Group due entries per guild so guild-level checks run once
+    due_by_guild = {}
+    for guild_id, member_id, _deadline in due:
+        due_by_guild.setdefault(guild_id, []).append(member_id)
+    
+    for guild_id, member_ids in due_by_guild.items():
         try:
-            now = datetime.now()
-            print(f"\n{'='*60}")
-            print(f"🔍 AUTO-KICK CHECK: {now.strftime('%Y-%m-%d %H:%M:%S')}")
-            print(f"{'='*60}")
+            guild = bot.get_guild(guild_id)
             
-            total_kicked = 0
-            total_checked = 0
+            if not guild:
+                log.warning("Guild not found (bot may have been removed)", extra={'guild_id': guild_id})
+                for member_id in member_ids:
+                    _retry_later(bot, guild_id, member_id)
+                continue
             
-            for guild_id, members in list(bot.unverified_members.items()):
+            config = bot.get_guild_config(guild_id)
+            kick_threshold_seconds = config.kick_after_minutes * 60
+            unverified_role = bot.get_unverified_role(guild)
+            
+            if not unverified_role:
+                log.warning("Role %r not found, skipping", config.role_name, extra={'guild_id': guild_id})
+                for member_id in member_ids:
+                    _retry_later(bot, guild_id, member_id)
+                continue
+            
+            bot_member = guild.get_member(bot.user.id)
+            if not bot_member:
+                log.warning("Bot member object not found, skipping", extra={'guild_id': guild_id})
+                for member_id in member_ids:
+                    _retry_later(bot, guild_id, member_id)
+                continue
+            
+            log.debug(
+                "Due: %d of %d tracked member(s)", len(member_ids), len(bot.unverified_members.get(guild_id, {})),
+                extra={
+                    'guild_id': guild_id,
+                    'threshold_minutes': config.kick_after_minutes,
+                    'role_id': unverified_role.id,
+                    'bot_role_position': bot_member.top_role.position
+                }
+            )
+            
+            # PRE-CHECK: Bot permissions, no kick can succeed without them
+            if not bot_member.guild_permissions.kick_members:
+                if bot.failures.should_report(guild_id, MISSING_PERMISSION):
+                    log.error(
+                        "Missing 'Kick Members' permission, skipping %d kick(s)", len(member_ids),
+                        extra={'guild_id': guild_id}
+                    )
+                    bot.send_log_embed(guild, _missing_permission_embed(bot_member, len(member_ids)))
+                for member_id in member_ids:
+                    _retry_later(bot, guild_id, member_id)
+                continue
+            
+            if bot.failures.resolve(guild_id, MISSING_PERMISSION):
+                log.info("'Kick Members' permission restored", extra={'guild_id': guild_id})
+            
+            # Threshold may have been raised after these entries were scheduled,
+            # only the members still due are resolved to Member objects
+            tracked = bot.unverified_members.get(guild_id, {})
+            now_timestamp = now.timestamp()
+            due_ids = []
+            due_minutes = []
+            for member_id in member_ids:
+                if member_id not in tracked:
+                    continue
+                total_checked += 1
+                join_timestamp = tracked[member_id]
+                if now_timestamp - join_timestamp < kick_threshold_seconds:
+                    bot.scheduler.schedule(guild_id, member_id, join_timestamp + kick_threshold_seconds)
+                    continue
+                due_ids.append(member_id)
+                due_minutes.append(int((now_timestamp - join_timestamp) // 60))
+            
+            # Uncached members (low-memory mode) are queried up to 100 at a time
+            resolved = await bot.member_resolver.resolve(guild, due_ids)
+            
+            blocked = []
+            hierarchy_cleared = False  # A member blocked by the hierarchy before is kickable now
+            member_latency = bot.metrics.member_latency
+            for member_id, minutes_elapsed in zip(due_ids, due_minutes):
+                member_started = time.perf_counter()
                 try:
-                    guild = bot.get_guild(guild_id)
-                    
-                    if not guild:
-                        print(f"⚠️ Guild {guild_id} not found (bot may have been removed)")
+                    if member_id not in resolved:
+                        _retry_later(bot, guild_id, member_id)
                         continue
+                    member = resolved[member_id]
                     
-                    config = bot.get_guild_config(guild_id)
-                    kick_threshold = timedelta(minutes=config['kick_after_minutes'])
-                    unverified_role = discord.utils.get(guild.roles, name=config['role_name'])
+                    if not member:
+                        log.debug("Member %s left, removing from tracking", member_id, extra={'guild_id': guild_id})
+                        bot.untrack_member(guild_id, member_id)
+                        bot.save_data(guild_id)
+                        continue
                     
-                    if not unverified_role:
-                        print(f"[{guild.name}] ⚠️ Role '{config['role_name']}' not found - skipping")
+                    # Check if member still has unverified role
+                    if not has_role(member, unverified_role.id):
+                        log.debug("Member %s verified, removing from tracking", member_id, extra={'guild_id': guild_id})
+                        bot.untrack_member(guild_id, member_id)
+                        bot.save_data(guild_id)
                         continue
                     
-                    bot_member = guild.get_member(bot.user.id)
-                    if not bot_member:
-                        print(f"[{guild.name}] ⚠️ Bot member object not found - skipping")
+                    # PRE-CHECK: Role hierarchy, reported once per guild below
+                    if bot_member.top_role.position <= member.top_role.position:
+                        blocked.append(member)
+                        _retry_later(bot, guild_id, member_id)
                         continue
                     
-                    print(f"\n[{guild.name}] (ID: {guild_id})")
-                    print(f"  📋 Tracking: {len(members)} member(s)")
-                    print(f"  ⏱️  Threshold: {config['kick_after_minutes']} minutes")
-                    print(f"  🎭 Target role: {unverified_role.name}")
-                    print(f"  🤖 Bot role: {bot_member.top_role.name} (position: {bot_member.top_role.position})")
+                    if bot.failures.affects(guild_id, ROLE_HIERARCHY, member_id):
+                        hierarchy_cleared = True
+                    
+                    log.debug("Member %s exceeded limit: %d min", member_id, minutes_elapsed, extra={'guild_id': guild_id})
                     
-                    for member_id, join_timestamp in list(members.items()):
-                        try:
-                            total_checked += 1
-                            join_time = datetime.fromtimestamp(join_timestamp)
-                            time_elapsed = now - join_time
-                            minutes_elapsed = int(time_elapsed.total_seconds() / 60)
-                            
-                            member = guild.get_member(member_id)
-                            
-                            if not member:
-                                print(f"  🚪 Member {member_id} left server - removing from tracking")
-                                del bot.unverified_members[guild_id][member_id]
-                                bot.save_data()
-                                continue
-                            
-                            # Check if member still has unverified role
-                            if unverified_role not in member.roles:
-                                print(f"  ✅ {member.name} verified! Removing from tracking")
-                                del bot.unverified_members[guild_id][member_id]
-                                bot.save_data()
-                                continue
-                            
-                            # Check if time exceeded
-                            if time_elapsed >= kick_threshold:
-                                print(f"  ⏰ {member.name} ({member.id}) exceeded limit: {minutes_elapsed} min")
-                                print(f"     └─ Member's highest role: {member.top_role.name} (position: {member.top_role.position})")
-                                
-                                # PRE-CHECK: Role hierarchy
-                                if bot_member.top_role.position <= member.top_role.position:
-                                    print(f"     └─ ❌ HIERARCHY ISSUE: Bot role ({bot_member.top_role.position}) <= User role ({member.top_role.position})")
-                                    
-                                    log_channel_id = config.get('log_channel_id')
-                                    if log_channel_id:
-                                        log_channel = guild.get_channel(log_channel_id)
-                                        if log_channel:
-                                            try:
-                                                error_embed = discord.Embed(
-                                                    title="⚠️ Auto-Kick Failed - Role Hierarchy",
-                                                    description=f"Cannot kick **{member.mention}** `{member.name}`",
-                                                    color=0xe74c3c,
-                                                    timestamp=datetime.now()
-                                                )
-                                                error_embed.add_field(
-                                                    name="❌ Issue",
-                                                    value=f"Bot role: `{bot_member.top_role.name}` (pos: {bot_member.top_role.position})\n"
-                                                          f"User role: `{member.top_role.name}` (pos: {member.top_role.position})\n\n"
-                                                          f"Bot's role must have a **higher position number**",
-                                                    inline=False
-                                                )
-                                                error_embed.add_field(
-                                                    name="✅ Fix",
-                                                    value=f"1. Go to **Server Settings → Roles**\n"
-                                                          f"2. Drag `{bot_member.top_role.name}` **ABOVE** `{member.top_role.name}`\n"
-                                                          f"3. Save changes",
-                                                    inline=False
-                                                )
-                                                error_embed.add_field(
-                                                    name="⏱️ Time Unverified",
-                                                    value=f"`{minutes_elapsed}` minutes",
-                                                    inline=True
-                                                )
-                                                error_embed.set_footer(text="User remains tracked • Will retry on next check")
-                                                
-                                                await log_channel.send(embed=error_embed)
-                                            except Exception as e:
-                                                print(f"     └─ ⚠️ Could not send log: {e}")
-                                    continue
-                                
-                                # PRE-CHECK: Bot permissions
-                                if not guild.me.guild_permissions.kick_members:
-                                    print(f"     └─ ❌ BOT MISSING 'KICK MEMBERS' PERMISSION")
-                                    
-                                    log_channel_id = config.get('log_channel_id')
-                                    if log_channel_id:
-                                        log_channel = guild.get_channel(log_channel_id)
-                                        if log_channel:
-                                            try:
-                                                error_embed = discord.Embed(
-                                                    title="⚠️ Auto-Kick Failed - Missing Permission",
-                                                    description=f"Cannot kick **{member.mention}** `{member.name}`",
-                                                    color=0xe74c3c,
-                                                    timestamp=datetime.now()
-                                                )
-                                                error_embed.add_field(
-                                                    name="❌ Issue",
-                                                    value="Bot is missing **Kick Members** permission",
-                                                    inline=False
-                                                )
-                                                error_embed.add_field(
-                                                    name="✅ Fix",
-                                                    value=f"1. Go to **Server Settings → Roles**\n"
-                                                          f"2. Find `{bot_member.top_role.name}` role\n"
-                                                          f"3. Enable **Kick Members** permission",
-                                                    inline=False
-                                                )
-                                                error_embed.set_footer(text="User remains tracked • Will retry on next check")
-                                                
-                                                await log_channel.send(embed=error_embed)
-                                            except Exception as e:
-                                                print(f"     └─ ⚠️ Could not send log: {e}")
-                                    continue
-                                
-                                # Attempt kick
-                                kick_successful = False
-                                
-                                try:
-                                    await member.kick(reason=f"Auto-kick: Did not verify within {config['kick_after_minutes']} minutes")
-                                    print(f"     └─ ✅ KICKED SUCCESSFULLY")
-                                    kick_successful = True
-                                    total_kicked += 1
-                                    
-                                except discord.Forbidden as e:
-                                    print(f"     └─ ❌ FORBIDDEN ERROR: {e}")
-                                    
-                                    log_channel_id = config.get('log_channel_id')
-                                    if log_channel_id:
-                                        log_channel = guild.get_channel(log_channel_id)
-                                        if log_channel:
-                                            try:
-                                                error_embed = discord.Embed(
-                                                    title="⚠️ Auto-Kick Failed - Forbidden",
-                                                    description=f"Cannot kick **{member.mention}** `{member.name}`",
-                                                    color=0xe74c3c,
-                                                    timestamp=datetime.now()
-                                                )
-                                                error_embed.add_field(
-                                                    name="❌ Error",
-                                                    value=f"```{str(e)}```",
-                                                    inline=False
-                                                )
-                                                error_embed.add_field(
-                                                    name="Possible Causes",
-                                                    value="• User is server owner (cannot be kicked)\n"
-                                                          "• Hidden role hierarchy issue\n"
-                                                          "• Bot permissions issue",
-                                                    inline=False
-                                                )
-                                                error_embed.set_footer(text="User remains tracked")
-                                                
-                                                await log_channel.send(embed=error_embed)
-                                            except:
-                                                pass
-                                        
-                                except Exception as e:
-                                    print(f"     └─ ❌ UNEXPECTED ERROR: {type(e).__name__}: {e}")
-                                    import traceback
-                                    traceback.print_exc()
-                                
-                                # Post-kick actions
-                                if kick_successful:
-                                    try:
-                                        await bot.log_kick(guild, member, minutes_elapsed)
-                                    except Exception as e:
-                                        print(f"     └─ ⚠️ Could not log kick: {e}")
-                                    
-                                    if guild_id in bot.unverified_members and member_id in bot.unverified_members[guild_id]:
-                                        del bot.unverified_members[guild_id][member_id]
-                                        bot.save_data()
-                                else:
-                                    print(f"     └─ 📌 Keeping in tracking list for retry")
-                            
-                        except Exception as e:
-                            print(f"  ❌ Error processing member {member_id}: {e}")
-                            import traceback
-                            traceback.print_exc()
+                    # Hand the kick to the executor, the result is handled asynchronously
+                    _submit_kick(bot, guild, member, config, minutes_elapsed)
+                    total_queued += 1
                 
-                except Exception as e:
-                    print(f"❌ Error processing guild {guild_id}: {e}")
-                    import traceback
-                    traceback.print_exc()
+                except Exception:
+                    log.exception("Error processing member %s", member_id, extra={'guild_id': guild_id})
+                    _retry_later(bot, guild_id, member_id)
+                finally:
+                    member_latency.observe(time.perf_counter() - member_started)
             
-            print(f"\n{'='*60}")
-            print(f"✅ CHECK COMPLETE")
-            print(f"   Checked: {total_checked} member(s)")
-            print(f"   Kicked: {total_kicked} member(s)")
-            print(f"{'='*60}\n")
-            
-            # Update bot status
-            total_unverified = sum(len(members) for members in bot.unverified_members.values())
-            activity = discord.Activity(type=discord.ActivityType.watching, name=f"🔎 {total_unverified:,} unverified members")
-            await bot.change_presence(activity=activity)
+            # Blocked members are retried later while others come due, so a pass
+            # without blocked members only clears the condition if one of them
+            # became kickable or the bot's role moved
+            position = bot_member.top_role.position
+            if blocked:
+                blocked_ids = [member.id for member in blocked]
+                if bot.failures.should_report(guild_id, ROLE_HIERARCHY, position, subjects=blocked_ids):
+                    log.error(
+                        "Role hierarchy: %d member(s) have a role at or above the bot's (%d)",
+                        len(blocked), bot_member.top_role.position, extra={'guild_id': guild_id}
+                    )
+                    bot.send_log_embed(guild, _hierarchy_embed(bot_member, blocked))
+            elif hierarchy_cleared or bot.failures.signature(guild_id, ROLE_HIERARCHY) != position:
+                bot.failures.resolve(guild_id, ROLE_HIERARCHY)
+        
+        except Exception:
+            log.exception("Error processing guild", extra={'guild_id': guild_id})
+    
+    elapsed = time.perf_counter() - started
+    bot.metrics.sweep_duration.observe(elapsed)
+    log.info(
+        "Auto-kick check complete: checked %d, queued %d member(s)", total_checked, total_queued,
+        extra={'guilds': len(due_by_guild), 'elapsed_ms': round(elapsed * 1000, 1)}
+    )
+    
+    return total_queued
+
+
+async def process_due_warnings(bot, due):
+    """Queue warning DMs for members whose warning time has come"""
+    now = time.time()
+    queued = 0
+    
+    # {guild_id: {member_id: deadline}} of members still due a warning
+    due_by_guild = {}
+    for guild_id, member_id, _warn_at in due:
+        config = bot.get_guild_config(guild_id)
+        join_timestamp = bot.unverified_members.get(guild_id, {}).get(member_id)
+        if not config.send_dm or join_timestamp is None:
+            continue
+        
+        # Line up the next lead time before anything else can skip it
+        deadline = join_timestamp + config.kick_after_minutes * 60
+        bot.schedule_warning(guild_id, member_id, deadline, now)
+        if deadline > now:
+            due_by_guild.setdefault(guild_id, {})[member_id] = deadline
+    
+    for guild_id, deadlines in due_by_guild.items():
+        try:
+            guild = bot.get_guild(guild_id)
+            unverified_role = bot.get_unverified_role(guild) if guild else None
+            if unverified_role is None:
+                continue
             
-        except Exception as e:
-            print(f"❌ CRITICAL ERROR IN CHECK TASK: {e}")
-            import traceback
-            traceback.print_exc()
+            resolved = await bot.member_resolver.resolve(guild, list(deadlines))
+            for member_id, deadline in deadlines.items():
+                member = resolved.get(member_id)
+                if member is None or not has_role(member, unverified_role.id):
+                    continue
+                if bot.dm_warnings.warn(guild, member, deadline):
+                    queued += 1
+        except Exception:
+            log.exception("Error queueing warnings", extra={'guild_id': guild_id})
+    
+    if queued:
+        log.info("Queued %d warning DM(s)", queued, extra={'pending': bot.dm_warnings.pending})
+    return queued
+
+
+def setup_background_tasks(bot):
+    """Setup and start background tasks"""
     
-    @check_unverified_task.before_loop
-    async def before_check_loop():
-        """Wait for the bot to be ready before starting the loop"""
-        print("⏳ Waiting for bot to be ready before starting auto-kick task...")
+    async def check_unverified_task():
+        """Sleep until the next kick deadline and handle only the members that are due"""
         await bot.wait_until_ready()
-        print("✅ Bot ready! Starting auto-kick task...")
+        log.info("Auto-kick task started")
+        
+        try:
+            while not bot.is_closed():
+                try:
+                    await bot.scheduler.wait_until_due(max_wait=CHECK_INTERVAL_MINUTES * 60)
+                    
+                    due = bot.scheduler.pop_due()
+                    if due:
+                        await process_due_members(bot, due)
+                
+                except asyncio.CancelledError:
+                    raise
+                except Exception:
+                    log.critical("Error in auto-kick task", exc_info=True)
+                    await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            log.warning("Auto-kick task was cancelled")
+            raise
+        
+        log.warning("Auto-kick task stopped")
     
-    @check_unverified_task.after_loop
-    async def after_check_loop():
-        """Called when the loop stops"""
-        if check_unverified_task.is_being_cancelled():
-            print("⚠️ Auto-kick task was cancelled")
-        else:
-            print("⚠️ Auto-kick task stopped")
+    async def warning_task():
+        """Sleep until the next DM warning is due and queue the due ones"""
+        await bot.wait_until_ready()
+        
+        while not bot.is_closed():
+            try:
+                await bot.warning_scheduler.wait_until_due(max_wait=CHECK_INTERVAL_MINUTES * 60)
+                due = bot.warning_scheduler.pop_due()
+                if due:
+                    await process_due_warnings(bot, due)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                log.critical("Error in warning task", exc_info=True)
+                await asyncio.sleep(5)
     
-    @check_unverified_task.error
-    async def check_task_error(error):
-        """Handle errors in the task loop"""
-        print(f"❌ ERROR IN AUTO-KICK TASK: {error}")
-        import traceback
-        traceback.print_exc()
+    async def presence_task():
+        """Refresh the shards' presence as often as the throttle allows"""
+        await bot.wait_until_ready()
+        
+        while not bot.is_closed():
+            try:
+                await bot.presence.refresh()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                log.exception("Error refreshing presence")
+            await asyncio.sleep(PRESENCE_MIN_INTERVAL_SECONDS)
     
-    # Start the task
-    check_unverified_task.start()
-    print("✅ Auto-kick background task started!")
+    # Start the tasks
+    task = asyncio.create_task(check_unverified_task())
+    bot.warning_task = asyncio.create_task(warning_task())
+    bot.presence_task = asyncio.create_task(presence_task())
     
-    return check_unverified_task
\ No newline at end of file
+    return task
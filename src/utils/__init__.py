@@ -1,8 +1,21 @@
 """
 Utility functions for the Auto-Kick Bot
 """
+from .command_sync import command_tree_hash, sync_command_tree
 from .data_manager import DataManager
-from .logger import send_kick_log
+from .dm_warnings import DMWarningSender, next_warning_time
+from .failure_tracker import FailureTracker
+from .ingest import MemberEventQueue
+from .kick_executor import KickExecutor
+from .logger import KickLogAggregator
+from .member_cache import TrackedMemberCache
+from .member_resolver import MemberResolver
+from .metrics import BotMetrics
 from .permissions import has_permission, get_permission_error_message
+from .persistence import PersistenceEngine
+from .presence import PresenceManager
+from .role_cache import RoleCache, StaffRoleCache, has_role
+from .scheduler import ExpiryScheduler
+from .status_pages import StatusPageCache, build_status_message
 
-__all__ = ['DataManager', 'send_kick_log', 'has_permission', 'get_permission_error_message']
+__all__ = ['BotMetrics', 'DataManager', 'DMWarningSender', 'FailureTracker', 'KickExecutor', 'KickLogAggregator', 'MemberEventQueue', 'MemberResolver', 'PersistenceEngine', 'PresenceManager', 'ExpiryScheduler', 'RoleCache', 'StaffRoleCache', 'StatusPageCache', 'TrackedMemberCache', 'build_status_message', 'has_role', 'has_permission', 'get_permission_error_message', 'next_warning_time', 'command_tree_hash', 'sync_command_tree']
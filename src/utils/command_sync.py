@@ -0,0 +1,66 @@
+"""
+Slash command sync that is skipped when the command tree did not change
+"""
+import hashlib
+import json
+import logging
+import os
+from src.config import COMMAND_TREE_HASH_FILE
+
+
+log = logging.getLogger(__name__)
+
+
+def command_tree_hash(tree):
+    """Stable hash of the global commands, built from the payload sent to Discord"""
+    payload = sorted(
+        (command.to_dict(tree) for command in tree.get_commands()),
+        key=lambda data: (data.get('type', 1), data['name'])
+    )
+    encoded = json.dumps(payload, sort_keys=True, separators=(',', ':')).encode()
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def _load_hashes(path):
+    """{application_id: hash} of the last successful syncs"""
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except Exception as e:
+        log.warning("Could not read %s, syncing slash commands: %s", path, e)
+        return {}
+
+
+def _save_hashes(path, hashes):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(hashes, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+async def sync_command_tree(bot, force=False, path=COMMAND_TREE_HASH_FILE):
+    """
+    Sync the global command tree unless it matches the last synced one
+    
+    The hash is stored per application after Discord accepted the sync, so
+    a failed sync is retried on the next start. Returns whether it synced.
+    """
+    tree_hash = command_tree_hash(bot.tree)
+    key = str(bot.application_id)
+    hashes = _load_hashes(path)
+    
+    if not force and hashes.get(key) == tree_hash:
+        log.info("Slash commands unchanged, skipping sync", extra={'tree_hash': tree_hash[:12]})
+        return False
+    
+    synced = await bot.tree.sync()
+    log.info("Synced %d slash command(s)", len(synced), extra={'tree_hash': tree_hash[:12], 'forced': force})
+    
+    hashes[key] = tree_hash
+    try:
+        _save_hashes(path, hashes)
+    except OSError as e:
+        log.warning("Could not save the command tree hash: %s", e)
+    return True
@@ -1,64 +1,120 @@
 """
 Data management utilities for loading and saving bot data
 """
-import json
-import os
-from src.config import MEMBERS_DATA_FILE, GUILD_CONFIG_FILE
+import logging
+from src.storage import create_storage_backend
+
+
+log = logging.getLogger(__name__)
 
 
 class DataManager:
-    """Handles loading and saving of bot data"""
+    """Handles loading and saving of bot data through the configured storage backend"""
+    
+    _backend = None
+    
+    @staticmethod
+    def backend():
+        """Return the storage backend, creating it on first use"""
+        if DataManager._backend is None:
+            DataManager._backend = create_storage_backend()
+        return DataManager._backend
+    
+    @staticmethod
+    def use_backend(backend):
+        """Replace the storage backend (e.g. with one in a benchmark's temp dir)"""
+        DataManager.close()
+        DataManager._backend = backend
+    
+    @staticmethod
+    def load_data(shard_ids=None, shard_count=None):
+        """
+        Load tracked members and guild configs
+        
+        Args:
+            shard_ids: Only load guilds on these shards (all guilds when None)
+            shard_count: Total shards, required with shard_ids
+        
+        Returns:
+            (unverified_members, guild_configs, needs_full_save)
+        """
+        return DataManager.backend().load(shard_ids, shard_count)
     
     @staticmethod
     def load_tracked_members():
-        """Load tracked members from JSON file"""
-        if os.path.exists(MEMBERS_DATA_FILE):
-            try:
-                with open(MEMBERS_DATA_FILE, 'r') as f:
-                    data = json.load(f)
-                    # Convert string keys to integers
-                    return {
-                        int(guild_id): {
-                            int(member_id): timestamp 
-                            for member_id, timestamp in members.items()
-                        }
-                        for guild_id, members in data.items()
-                    }
-            except Exception as e:
-                print(f"❌ Error loading member data: {e}")
-                return {}
-        return {}
+        """Load tracked members"""
+        return DataManager.load_data()[0]
     
     @staticmethod
     def load_guild_configs():
-        """Load guild configurations from JSON file"""
-        if os.path.exists(GUILD_CONFIG_FILE):
-            try:
-                with open(GUILD_CONFIG_FILE, 'r') as f:
-                    data = json.load(f)
-                    # Convert string keys to integers
-                    return {
-                        int(guild_id): config 
-                        for guild_id, config in data.items()
-                    }
-            except Exception as e:
-                print(f"❌ Error loading guild configs: {e}")
-                return {}
-        return {}
+        """Load guild configurations"""
+        return DataManager.load_data()[1]
+    
+    @staticmethod
+    def save_guilds(snapshot):
+        """
+        Persist the data of the given guilds
+        
+        Args:
+            snapshot: {guild_id: {'members': {...}, 'config': {...}}}
+        
+        Returns:
+            Number of bytes written
+        """
+        return DataManager.backend().save_guilds(snapshot)
+    
+    @staticmethod
+    def journaled():
+        """Whether the backend takes change records instead of guild snapshots"""
+        return DataManager.backend().journaled
+    
+    @staticmethod
+    def append_journal(records, snapshot=None):
+        """
+        Persist change records, and full guild data for the guilds in snapshot
+        
+        Returns:
+            Number of bytes written
+        """
+        backend = DataManager.backend()
+        bytes_written = backend.save_guilds(snapshot) if snapshot else 0
+        return bytes_written + backend.append(records)
+    
+    @staticmethod
+    def journal_needs_compaction():
+        """Whether the journal should be compacted into a new snapshot"""
+        return DataManager.backend().needs_compaction()
+    
+    @staticmethod
+    def rotate_journal():
+        """Start a new journal generation, returns it for write_snapshot()"""
+        return DataManager.backend().rotate()
+    
+    @staticmethod
+    def write_snapshot(state, generation):
+        """Write a snapshot of every guild replacing the journals before generation"""
+        return DataManager.backend().write_snapshot(state, generation)
     
     @staticmethod
     def save_data(unverified_members, guild_configs):
-        """Save both tracked members and guild configs"""
+        """Save both tracked members and guild configs for every guild"""
         try:
-            # Save tracked members
-            with open(MEMBERS_DATA_FILE, 'w') as f:
-                json.dump(unverified_members, f, indent=4)
-            
-            # Save guild configurations
-            with open(GUILD_CONFIG_FILE, 'w') as f:
-                json.dump(guild_configs, f, indent=4)
-                
+            guild_ids = set(unverified_members) | set(guild_configs)
+            DataManager.save_guilds({
+                guild_id: {
+                    'members': unverified_members.get(guild_id, {}),
+                    'config': guild_configs.get(guild_id)
+                }
+                for guild_id in guild_ids
+            })
             return True
-        except Exception as e:
-            print(f"❌ Error saving data: {e}")
+        except Exception:
+            log.exception("Error saving data")
             return False
+    
+    @staticmethod
+    def close():
+        """Close the storage backend"""
+        if DataManager._backend is not None:
+            DataManager._backend.close()
+            DataManager._backend = None
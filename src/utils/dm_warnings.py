@@ -0,0 +1,156 @@
+"""
+Pre-kick DM warnings sent through a global throttled queue
+"""
+import logging
+import time
+from collections import OrderedDict
+import discord
+from src.config import (
+    COLOR_WARNING,
+    DM_WARNING_LEAD_MINUTES,
+    DM_CONCURRENCY,
+    DM_BUCKET_SIZE,
+    DM_BUCKET_SECONDS,
+    DM_CHANNEL_CACHE_SIZE,
+    DM_FAILURE_COOLDOWN_MINUTES,
+    KICK_MAX_RETRIES
+)
+from .kick_executor import KickExecutor
+
+
+log = logging.getLogger(__name__)
+
+# Every DM shares one queue and one bucket, whatever the guild
+_DM_QUEUE = 'dm'
+
+
+def next_warning_time(deadline, now, lead_minutes=DM_WARNING_LEAD_MINUTES, first=False):
+    """
+    Earliest warning point (deadline minus a lead time) still ahead of now,
+    or None when every warning for this deadline is in the past
+    
+    With first=True (the member was just tracked) a deadline closer than
+    every lead time still gets one warning, right away.
+    """
+    upcoming = [deadline - lead * 60 for lead in lead_minutes if deadline - lead * 60 > now]
+    if upcoming:
+        return min(upcoming)
+    if first and lead_minutes and deadline > now:
+        return max(now, deadline - min(lead_minutes) * 60)
+    return None
+
+
+def _warning_embed(guild, deadline):
+    embed = discord.Embed(
+        title="⏰ Verification Reminder",
+        description=(
+            f"You haven't verified in **{guild.name}** yet.\n"
+            f"You will be removed from the server <t:{int(deadline)}:R> unless you complete verification."
+        ),
+        color=COLOR_WARNING
+    )
+    embed.set_footer(text="Auto-Kick System")
+    return embed
+
+
+class DMWarningSender:
+    """
+    Sends warning DMs to tracked members
+    
+    Sends run on a KickExecutor with a single queue whose bucket is far
+    below Discord's global limit, so a burst of warnings is spread out
+    instead of competing with the kick and log channel routes. DM channel
+    IDs are cached (creating one is a request of its own), and members who
+    don't accept DMs are skipped until DM_FAILURE_COOLDOWN_MINUTES passed.
+    """
+    
+    def __init__(self, bot):
+        self.bot = bot
+        self.executor = KickExecutor(
+            concurrency=DM_CONCURRENCY,
+            max_retries=KICK_MAX_RETRIES,
+            bucket_size=DM_BUCKET_SIZE,
+            bucket_seconds=DM_BUCKET_SECONDS
+        )
+        self._channels = OrderedDict()  # {user_id: dm_channel_id}, least recently used first
+        self._undeliverable = {}  # {user_id: time of the failed send}
+    
+    @property
+    def pending(self):
+        """Warnings waiting to be sent"""
+        return self.executor.pending
+    
+    def is_undeliverable(self, user_id, now=None):
+        """Whether a recent DM to this user failed for good"""
+        failed_at = self._undeliverable.get(user_id)
+        if failed_at is None:
+            return False
+        if (now or time.time()) - failed_at >= DM_FAILURE_COOLDOWN_MINUTES * 60:
+            del self._undeliverable[user_id]
+            return False
+        return True
+    
+    def warn(self, guild, member, deadline):
+        """Queue a warning DM, returns False when the member is known to refuse DMs"""
+        if self.is_undeliverable(member.id):
+            self.bot.metrics.dm_warnings_skipped.inc()
+            return False
+        
+        guild_id = guild.id
+        member_id = member.id
+        
+        async def send():
+            # The member may have verified or left while the warning was queued
+            if member_id not in self.bot.unverified_members.get(guild_id, {}):
+                return False
+            channel = await self._dm_channel(member)
+            await channel.send(embed=_warning_embed(guild, deadline))
+            return True
+        
+        async def on_done(sent, error):
+            if error is None:
+                if sent:
+                    self.bot.metrics.dm_warnings_sent.inc()
+                    log.debug("Warned %s", member_id, extra={'guild_id': guild_id})
+                return
+            
+            self.bot.metrics.dm_warnings_failed.inc()
+            if isinstance(error, (discord.Forbidden, discord.NotFound)):
+                # Closed DMs or a deleted account, retrying won't help
+                self._record_failure(member_id)
+                self._channels.pop(member_id, None)
+                log.debug("Cannot DM %s: %s", member_id, error, extra={'guild_id': guild_id})
+            else:
+                log.warning(
+                    "Could not send warning DM to %s: %s: %s", member_id, type(error).__name__, error,
+                    extra={'guild_id': guild_id}
+                )
+        
+        self.executor.submit(_DM_QUEUE, send, on_done)
+        return True
+    
+    def _record_failure(self, user_id):
+        now = time.time()
+        if len(self._undeliverable) >= DM_CHANNEL_CACHE_SIZE:
+            cutoff = now - DM_FAILURE_COOLDOWN_MINUTES * 60
+            self._undeliverable = {
+                other_id: failed_at for other_id, failed_at in self._undeliverable.items() if failed_at > cutoff
+            }
+        self._undeliverable[user_id] = now
+    
+    async def _dm_channel(self, member):
+        """Messageable DM channel of a member, created once and then cached by ID"""
+        channel_id = self._channels.get(member.id)
+        if channel_id is not None:
+            self._channels.move_to_end(member.id)
+            return self.bot.get_partial_messageable(channel_id, type=discord.ChannelType.private)
+        
+        channel = await member.create_dm()
+        self._channels[member.id] = channel.id
+        if len(self._channels) > DM_CHANNEL_CACHE_SIZE:
+            self._channels.popitem(last=False)
+        return channel
+    
+    async def close(self):
+        """Drop queued warnings"""
+        await self.executor.close()
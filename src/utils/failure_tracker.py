@@ -0,0 +1,64 @@
+"""
+Tracks guild-level kick failures so they are reported once, not per member
+"""
+import time
+from src.config import FAILURE_REPORT_COOLDOWN_MINUTES
+
+
+# Failure kinds
+MISSING_PERMISSION = 'missing_permission'
+ROLE_HIERARCHY = 'role_hierarchy'
+FORBIDDEN = 'forbidden'
+
+
+class FailureTracker:
+    """
+    Remembers the failure conditions currently affecting each guild
+
+    A condition is keyed by (guild_id, kind) and described by a signature
+    (e.g. the bot's top role position). It is reported when it first appears,
+    when its signature changes, or once the cooldown has expired. The
+    subjects a condition was seen on (e.g. member IDs) are remembered until
+    it is resolved.
+    """
+    
+    def __init__(self, cooldown_seconds=FAILURE_REPORT_COOLDOWN_MINUTES * 60):
+        self.cooldown_seconds = cooldown_seconds
+        self._states = {}  # {(guild_id, kind): (signature, last_reported)}
+        self._subjects = {}  # {(guild_id, kind): {subject}}
+    
+    def should_report(self, guild_id, kind, signature=None, now=None, subjects=()):
+        """Record that a condition holds (for subjects), returns True if it should be reported now"""
+        if now is None:
+            now = time.time()
+        
+        key = (guild_id, kind)
+        if subjects:
+            self._subjects.setdefault(key, set()).update(subjects)
+        state = self._states.get(key)
+        if state is not None and state[0] == signature and now - state[1] < self.cooldown_seconds:
+            return False
+        
+        self._states[key] = (signature, now)
+        return True
+    
+    def signature(self, guild_id, kind):
+        """Signature of a condition that currently holds, None if it doesn't"""
+        state = self._states.get((guild_id, kind))
+        return state[0] if state is not None else None
+    
+    def affects(self, guild_id, kind, subject):
+        """Check whether a condition that currently holds was seen on a subject"""
+        return subject in self._subjects.get((guild_id, kind), ())
+    
+    def resolve(self, guild_id, kind):
+        """Mark a condition as cleared, returns True if it was failing"""
+        self._subjects.pop((guild_id, kind), None)
+        return self._states.pop((guild_id, kind), None) is not None
+    
+    def clear_guild(self, guild_id):
+        """Forget every condition of a guild"""
+        for key in [key for key in self._states if key[0] == guild_id]:
+            del self._states[key]
+        for key in [key for key in self._subjects if key[0] == guild_id]:
+            del self._subjects[key]
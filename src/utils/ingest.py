@@ -0,0 +1,164 @@
+"""
+Micro-batched ingestion of member events
+"""
+import asyncio
+import logging
+import time
+from collections import deque
+from src.config import INGEST_FLUSH_SECONDS, INGEST_BATCH_SIZE, JOIN_CHECK_DELAY_SECONDS
+from .role_cache import has_role
+
+
+log = logging.getLogger(__name__)
+
+# Record kinds, the member field holds a Member, a raw member payload or a user ID
+UPDATE = 'update'
+UNCACHED_UPDATE = 'uncached_update'
+REMOVE = 'remove'
+JOIN = 'join'
+
+
+class MemberEventQueue:
+    """
+    Applies member joins, role updates and removals in batches
+    
+    Event handlers only push (guild, member, kind, timestamp) records. The
+    queue is drained INGEST_FLUSH_SECONDS after its first record, or right
+    away once it holds INGEST_BATCH_SIZE records: the unverified role is
+    resolved once per guild and batch, and every touched guild is saved
+    once. Role updates are applied as "track if the member holds the role
+    now, untrack if not", so several updates of one member in a batch end
+    in their latest state.
+    
+    Joins wait JOIN_CHECK_DELAY_SECONDS for roles to be assigned. They are
+    kept in arrival order behind a single timer, which checks every join
+    that is due at once instead of each join sleeping in its own task.
+    """
+    
+    def __init__(self, bot, flush_seconds=INGEST_FLUSH_SECONDS, batch_size=INGEST_BATCH_SIZE,
+                 join_delay=JOIN_CHECK_DELAY_SECONDS):
+        self.bot = bot
+        self.flush_seconds = flush_seconds
+        self.batch_size = batch_size
+        self.join_delay = join_delay
+        self._records = []  # [(guild, member, kind, timestamp)]
+        self._joins = deque()  # [(guild, member, JOIN, timestamp)], oldest first
+        self._timer = None
+        self._join_timer = None
+    
+    @property
+    def pending(self):
+        """Number of records waiting to be applied"""
+        return len(self._records) + len(self._joins)
+    
+    def push(self, guild, member, kind):
+        """Queue a member event, applied with the next batch"""
+        self._records.append((guild, member, kind, time.time()))
+        if len(self._records) >= self.batch_size:
+            self.drain()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.flush_seconds, self.drain)
+    
+    def push_join(self, guild, member):
+        """Queue a new member, their roles are checked once the join delay passed"""
+        self._joins.append((guild, member, JOIN, time.time()))
+        if self._join_timer is None:
+            self._join_timer = asyncio.get_running_loop().call_later(self.join_delay, self.check_joins)
+    
+    def drain(self):
+        """Apply every queued record (joins wait for their delay)"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        records, self._records = self._records, []
+        if records:
+            self._apply(records)
+    
+    def check_joins(self, now=None):
+        """Apply the joins whose delay has passed and re-arm the timer for the rest"""
+        self._join_timer = None
+        if now is None:
+            now = time.time()
+        due = []
+        while self._joins and self._joins[0][3] + self.join_delay <= now:
+            due.append(self._joins.popleft())
+        
+        if due:
+            # Updates and removals queued before the check come first
+            self.drain()
+            self._apply(due)
+        if self._joins:
+            delay = max(0.0, self._joins[0][3] + self.join_delay - now)
+            self._join_timer = asyncio.get_running_loop().call_later(delay, self.check_joins)
+    
+    def close(self):
+        """Apply everything still queued, joins included"""
+        if self._join_timer is not None:
+            self._join_timer.cancel()
+            self._join_timer = None
+        joins, self._joins = list(self._joins), deque()
+        self.drain()
+        if joins:
+            self._apply(joins)
+    
+    def _apply(self, records):
+        metrics = self.bot.metrics
+        role_ids = {}  # {guild_id: unverified role ID or None}, resolved once per batch
+        touched = set()
+        
+        for record in records:
+            started = time.perf_counter()
+            try:
+                if self._apply_record(record, role_ids):
+                    touched.add(record[0].id)
+            except Exception:
+                log.exception("Error applying member %s event", record[2], extra={'guild_id': record[0].id})
+            kind = record[2]
+            if kind == JOIN:
+                metrics.member_join_latency.observe(time.perf_counter() - started)
+            elif kind != REMOVE:
+                metrics.member_update_latency.observe(time.perf_counter() - started)
+        
+        for guild_id in touched:
+            self.bot.save_data(guild_id)
+        metrics.ingest_batch_size.observe(len(records))
+    
+    def _apply_record(self, record, role_ids):
+        """Apply one record, returns True if the guild's tracked members changed"""
+        bot = self.bot
+        guild, member, kind, timestamp = record
+        guild_id = guild.id
+        
+        if kind == REMOVE:
+            return bot.untrack_member(guild_id, member)
+        
+        if guild_id not in role_ids:
+            role = bot.get_unverified_role(guild)
+            role_ids[guild_id] = role.id if role else None
+        role_id = role_ids[guild_id]
+        
+        if kind == UNCACHED_UPDATE:
+            member_id = int(member['user']['id'])
+            holds_role = role_id is not None and str(role_id) in member['roles']
+            if holds_role:
+                # Cached from now on, later updates go through on_member_update
+                bot.member_cache.add_payload(guild, member)
+        else:
+            member_id = member.id
+            if kind == JOIN and guild.get_member(member_id) is None:
+                # Left again before the check
+                return False
+            holds_role = role_id is not None and has_role(member, role_id)
+        
+        is_tracked = member_id in bot.unverified_members.get(guild_id, {})
+        if holds_role and not is_tracked:
+            bot.track_member(guild_id, member_id, timestamp)
+            log.debug("Started tracking %s (%s)", member_id, kind, extra={'guild_id': guild_id})
+            return True
+        if not holds_role and is_tracked and role_id is not None:
+            bot.untrack_member(guild_id, member_id)
+            log.debug("Stopped tracking %s (verified)", member_id, extra={'guild_id': guild_id})
+            return True
+        if kind == JOIN and not holds_role and bot.member_cache is not None:
+            bot.member_cache.discard(guild_id, member_id)
+        return False
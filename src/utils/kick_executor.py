@@ -0,0 +1,167 @@
+"""
+Concurrent, rate-limit-aware execution of kicks
+"""
+import asyncio
+import logging
+import random
+import time
+from collections import deque
+import discord
+from src.config import (
+    KICK_CONCURRENCY,
+    KICK_BUCKET_SIZE,
+    KICK_BUCKET_SECONDS,
+    KICK_MAX_RETRIES,
+    KICK_RETRY_BASE_SECONDS
+)
+
+
+log = logging.getLogger(__name__)
+
+
+def is_transient_error(error):
+    """Errors worth retrying: rate limits, Discord 5xx and network failures"""
+    if isinstance(error, discord.HTTPException):
+        return error.status == 429 or error.status >= 500
+    return isinstance(error, (asyncio.TimeoutError, OSError))
+
+
+def _retry_after(error):
+    """Seconds Discord asked us to wait in a 429 response, if any"""
+    response = getattr(error, 'response', None)
+    headers = getattr(response, 'headers', None) or {}
+    for header in ('Retry-After', 'X-RateLimit-Reset-After'):
+        try:
+            return float(headers[header])
+        except (KeyError, TypeError, ValueError):
+            continue
+    return None
+
+
+class RouteBucket:
+    """
+    Token bucket mirroring a Discord per-route rate limit
+    
+    Kicks share the DELETE /guilds/{guild_id}/members/{user_id} route, whose
+    bucket is keyed by guild. Pacing requests locally keeps us under the limit
+    instead of discovering it through 429 responses.
+    """
+    
+    def __init__(self, size=KICK_BUCKET_SIZE, per=KICK_BUCKET_SECONDS):
+        self.size = size
+        self.per = per
+        self._tokens = float(size)
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+    
+    def block_for(self, seconds):
+        """Stop handing out tokens for a while (after a 429)"""
+        self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+        self._tokens = 0.0
+    
+    async def acquire(self):
+        """Wait until a request may be sent on this route"""
+        while True:
+            now = time.monotonic()
+            if now < self._blocked_until:
+                await asyncio.sleep(self._blocked_until - now)
+                continue
+            
+            self._tokens = min(self.size, self._tokens + (now - self._updated) * self.size / self.per)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return
+            await asyncio.sleep((1 - self._tokens) * self.per / self.size)
+
+
+class KickExecutor:
+    """
+    Runs kick jobs through per-guild queues
+    
+    Each guild drains its own queue in order and paces itself with its route
+    bucket, so one guild with a huge backlog never blocks the others. A
+    global semaphore caps the number of requests in flight across guilds, and
+    transient failures are retried with exponential backoff.
+    """
+    
+    def __init__(self, concurrency=KICK_CONCURRENCY, max_retries=KICK_MAX_RETRIES,
+                 bucket_size=KICK_BUCKET_SIZE, bucket_seconds=KICK_BUCKET_SECONDS):
+        self.concurrency = concurrency
+        self.max_retries = max_retries
+        self.bucket_size = bucket_size
+        self.bucket_seconds = bucket_seconds
+        self._queues = {}  # {guild_id: deque of (action, on_done)}
+        self._workers = {}  # {guild_id: Task}
+        self._buckets = {}  # {guild_id: RouteBucket}
+        self._semaphore = None
+    
+    @property
+    def pending(self):
+        """Number of queued jobs across all guilds"""
+        return sum(len(queue) for queue in self._queues.values())
+    
+    def submit(self, guild_id, action, on_done):
+        """
+        Queue a job for a guild
+        
+        Args:
+            guild_id: Guild whose route bucket the job uses
+            action: Coroutine function performing the request
+            on_done: Coroutine function called as on_done(result, error)
+        """
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+        
+        self._queues.setdefault(guild_id, deque()).append((action, on_done))
+        
+        worker = self._workers.get(guild_id)
+        if worker is None or worker.done():
+            self._workers[guild_id] = asyncio.create_task(self._drain(guild_id))
+    
+    async def close(self):
+        """Cancel all workers and drop queued jobs"""
+        for worker in self._workers.values():
+            worker.cancel()
+        await asyncio.gather(*self._workers.values(), return_exceptions=True)
+        self._workers.clear()
+        self._queues.clear()
+    
+    async def _drain(self, guild_id):
+        """Work through a guild's queue until it is empty"""
+        queue = self._queues[guild_id]
+        bucket = self._buckets.get(guild_id)
+        if bucket is None:
+            bucket = self._buckets[guild_id] = RouteBucket(self.bucket_size, self.bucket_seconds)
+        
+        while queue:
+            action, on_done = queue.popleft()
+            result, error = await self._run(bucket, action)
+            try:
+                await on_done(result, error)
+            except Exception:
+                log.exception("Error handling kick result", extra={'guild_id': guild_id})
+        
+        del self._queues[guild_id]
+        self._workers.pop(guild_id, None)
+    
+    async def _run(self, bucket, action):
+        """Run one job, retrying transient failures with backoff"""
+        attempt = 0
+        while True:
+            await bucket.acquire()
+            try:
+                async with self._semaphore:
+                    return await action(), None
+            except Exception as e:
+                if not is_transient_error(e) or attempt >= self.max_retries:
+                    return None, e
+                
+                delay = KICK_RETRY_BASE_SECONDS * (2 ** attempt) + random.uniform(0, 1)
+                retry_after = _retry_after(e)
+                if retry_after is not None:
+                    bucket.block_for(retry_after)
+                    delay = max(delay, retry_after)
+                
+                attempt += 1
+                await asyncio.sleep(delay)
@@ -1,39 +1,34 @@
 """
 Logging utilities for sending kick logs to Discord channels
 """
+import asyncio
+import logging
 import discord
 from datetime import datetime
-from src.config import COLOR_DARK
+from src.config import COLOR_DARK, LOG_FLUSH_SECONDS, LOG_BATCH_SIZE
 
 
-async def send_kick_log(guild, member, time_unverified_minutes, log_channel_id, kick_after_minutes):
-    """
-    Send a professional log message to the configured log channel
-    
-    Args:
-        guild: Discord guild object
-        member: Discord member object who was kicked
-        time_unverified_minutes: How long they were unverified (in minutes)
-        log_channel_id: Channel ID where to send the log
-        kick_after_minutes: Configured kick threshold
-    """
-    if not log_channel_id:
-        return False
-    
-    log_channel = guild.get_channel(log_channel_id)
-    if not log_channel:
-        return False
-    
-    # Calculate time components
-    hours = time_unverified_minutes // 60
-    minutes = time_unverified_minutes % 60
+log = logging.getLogger(__name__)
+
+
+# Discord limits for a single message
+MAX_EMBEDS_PER_MESSAGE = 10
+MAX_EMBED_CHARS_PER_MESSAGE = 6000
+SUMMARY_LINES_PER_EMBED = 20
+
+
+def format_duration(total_minutes):
+    """Format minutes as '1h 5m' or '5m'"""
+    hours = total_minutes // 60
+    minutes = total_minutes % 60
     
     if hours > 0:
-        time_str = f"{hours}h {minutes}m"
-    else:
-        time_str = f"{minutes}m"
-    
-    # Create clean, professional embed
+        return f"{hours}h {minutes}m"
+    return f"{minutes}m"
+
+
+def build_kick_log_embed(member, time_unverified_minutes, kick_after_minutes):
+    """Build the log embed for a single kicked member"""
     embed = discord.Embed(
         description=f"**{member.mention}** was removed for not verifying within {kick_after_minutes} minutes.",
         color=COLOR_DARK,
@@ -47,7 +42,7 @@ async def send_kick_log(guild, member, time_unverified_minutes, log_channel_id,
     
     embed.add_field(
         name="Duration Unverified",
-        value=f"`{time_str}`",
+        value=f"`{format_duration(time_unverified_minutes)}`",
         inline=True
     )
     
@@ -58,13 +53,127 @@ async def send_kick_log(guild, member, time_unverified_minutes, log_channel_id,
     )
     
     embed.set_footer(text="Auto-Kick System")
+    return embed
+
+
+class KickLogAggregator:
+    """
+    Buffers kick logs and failure embeds per log channel
+    
+    A channel's buffer is flushed LOG_FLUSH_SECONDS after its first entry,
+    or as soon as it holds LOG_BATCH_SIZE entries. Up to ten embeds are sent
+    per message, and when more than ten members were kicked in one window
+    the individual embeds are collapsed into compact summary embeds.
+    """
+    
+    def __init__(self, flush_seconds=LOG_FLUSH_SECONDS, batch_size=LOG_BATCH_SIZE):
+        self.flush_seconds = flush_seconds
+        self.batch_size = batch_size
+        self._channels = {}  # {channel_id: channel}
+        self._kicks = {}  # {channel_id: [(member, minutes, kick_after_minutes)]}
+        self._embeds = {}  # {channel_id: [embed]}
+        self._timers = {}  # {channel_id: Task}
+        self._flushes = set()  # Running flush tasks, awaited on close
+    
+    def add_kick(self, channel, member, time_unverified_minutes, kick_after_minutes):
+        """Buffer a kick log entry"""
+        self._kicks.setdefault(channel.id, []).append((member, time_unverified_minutes, kick_after_minutes))
+        self._added(channel)
+    
+    def add_embed(self, channel, embed):
+        """Buffer an arbitrary embed (e.g. a failure notice)"""
+        self._embeds.setdefault(channel.id, []).append(embed)
+        self._added(channel)
+    
+    def _added(self, channel):
+        """Start the flush timer, or flush right away when the buffer is full"""
+        self._channels[channel.id] = channel
+        pending = len(self._kicks.get(channel.id, ())) + len(self._embeds.get(channel.id, ()))
+        
+        if pending >= self.batch_size:
+            timer = self._timers.pop(channel.id, None)
+            if timer is not None:
+                timer.cancel()
+            self._start_flush(channel.id)
+        elif channel.id not in self._timers:
+            self._timers[channel.id] = asyncio.create_task(self._flush_later(channel.id))
+    
+    async def _flush_later(self, channel_id):
+        """Flush a channel once its batching window has passed"""
+        await asyncio.sleep(self.flush_seconds)
+        self._timers.pop(channel_id, None)
+        self._start_flush(channel_id)
+    
+    def _start_flush(self, channel_id):
+        """Flush a channel in a task that close() waits for"""
+        task = asyncio.create_task(self.flush(channel_id))
+        self._flushes.add(task)
+        task.add_done_callback(self._flushes.discard)
+    
+    async def flush(self, channel_id):
+        """Send everything buffered for one channel"""
+        channel = self._channels.pop(channel_id, None)
+        kicks = self._kicks.pop(channel_id, [])
+        embeds = self._embeds.pop(channel_id, [])
+        if channel is None or not (kicks or embeds):
+            return
+        
+        if len(kicks) > MAX_EMBEDS_PER_MESSAGE:
+            embeds = self._build_summaries(kicks) + embeds
+        else:
+            embeds = [build_kick_log_embed(*kick) for kick in kicks] + embeds
+        
+        for batch in self._batch_embeds(embeds):
+            try:
+                await channel.send(embeds=batch)
+            except discord.Forbidden:
+                log.warning("Missing permissions to send logs to channel %s", channel.id)
+                return
+            except Exception as e:
+                log.warning("Error sending log to channel %s: %s", channel.id, e)
+    
+    async def close(self):
+        """Wait for running flushes, then flush every buffered channel"""
+        for timer in self._timers.values():
+            timer.cancel()
+        self._timers.clear()
+        if self._flushes:
+            await asyncio.gather(*self._flushes, return_exceptions=True)
+        for channel_id in list(self._channels):
+            await self.flush(channel_id)
+    
+    @staticmethod
+    def _build_summaries(kicks):
+        """Collapse many kick entries into compact summary embeds"""
+        summaries = []
+        for start in range(0, len(kicks), SUMMARY_LINES_PER_EMBED):
+            chunk = kicks[start:start + SUMMARY_LINES_PER_EMBED]
+            lines = [
+                f"• {member.mention} `{member.name}` (`{member.id}`) - `{format_duration(minutes)}`"
+                for member, minutes, _kick_after in chunk
+            ]
+            embed = discord.Embed(
+                title=f"👢 {len(kicks)} members removed for not verifying" if start == 0 else None,
+                description="\n".join(lines),
+                color=COLOR_DARK,
+                timestamp=datetime.now()
+            )
+            embed.set_footer(text="Auto-Kick System")
+            summaries.append(embed)
+        return summaries
     
-    try:
-        await log_channel.send(embed=embed)
-        return True
-    except discord.Forbidden:
-        print(f"  ⚠️ Missing permissions to send logs to channel {log_channel.name}")
-        return False
-    except Exception as e:
-        print(f"  ⚠️ Error sending log: {e}")
-        return False
+    @staticmethod
+    def _batch_embeds(embeds):
+        """Group embeds into messages within Discord's count and size limits"""
+        batch = []
+        batch_chars = 0
+        for embed in embeds:
+            size = len(embed)
+            if batch and (len(batch) >= MAX_EMBEDS_PER_MESSAGE or batch_chars + size > MAX_EMBED_CHARS_PER_MESSAGE):
+                yield batch
+                batch = []
+                batch_chars = 0
+            batch.append(embed)
+            batch_chars += size
+        if batch:
+            yield batch
@@ -0,0 +1,100 @@
+"""
+Member cache restricted to unverified members (low-memory mode)
+"""
+import logging
+import discord
+
+
+log = logging.getLogger(__name__)
+
+
+class TrackedMemberCache:
+    """
+    Keeps only unverified members in discord.py's member cache
+    
+    In low-memory mode the bot runs with MemberCacheFlags.none() and
+    without startup chunking, so discord.py caches nothing but the bot's
+    own member. This class adds back the members the bot works with:
+    
+    - load_guild() chunks a guild, but every GUILD_MEMBERS_CHUNK is cut
+      down to holders of the unverified role before discord.py builds
+      Member objects, so only one chunk of raw payloads is in memory.
+    - GUILD_MEMBER_UPDATE for an uncached member, which discord.py drops,
+      is dispatched as `uncached_member_update` (guild, raw payload).
+    - Members are removed again once they are no longer tracked.
+    
+    A guild counts as loaded for the guild object that was chunked; a
+    guild re-created after an outage starts with an empty cache again.
+    """
+    
+    def __init__(self, bot):
+        self.bot = bot
+        self._loaded = {}  # {guild_id: Guild} whose unverified members are cached
+        self._parse_chunk = None
+        self._parse_update = None
+    
+    def install(self):
+        """Wrap the connection state's parsers for chunks and member updates"""
+        parsers = self.bot._connection.parsers
+        self._parse_chunk = parsers['GUILD_MEMBERS_CHUNK']
+        self._parse_update = parsers['GUILD_MEMBER_UPDATE']
+        parsers['GUILD_MEMBERS_CHUNK'] = self._filter_chunk
+        parsers['GUILD_MEMBER_UPDATE'] = self._member_update
+    
+    def _unverified_role_id(self, guild):
+        role = self.bot.get_unverified_role(guild) if guild else None
+        return str(role.id) if role else None
+    
+    def _filter_chunk(self, data):
+        role_id = self._unverified_role_id(self.bot.get_guild(int(data['guild_id'])))
+        data['members'] = [
+            member for member in data.get('members', ()) if role_id in member['roles']
+        ] if role_id else []
+        data.pop('presences', None)
+        self._parse_chunk(data)
+    
+    def _member_update(self, data):
+        guild = self.bot.get_guild(int(data['guild_id']))
+        if guild is not None and guild.get_member(int(data['user']['id'])) is None:
+            self.bot.dispatch('uncached_member_update', guild, data)
+        self._parse_update(data)
+    
+    def covers(self, guild):
+        """Whether the guild's unverified members are in the cache"""
+        return self._loaded.get(guild.id) is guild
+    
+    async def load_guild(self, guild):
+        """Fetch the guild's unverified members into the cache"""
+        if self.covers(guild):
+            return
+        # Concurrent calls for one guild share discord.py's chunk request
+        members = await guild.chunk(cache=True)
+        self._loaded[guild.id] = guild
+        log.debug("Cached %d unverified member(s)", len(members), extra={'guild_id': guild.id})
+    
+    def add(self, member):
+        """Cache a member received in an event"""
+        member.guild._add_member(member)
+    
+    def add_payload(self, guild, data):
+        """Cache a member from a raw member payload, returns the Member"""
+        member = discord.Member(data=data, guild=guild, state=self.bot._connection)
+        guild._add_member(member)
+        return member
+    
+    def discard(self, guild_id, member_id):
+        """Drop a member that is no longer tracked"""
+        guild = self.bot.get_guild(guild_id)
+        member = guild.get_member(member_id) if guild else None
+        if member is not None and member_id != self.bot.user.id:
+            guild._remove_member(member)
+    
+    def clear_guild(self, guild_id):
+        """Drop every cached member of a guild except the bot, it will be loaded again"""
+        self._loaded.pop(guild_id, None)
+        guild = self.bot.get_guild(guild_id)
+        if guild is None:
+            return
+        for member in list(guild.members):
+            if member.id != self.bot.user.id:
+                guild._remove_member(member)
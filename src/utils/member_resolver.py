@@ -0,0 +1,83 @@
+"""
+Batched member lookups for members missing from the cache
+"""
+import asyncio
+import logging
+import time
+from src.config import MEMBER_RESOLVE_CACHE_SECONDS
+
+
+log = logging.getLogger(__name__)
+
+# Discord accepts at most 100 user IDs per REQUEST_GUILD_MEMBERS
+QUERY_BATCH_SIZE = 100
+
+
+class MemberResolver:
+    """
+    Resolves member IDs to Member objects
+    
+    With the full member cache a member missing from it has left, so the
+    cache is the answer. In low-memory mode cache misses are looked up
+    with gateway member queries, up to 100 IDs per round trip. Members
+    found are added to the member cache; IDs not found are remembered for
+    MEMBER_RESOLVE_CACHE_SECONDS so /status pages don't query them again.
+    Query responses go through TrackedMemberCache's chunk filter, so only
+    holders of the unverified role come back; anyone else has left or
+    verified.
+    """
+    
+    def __init__(self, bot, ttl=MEMBER_RESOLVE_CACHE_SECONDS):
+        self.bot = bot
+        self.ttl = ttl
+        self._not_found = {}  # {(guild_id, member_id): expires_at}
+    
+    async def resolve(self, guild, member_ids):
+        """
+        Return {member_id: Member or None (not in the guild)}
+        
+        IDs whose query failed are left out, callers should retry those later.
+        """
+        resolved = {}
+        missing = []
+        for member_id in member_ids:
+            member = guild.get_member(member_id)
+            if member is not None or self.bot.member_cache is None:
+                resolved[member_id] = member
+            else:
+                missing.append(member_id)
+        if not missing:
+            return resolved
+        
+        now = time.monotonic()
+        queries = []
+        for member_id in missing:
+            if self._not_found.get((guild.id, member_id), 0) > now:
+                resolved[member_id] = None
+            else:
+                queries.append(member_id)
+        
+        for start in range(0, len(queries), QUERY_BATCH_SIZE):
+            batch = queries[start:start + QUERY_BATCH_SIZE]
+            try:
+                members = await guild.query_members(user_ids=batch, limit=len(batch), cache=True)
+            except asyncio.TimeoutError:
+                log.warning("Member query for %d ID(s) timed out", len(batch), extra={'guild_id': guild.id})
+                continue
+            self.bot.metrics.member_queries.inc()
+            
+            found = {member.id: member for member in members}
+            expires_at = time.monotonic() + self.ttl
+            if len(self._not_found) >= 10000:
+                self._prune(now)
+            for member_id in batch:
+                member = found.get(member_id)
+                resolved[member_id] = member
+                if member is None:
+                    self._not_found[(guild.id, member_id)] = expires_at
+        
+        return resolved
+    
+    def _prune(self, now):
+        for key in [key for key, expires_at in self._not_found.items() if expires_at <= now]:
+            del self._not_found[key]
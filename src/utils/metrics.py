@@ -0,0 +1,352 @@
+"""
+In-process metrics with Prometheus text exposition
+"""
+import asyncio
+import logging
+from bisect import bisect_left
+from src.config import METRICS_HOST, METRICS_PORT
+
+
+log = logging.getLogger(__name__)
+
+# Latency buckets in seconds
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+FAST_BUCKETS = (0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1)
+# Records applied per member event batch
+BATCH_BUCKETS = (1, 10, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+def _format_value(value):
+    if isinstance(value, float):
+        if value == float('inf'):
+            return '+Inf'
+        return repr(value)
+    return str(value)
+
+
+def _format_labels(labelnames, values):
+    """Render {name="value",...} once, when a child is created"""
+    if not labelnames:
+        return ''
+    pairs = []
+    for name, value in zip(labelnames, values):
+        value = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        pairs.append(f'{name}="{value}"')
+    return '{' + ','.join(pairs) + '}'
+
+
+class _Metric:
+    """Base for metric families, children are created once per label set and kept"""
+    
+    kind = None
+    
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children = {}
+        if not self.labelnames:
+            self._default = self.labels()
+    
+    def labels(self, *values):
+        """Return the child for a label set; bind it once and reuse it on hot paths"""
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}")
+            child = self._new_child(_format_labels(self.labelnames, values))
+            self._children[values] = child
+        return child
+    
+    def _new_child(self, label_text):
+        raise NotImplementedError
+    
+    def samples(self):
+        """Yield (suffix, label_text, value) for every child"""
+        for child in self._children.values():
+            yield from child.samples()
+    
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for suffix, label_text, value in self.samples():
+            lines.append(f"{self.name}{suffix}{label_text} {_format_value(value)}")
+        return lines
+
+
+class _CounterChild:
+    __slots__ = ('label_text', 'value')
+    
+    def __init__(self, label_text):
+        self.label_text = label_text
+        self.value = 0
+    
+    def inc(self, amount=1):
+        self.value += amount
+    
+    def samples(self):
+        yield '', self.label_text, self.value
+
+
+class Counter(_Metric):
+    """Monotonic counter, exposed as <name>_total"""
+    
+    kind = 'counter'
+    
+    def __init__(self, name, documentation, labelnames=()):
+        super().__init__(name + '_total', documentation, labelnames)
+    
+    def _new_child(self, label_text):
+        return _CounterChild(label_text)
+    
+    def inc(self, amount=1):
+        self._default.inc(amount)
+
+
+class _GaugeChild:
+    __slots__ = ('label_text', 'value')
+    
+    def __init__(self, label_text):
+        self.label_text = label_text
+        self.value = 0
+    
+    def set(self, value):
+        self.value = value
+    
+    def inc(self, amount=1):
+        self.value += amount
+    
+    def dec(self, amount=1):
+        self.value -= amount
+    
+    def samples(self):
+        yield '', self.label_text, self.value
+
+
+class Gauge(_Metric):
+    """
+    Value that can go up and down
+    
+    With a collect callback the values are only computed at scrape time:
+    collect() returns (label_values, value) pairs.
+    """
+    
+    kind = 'gauge'
+    
+    def __init__(self, name, documentation, labelnames=(), collect=None):
+        self.collect = collect
+        super().__init__(name, documentation, labelnames)
+    
+    def _new_child(self, label_text):
+        return _GaugeChild(label_text)
+    
+    def set(self, value):
+        self._default.set(value)
+    
+    def samples(self):
+        if self.collect is None:
+            yield from super().samples()
+            return
+        for values, value in self.collect():
+            yield '', _format_labels(self.labelnames, values), value
+
+
+class _HistogramChild:
+    __slots__ = ('label_text', 'buckets', 'counts', 'sum', 'count')
+    
+    def __init__(self, label_text, buckets):
+        self.label_text = label_text
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+    
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+    
+    def samples(self):
+        # Buckets are stored per interval and made cumulative at scrape time
+        cumulative = 0
+        prefix = self.label_text[:-1] + ',' if self.label_text else '{'
+        for bound, bucket_count in zip(self.buckets, self.counts):
+            cumulative += bucket_count
+            yield '_bucket', f'{prefix}le="{_format_value(float(bound))}"}}', cumulative
+        yield '_bucket', f'{prefix}le="+Inf"}}', self.count
+        yield '_sum', self.label_text, self.sum
+        yield '_count', self.label_text, self.count
+
+
+class Histogram(_Metric):
+    """Distribution of observed values over fixed buckets"""
+    
+    kind = 'histogram'
+    
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames)
+    
+    def _new_child(self, label_text):
+        return _HistogramChild(label_text, self.buckets)
+    
+    def observe(self, value):
+        self._default.observe(value)
+
+
+class MetricsRegistry:
+    """
+    Holds metric families and renders them in the Prometheus text format
+    
+    Metrics are only updated from the event loop thread, so children are
+    plain attribute updates without locks.
+    """
+    
+    def __init__(self):
+        self._metrics = {}
+    
+    def _register(self, metric):
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+    
+    def counter(self, name, documentation, labelnames=()):
+        return self._register(Counter(name, documentation, labelnames))
+    
+    def gauge(self, name, documentation, labelnames=(), collect=None):
+        return self._register(Gauge(name, documentation, labelnames, collect))
+    
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+    
+    def render(self):
+        """Text exposition of every metric"""
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+# discord.http warning templates logged for every 429, retried or raised
+RATE_LIMIT_LOG_TEMPLATES = frozenset({
+    'We are being rate limited. %s %s responded with 429. Retrying in %.2f seconds.',
+    'We are being rate limited. %s %s responded with 429. Timeout of %.2f was too long, erroring instead.'
+})
+
+
+class RateLimitLogCounter(logging.Filter):
+    """
+    Counts the 429 responses discord.py reports on the discord.http logger
+    
+    The library retries rate-limited requests internally, its warning log is
+    the only place every 429 shows up. Records are matched on their
+    unformatted template, so the discord logger must stay at WARNING or below.
+    """
+    
+    def __init__(self, counter):
+        super().__init__()
+        self.counter = counter
+    
+    def filter(self, record):
+        if record.msg in RATE_LIMIT_LOG_TEMPLATES:
+            self.counter.inc()
+        return True
+
+
+class BotMetrics:
+    """The auto-kick pipeline's metrics, children pre-bound for the hot paths"""
+    
+    def __init__(self, bot, registry=None):
+        self.bot = bot
+        self.registry = registry or MetricsRegistry()
+        registry = self.registry
+        
+        registry.gauge(
+            'strix_tracked_members', 'Members currently tracked per guild', ('guild_id',),
+            collect=self._collect_tracked_members
+        )
+        
+        self.kick_attempts = registry.counter('strix_kick_attempts', 'Kick requests sent to Discord, retries included').labels()
+        kicks = registry.counter('strix_kicks', 'Finished kick jobs by result', ('result',))
+        self.kicks_succeeded = kicks.labels('succeeded')
+        self.kicks_forbidden = kicks.labels('forbidden')
+        self.kicks_not_found = kicks.labels('not_found')
+        self.kicks_failed = kicks.labels('failed')
+        
+        dm_warnings = registry.counter('strix_dm_warnings', 'Pre-kick warning DMs by result', ('result',))
+        self.dm_warnings_sent = dm_warnings.labels('sent')
+        self.dm_warnings_failed = dm_warnings.labels('failed')
+        self.dm_warnings_skipped = dm_warnings.labels('skipped')
+        
+        self.sweep_duration = registry.histogram(
+            'strix_sweep_duration_seconds', 'Time spent processing due members per sweep'
+        ).labels()
+        self.member_latency = registry.histogram(
+            'strix_member_processing_seconds', 'Time spent on one due member in a sweep', buckets=FAST_BUCKETS
+        ).labels()
+        
+        handlers = registry.histogram(
+            'strix_event_handler_seconds', 'Event handler latency', ('event',), buckets=FAST_BUCKETS
+        )
+        self.member_update_latency = handlers.labels('on_member_update')
+        self.member_join_latency = handlers.labels('on_member_join')
+        self.ingest_batch_size = registry.histogram(
+            'strix_ingest_batch_size', 'Member event records applied per batch', buckets=BATCH_BUCKETS
+        ).labels()
+        
+        self.save_duration = registry.histogram('strix_save_duration_seconds', 'Duration of background data saves').labels()
+        self.save_bytes = registry.counter('strix_save_bytes', 'Bytes written by background data saves').labels()
+        self.journal_compactions = registry.counter('strix_journal_compactions', 'Journal snapshots written').labels()
+        
+        self.rate_limited = registry.counter('strix_http_rate_limited', 'HTTP 429 responses received from Discord').labels()
+        self.member_queries = registry.counter('strix_member_queries', 'Gateway member queries for uncached members').labels()
+        self.presence_updates = registry.counter('strix_presence_updates', 'Presence updates sent to shards').labels()
+        self._rate_limit_filter = RateLimitLogCounter(self.rate_limited)
+        logging.getLogger('discord.http').addFilter(self._rate_limit_filter)
+        
+        self._server = None
+    
+    def _collect_tracked_members(self):
+        for guild_id, table in self.bot.unverified_members.items():
+            yield (guild_id,), len(table)
+    
+    async def start_server(self, host=METRICS_HOST, port=METRICS_PORT):
+        """Serve GET /metrics on host:port, does nothing when port is None"""
+        if port is None or self._server is not None:
+            return
+        self._server = await asyncio.start_server(self._handle_scrape, host, port)
+        log.info("Serving metrics on http://%s:%d/metrics", host, port)
+    
+    async def close(self):
+        """Stop the exposition endpoint"""
+        logging.getLogger('discord.http').removeFilter(self._rate_limit_filter)
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+    
+    async def _handle_scrape(self, reader, writer):
+        """Minimal HTTP/1.0 responder for scrapes"""
+        try:
+            request_line = await asyncio.wait_for(reader.readline(), 5)
+            # Skip the headers
+            while (await asyncio.wait_for(reader.readline(), 5)).strip():
+                pass
+            
+            parts = request_line.decode('latin-1').split()
+            if len(parts) >= 2 and parts[0] == 'GET' and parts[1].split('?')[0] == '/metrics':
+                status, body = '200 OK', self.registry.render().encode()
+                content_type = 'text/plain; version=0.0.4; charset=utf-8'
+            else:
+                status, body = '404 Not Found', b'Not Found\n'
+                content_type = 'text/plain'
+            
+            writer.write(
+                f"HTTP/1.0 {status}\r\nContent-Type: {content_type}\r\n"
+                f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode() + body
+            )
+            await writer.drain()
+        except (asyncio.TimeoutError, ConnectionError):
+            pass
+        finally:
+            writer.close()
@@ -16,34 +16,28 @@ def has_permission(bot, interaction_or_ctx):
     # Get member and guild
     if isinstance(interaction_or_ctx, discord.Interaction):
         member = interaction_or_ctx.user
-        guild_id = interaction_or_ctx.guild.id
+        guild = interaction_or_ctx.guild
     else:  # Context from prefix command
         member = interaction_or_ctx.author
-        guild_id = interaction_or_ctx.guild.id
+        guild = interaction_or_ctx.guild
     
     # Check if user is administrator
     if member.guild_permissions.administrator:
         return True
     
     # Check if user has any allowed staff roles
-    config = bot.get_guild_config(guild_id)
-    allowed_roles = config.get('allowed_roles', [])
+    allowed_roles = bot.get_guild_config(guild.id).allowed_roles
+    if not allowed_roles:
+        return False
     
-    # Get user's role names
-    user_role_names = [role.name for role in member.roles]
-    
-    # Check if user has any allowed role
-    for role_name in allowed_roles:
-        if role_name in user_role_names:
-            return True
-    
-    return False
+    # Set lookups for the member's role ID array, no Role objects built
+    staff_role_ids = bot.staff_roles.get_role_ids(guild, allowed_roles)
+    return not staff_role_ids.isdisjoint(member._roles)
 
 
 def get_permission_error_message(bot, guild_id):
     """Get error message for permission denied"""
-    config = bot.get_guild_config(guild_id)
-    allowed_roles = config.get('allowed_roles', [])
+    allowed_roles = bot.get_guild_config(guild_id).allowed_roles
     
     if allowed_roles:
         roles_list = ", ".join([f"`{role}`" for role in allowed_roles])
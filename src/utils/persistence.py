@@ -0,0 +1,213 @@
+"""
+Write-behind persistence for tracked members and guild configs
+"""
+import asyncio
+import functools
+import logging
+import time
+from array import array
+from src.config import SAVE_DEBOUNCE_SECONDS, JOURNAL_FLUSH_SECONDS
+from src.storage.journal_backend import TRACK, UNTRACK, CLEAR, CONFIG
+from .data_manager import DataManager
+
+
+log = logging.getLogger(__name__)
+
+
+class PersistenceEngine:
+    """
+    Coalesces data changes per guild and writes them out in the background
+    
+    Mutations only mark their guild dirty. A flush runs at most once per
+    debounce interval, snapshots just the dirty guilds on the event loop and
+    hands the file writes to a worker thread.
+    
+    With a journaled backend the bot also reports each change (journal_*
+    methods), and a flush appends those records instead of snapshotting
+    the dirty guilds. The debounce interval is then JOURNAL_FLUSH_SECONDS,
+    and once the journal outgrew the last snapshot a compaction snapshots
+    every guild in the background.
+    """
+    
+    def __init__(self, bot, debounce_seconds=None):
+        self.bot = bot
+        journaled = DataManager.journaled()
+        if debounce_seconds is None:
+            debounce_seconds = JOURNAL_FLUSH_SECONDS if journaled else SAVE_DEBOUNCE_SECONDS
+        self.debounce_seconds = debounce_seconds
+        self._dirty = set()
+        self._journal = [] if journaled else None  # [(type, guild_id, key, value)] not written yet
+        self._replace = set()  # Journaled: guilds written in full with the next flush
+        self._dirty_event = None
+        self._flush_lock = None
+        self._task = None
+        self._compaction = None
+    
+    @property
+    def pending(self):
+        """Number of guilds waiting to be written"""
+        return len(self._dirty)
+    
+    def mark_dirty(self, guild_id=None):
+        """Queue a guild (or every known guild when None) for the next flush"""
+        if guild_id is None:
+            self._dirty.update(self.bot.unverified_members)
+            self._dirty.update(self.bot.guild_configs)
+            if self._journal is not None:
+                self._replace.update(self._dirty)
+        else:
+            self._dirty.add(guild_id)
+        
+        if self._dirty_event is not None:
+            self._dirty_event.set()
+    
+    def journal_track(self, guild_id, member_id, join_timestamp):
+        """Record a tracked member (journaled backends)"""
+        if self._journal is not None:
+            self._record((TRACK, guild_id, member_id, join_timestamp))
+    
+    def journal_untrack(self, guild_id, member_id):
+        """Record an untracked member (journaled backends)"""
+        if self._journal is not None:
+            self._record((UNTRACK, guild_id, member_id, None))
+    
+    def journal_clear(self, guild_id):
+        """Record that a guild's tracked members were forgotten (journaled backends)"""
+        if self._journal is not None:
+            self._record((CLEAR, guild_id, None, None))
+    
+    def journal_config(self, guild_id, config):
+        """Record a guild's new config (journaled backends)"""
+        if self._journal is not None:
+            self._record((CONFIG, guild_id, config.to_dict(), None))
+    
+    def _record(self, record):
+        """Queue a journal record and wake the flush loop, so it is written within one window"""
+        self._journal.append(record)
+        if self._dirty_event is not None:
+            self._dirty_event.set()
+    
+    def start(self):
+        """Start the background flush loop"""
+        if self._task is None:
+            self._dirty_event = asyncio.Event()
+            self._flush_lock = asyncio.Lock()
+            if self._dirty or self._journal:
+                self._dirty_event.set()
+            self._task = asyncio.create_task(self._run())
+        return self._task
+    
+    async def close(self):
+        """Stop the flush loop and write whatever is still pending"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        
+        if self._flush_lock is None:
+            self._flush_lock = asyncio.Lock()
+        await self.flush()
+        if self._compaction is not None:
+            await self._compaction
+    
+    async def flush(self):
+        """Write all dirty guilds, returns the number of guilds written"""
+        async with self._flush_lock:
+            if not self._dirty and not self._journal:
+                return 0
+            
+            dirty, self._dirty = self._dirty, set()
+            if self._journal is None:
+                write = functools.partial(DataManager.save_guilds, self._snapshot(dirty))
+            else:
+                records, self._journal = self._journal, []
+                replace, self._replace = self._replace, set()
+                write = functools.partial(DataManager.append_journal, records, self._snapshot(replace))
+            
+            started = time.perf_counter()
+            loop = asyncio.get_running_loop()
+            try:
+                bytes_written = await loop.run_in_executor(None, write)
+            except Exception:
+                log.exception("Error saving data")
+                # Keep the guilds queued so the next flush retries them
+                self._dirty |= dirty
+                if self._journal is not None:
+                    # Records are assignments, rewriting part of a failed batch is harmless
+                    self._journal[:0] = records
+                    self._replace |= replace
+                return 0
+            
+            elapsed = time.perf_counter() - started
+            self.bot.metrics.save_duration.observe(elapsed)
+            self.bot.metrics.save_bytes.inc(bytes_written)
+            elapsed_ms = elapsed * 1000
+            log.debug(
+                "Saved %d guild(s), %d bytes in %.1fms", len(dirty), bytes_written, elapsed_ms,
+                extra={'guilds': len(dirty), 'bytes': bytes_written, 'elapsed_ms': round(elapsed_ms, 1)}
+            )
+            
+            if self._journal is not None and self._compaction is None and DataManager.journal_needs_compaction():
+                await self._start_compaction()
+            return len(dirty)
+    
+    async def _start_compaction(self):
+        """Switch to a new journal and snapshot every guild in the background (flush lock held)"""
+        loop = asyncio.get_running_loop()
+        generation = await loop.run_in_executor(None, DataManager.rotate_journal)
+        # Everything up to now is in the old journal or queued for the new one
+        state = {}
+        for guild_id in set(self.bot.unverified_members) | set(self.bot.guild_configs):
+            table = self.bot.unverified_members.get(guild_id)
+            ids, stamps = table.arrays() if table is not None else (array('Q'), array('d'))
+            config = self.bot.guild_configs.get(guild_id)
+            state[guild_id] = (ids, stamps, config.to_dict() if config is not None else None)
+        self._compaction = asyncio.create_task(self._compact(state, generation))
+    
+    async def _compact(self, state, generation):
+        started = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        try:
+            bytes_written = await loop.run_in_executor(None, DataManager.write_snapshot, state, generation)
+        except Exception:
+            # The older journals are kept, recovery still replays them
+            log.exception("Error compacting the journal")
+            return
+        finally:
+            self._compaction = None
+        
+        self.bot.metrics.journal_compactions.inc()
+        self.bot.metrics.save_bytes.inc(bytes_written)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        log.info(
+            "Compacted the journal into a %d byte snapshot of %d guild(s) in %.1fms", bytes_written, len(state), elapsed_ms,
+            extra={'guilds': len(state), 'bytes': bytes_written, 'elapsed_ms': round(elapsed_ms, 1)}
+        )
+    
+    def _snapshot(self, guild_ids):
+        """Copy the data of the given guilds so writes don't race mutations"""
+        snapshot = {}
+        for guild_id in guild_ids:
+            members = self.bot.unverified_members.get(guild_id, {})
+            config = self.bot.guild_configs.get(guild_id)
+            snapshot[guild_id] = {
+                'members': dict(members.items()),
+                'config': config.to_dict() if config is not None else None
+            }
+        return snapshot
+    
+    async def _run(self):
+        """Flush dirty guilds at most once per debounce interval"""
+        while True:
+            await self._dirty_event.wait()
+            await asyncio.sleep(self.debounce_seconds)
+            self._dirty_event.clear()
+            try:
+                await self.flush()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                log.exception("Error in persistence loop")
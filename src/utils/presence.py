@@ -0,0 +1,83 @@
+"""
+Change-only, per-shard throttled presence updates
+"""
+import logging
+import time
+import discord
+from src.config import PRESENCE_MIN_INTERVAL_SECONDS, PRESENCE_MIN_CHANGE, PRESENCE_MAX_STALE_SECONDS
+
+
+log = logging.getLogger(__name__)
+
+
+class PresenceManager:
+    """
+    Keeps the "watching N unverified members" status of every shard current
+    
+    The count is the member store's running total, so a refresh costs
+    nothing while it is unchanged. A shard is only updated when its shown
+    count is off by PRESENCE_MIN_CHANGE or more (smaller differences wait
+    PRESENCE_MAX_STALE_SECONDS), and at most once per
+    PRESENCE_MIN_INTERVAL_SECONDS. Shards that identified again start
+    without a presence and are updated on the next refresh.
+    """
+    
+    def __init__(
+        self,
+        bot,
+        min_interval=PRESENCE_MIN_INTERVAL_SECONDS,
+        min_change=PRESENCE_MIN_CHANGE,
+        max_stale=PRESENCE_MAX_STALE_SECONDS
+    ):
+        self.bot = bot
+        self.min_interval = min_interval
+        self.min_change = min_change
+        self.max_stale = max_stale
+        self._shown = {}  # {shard_id: (count, pushed_at)}
+    
+    def current_count(self):
+        """Tracked members to show, cluster-wide in a cluster worker"""
+        count = self.bot.unverified_members.total_members()
+        if self.bot.cluster is not None:
+            # Every worker shows the cluster-wide count from the last status sync
+            count = max(count, self.bot.cluster.total('tracked_members'))
+        return count
+    
+    def forget_shard(self, shard_id):
+        """The shard lost its presence (new session), show it again"""
+        self._shown.pop(shard_id, None)
+    
+    def _needs_update(self, shard_id, count, now):
+        shown = self._shown.get(shard_id)
+        if shown is None:
+            return True
+        shown_count, pushed_at = shown
+        if count == shown_count or now - pushed_at < self.min_interval:
+            return False
+        if abs(count - shown_count) >= max(1, shown_count * self.min_change):
+            return True
+        return now - pushed_at >= self.max_stale
+    
+    async def refresh(self):
+        """Send the current count to the shards that need it, returns the number of updates"""
+        count = self.current_count()
+        now = time.monotonic()
+        activity = None
+        updated = 0
+        
+        for shard_id, shard in self.bot.shards.items():
+            if shard.is_closed() or not self._needs_update(shard_id, count, now):
+                continue
+            if activity is None:
+                activity = discord.Activity(type=discord.ActivityType.watching, name=f"🔎 {count:,} unverified members")
+            try:
+                await self.bot.change_presence(activity=activity, shard_id=shard_id)
+            except Exception as e:
+                log.warning("Could not update presence of shard %d: %s", shard_id, e)
+                continue
+            self._shown[shard_id] = (count, now)
+            updated += 1
+        
+        if updated:
+            self.bot.metrics.presence_updates.inc(updated)
+        return updated
@@ -0,0 +1,86 @@
+"""
+Per-guild cache of the resolved unverified role
+"""
+import discord
+
+
+_UNRESOLVED = object()
+
+
+def has_role(member, role_id):
+    """Check whether a member has a role by ID (binary search, no Role objects built)"""
+    return member._roles.has(role_id)
+
+
+class RoleCache:
+    """
+    Maps guild IDs to the ID of the role matching their configured role name
+
+    Resolving a role by name scans every role of the guild, so the result
+    (including "not found") is kept until a role event or a config change
+    invalidates it. Looking up the cached ID is a dictionary hit.
+    """
+    
+    def __init__(self):
+        self._role_ids = {}  # {guild_id: role_id or None}
+    
+    def get_role(self, guild, role_name):
+        """Return the guild's role called role_name, or None"""
+        role_id = self._role_ids.get(guild.id, _UNRESOLVED)
+        
+        if role_id is _UNRESOLVED:
+            return self._resolve(guild, role_name)
+        if role_id is None:
+            return None
+        
+        role = guild.get_role(role_id)
+        if role is None:
+            # Role vanished without us seeing the event
+            return self._resolve(guild, role_name)
+        return role
+    
+    def invalidate(self, guild_id):
+        """Forget the resolved role of a guild"""
+        self._role_ids.pop(guild_id, None)
+    
+    def clear(self):
+        """Forget every resolved role"""
+        self._role_ids.clear()
+    
+    def _resolve(self, guild, role_name):
+        """Scan the guild's roles by name and cache the result"""
+        role = discord.utils.get(guild.roles, name=role_name)
+        self._role_ids[guild.id] = role.id if role else None
+        return role
+
+
+class StaffRoleCache:
+    """
+    Maps guild IDs to the set of role IDs whose name is an allowed staff role
+
+    The set is rebuilt from the guild's roles when a role event invalidates
+    it or when the configured names change (configs are replaced, not
+    mutated, so comparing the allowed_roles tuple by identity is enough).
+    """
+    
+    def __init__(self):
+        self._role_ids = {}  # {guild_id: (allowed_roles, frozenset of role IDs)}
+    
+    def get_role_ids(self, guild, allowed_roles):
+        """Return the IDs of the guild's roles named in allowed_roles"""
+        cached = self._role_ids.get(guild.id)
+        if cached is not None and cached[0] is allowed_roles:
+            return cached[1]
+        
+        names = set(allowed_roles)
+        role_ids = frozenset(role.id for role in guild.roles if role.name in names)
+        self._role_ids[guild.id] = (allowed_roles, role_ids)
+        return role_ids
+    
+    def invalidate(self, guild_id):
+        """Forget the resolved staff roles of a guild"""
+        self._role_ids.pop(guild_id, None)
+    
+    def clear(self):
+        """Forget every resolved staff role set"""
+        self._role_ids.clear()
@@ -0,0 +1,128 @@
+"""
+Deadline-driven expiry scheduler for tracked members
+"""
+import asyncio
+import heapq
+import time
+
+
+class ExpiryScheduler:
+    """
+    Min-heap of kick deadlines keyed by (guild_id, member_id)
+    
+    Each tracked member has exactly one live deadline. Rescheduling or
+    cancelling an entry leaves a stale heap node behind which is skipped
+    (and eventually compacted) instead of re-heapifying on every change.
+    """
+    
+    def __init__(self):
+        self._heap = []  # [(deadline, guild_id, member_id)]
+        self._deadlines = {}  # {(guild_id, member_id): deadline}
+        self._wakeup = None  # Created lazily so it binds to the running loop
+    
+    def __len__(self):
+        return len(self._deadlines)
+    
+    def __contains__(self, key):
+        return key in self._deadlines
+    
+    def get_deadline(self, guild_id, member_id):
+        """Return the scheduled deadline for a member, or None"""
+        return self._deadlines.get((guild_id, member_id))
+    
+    def schedule(self, guild_id, member_id, deadline):
+        """Schedule (or reschedule) a member's deadline"""
+        key = (guild_id, member_id)
+        if self._deadlines.get(key) == deadline:
+            return
+        
+        head = self.next_deadline()
+        self._deadlines[key] = deadline
+        heapq.heappush(self._heap, (deadline, guild_id, member_id))
+        self._maybe_compact()
+        
+        # Wake the sleeper if this entry is now the earliest one
+        if self._wakeup is not None and (head is None or deadline < head):
+            self._wakeup.set()
+    
+    def cancel(self, guild_id, member_id):
+        """Remove a member's deadline, returns True if it was scheduled"""
+        if self._deadlines.pop((guild_id, member_id), None) is None:
+            return False
+        self._maybe_compact()
+        return True
+    
+    def cancel_guild(self, guild_id):
+        """Remove every deadline belonging to a guild"""
+        stale = [key for key in self._deadlines if key[0] == guild_id]
+        for key in stale:
+            del self._deadlines[key]
+        self._maybe_compact()
+        return len(stale)
+    
+    def reschedule_guild(self, guild_id, join_times, kick_after_minutes):
+        """Recompute deadlines for a guild after its kick threshold changed"""
+        offset = kick_after_minutes * 60
+        for member_id, join_timestamp in join_times.items():
+            self.schedule(guild_id, member_id, join_timestamp + offset)
+    
+    def next_deadline(self):
+        """Return the earliest live deadline, or None if nothing is scheduled"""
+        heap = self._heap
+        while heap:
+            deadline, guild_id, member_id = heap[0]
+            if self._deadlines.get((guild_id, member_id)) == deadline:
+                return deadline
+            heapq.heappop(heap)
+        return None
+    
+    def pop_due(self, now=None):
+        """Remove and return [(guild_id, member_id, deadline)] for entries due at `now`"""
+        if now is None:
+            now = time.time()
+        
+        due = []
+        heap = self._heap
+        deadlines = self._deadlines
+        while heap and heap[0][0] <= now:
+            deadline, guild_id, member_id = heapq.heappop(heap)
+            key = (guild_id, member_id)
+            if deadlines.get(key) == deadline:
+                del deadlines[key]
+                due.append((guild_id, member_id, deadline))
+        return due
+    
+    async def wait_until_due(self, max_wait=None):
+        """
+        Sleep until the earliest deadline is reached
+        
+        An earlier deadline scheduled meanwhile shortens the sleep. Gives up
+        after `max_wait` seconds if given.
+        """
+        if self._wakeup is None:
+            self._wakeup = asyncio.Event()
+        
+        while True:
+            deadline = self.next_deadline()
+            now = time.time()
+            if deadline is not None and deadline <= now:
+                return
+            
+            timeout = None if deadline is None else deadline - now
+            if max_wait is not None:
+                timeout = max_wait if timeout is None else min(timeout, max_wait)
+            
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                return
+    
+    def _maybe_compact(self):
+        """Drop stale heap nodes once they outnumber the live entries"""
+        if len(self._heap) > 64 and len(self._heap) > 2 * len(self._deadlines):
+            self._heap = [
+                (deadline, guild_id, member_id)
+                for (guild_id, member_id), deadline in self._deadlines.items()
+            ]
+            heapq.heapify(self._heap)
@@ -0,0 +1,150 @@
+"""
+Paginated /status rendering with a short-lived page cache
+"""
+import time
+import discord
+from src.config import COLOR_WARNING, CHECK_INTERVAL_MINUTES, STATUS_PAGE_SIZE, STATUS_CACHE_SECONDS, STATUS_VIEW_TIMEOUT_SECONDS
+from src.storage import GuildMemberTable
+from .permissions import has_permission, get_permission_error_message
+
+
+class StatusPageCache:
+    """
+    Rendered /status pages per (guild, page)
+    
+    Pages are read from the guild's time-ordered member index, so the
+    members kicked soonest come first and building a page only touches
+    its own entries. A cached page is reused until it expires or the
+    guild's tracked members or config change.
+    """
+    
+    def __init__(self, ttl=STATUS_CACHE_SECONDS, page_size=STATUS_PAGE_SIZE):
+        self.ttl = ttl
+        self.page_size = page_size
+        self._pages = {}  # {(guild_id, page): (expires_at, table, version, config, embed)}
+    
+    def page_count(self, table):
+        return max(1, -(-len(table) // self.page_size))
+    
+    async def get_page(self, bot, guild, page):
+        """Return (embed, page, page_count) for a page, clamped to the last one"""
+        table = bot.unverified_members.get(guild.id)
+        if table is None:
+            table = GuildMemberTable()
+        config = bot.get_guild_config(guild.id)
+        page_count = self.page_count(table)
+        page = min(max(page, 0), page_count - 1)
+        
+        now = time.time()
+        key = (guild.id, page)
+        cached = self._pages.get(key)
+        if (
+            cached is not None and cached[0] > now and cached[1] is table
+            and cached[2] == table.version and cached[3] is config
+        ):
+            return cached[4], page, page_count
+        
+        start = page * self.page_size
+        entries = table.items_by_time(start, start + self.page_size)
+        members = await bot.member_resolver.resolve(guild, [member_id for member_id, _ in entries])
+        embed = self._render(entries, members, config, page, page_count, len(table), now)
+        if len(self._pages) >= 1024:
+            self._prune(now)
+        self._pages[key] = (now + self.ttl, table, table.version, config, embed)
+        return embed, page, page_count
+    
+    def _prune(self, now):
+        for key in [key for key, cached in self._pages.items() if cached[0] <= now]:
+            del self._pages[key]
+    
+    def _render(self, entries, members, config, page, page_count, total, now):
+        embed = discord.Embed(
+            title="📊 Auto-Kick Status",
+            description=f"Members with `{config.role_name}` role, soonest kick first",
+            color=COLOR_WARNING
+        )
+        
+        offset = config.kick_after_minutes * 60
+        for member_id, join_timestamp in entries:
+            member = members.get(member_id)
+            name = member.name if member else f"ID {member_id}"
+            deadline = join_timestamp + offset
+            if deadline > now:
+                # Rendered by the client, stays correct while the page is cached
+                value = f"⏱️ <t:{int(deadline)}:R>"
+            else:
+                value = "⚠️ Overdue"
+            embed.add_field(name=name, value=value, inline=True)
+        
+        embed.set_footer(
+            text=f"Page {page + 1}/{page_count} | Total: {total} | Next check in ~{CHECK_INTERVAL_MINUTES} min"
+        )
+        return embed
+
+
+class StatusView(discord.ui.View):
+    """Previous/next buttons for a /status message"""
+    
+    def __init__(self, bot, guild, page, page_count):
+        super().__init__(timeout=STATUS_VIEW_TIMEOUT_SECONDS)
+        self.bot = bot
+        self.guild = guild
+        self.page = page
+        self.message = None
+        self._update_buttons(page_count)
+    
+    def _update_buttons(self, page_count):
+        self.previous_page.disabled = self.page <= 0
+        self.next_page.disabled = self.page >= page_count - 1
+        self.page_label.label = f"{self.page + 1}/{page_count}"
+    
+    async def interaction_check(self, interaction):
+        if has_permission(self.bot, interaction):
+            return True
+        await interaction.response.send_message(
+            get_permission_error_message(self.bot, interaction.guild.id),
+            ephemeral=True
+        )
+        return False
+    
+    async def _show(self, interaction, page):
+        embed, self.page, page_count = await self.bot.status_pages.get_page(self.bot, self.guild, page)
+        self._update_buttons(page_count)
+        await interaction.response.edit_message(embed=embed, view=self)
+    
+    @discord.ui.button(emoji="◀️", style=discord.ButtonStyle.secondary)
+    async def previous_page(self, interaction, button):
+        await self._show(interaction, self.page - 1)
+    
+    @discord.ui.button(label="1/1", style=discord.ButtonStyle.secondary, disabled=True)
+    async def page_label(self, interaction, button):
+        pass
+    
+    @discord.ui.button(emoji="▶️", style=discord.ButtonStyle.secondary)
+    async def next_page(self, interaction, button):
+        await self._show(interaction, self.page + 1)
+    
+    async def on_timeout(self):
+        if self.message is None:
+            return
+        for item in self.children:
+            item.disabled = True
+        try:
+            await self.message.edit(view=self)
+        except discord.HTTPException:
+            pass
+
+
+async def build_status_message(bot, guild):
+    """
+    Return (embed, view) for the first /status page, or (None, None) if
+    nothing is tracked. The view is None when everything fits on one page.
+    """
+    table = bot.unverified_members.get(guild.id)
+    if not table:
+        return None, None
+    
+    embed, page, page_count = await bot.status_pages.get_page(bot, guild, 0)
+    if page_count == 1:
+        return embed, None
+    return embed, StatusView(bot, guild, page, page_count)
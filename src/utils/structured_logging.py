@@ -0,0 +1,111 @@
+"""
+Structured, queue-based logging setup
+"""
+import atexit
+import json
+import logging
+import queue
+import sys
+from logging.handlers import QueueHandler, QueueListener
+from src.config import LOG_LEVEL, LOG_FORMAT, LOG_MODULE_LEVELS
+
+
+TEXT_FORMAT = '%(asctime)s %(levelname)-7s %(name)s: %(message)s'
+
+# Attributes every LogRecord has, anything else came in through extra={...}
+_RECORD_ATTRS = frozenset(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime', 'taskName'}
+
+_listener = None
+
+
+class JsonLineFormatter(logging.Formatter):
+    """Formats a record as one JSON object per line, extra fields included"""
+    
+    def format(self, record):
+        entry = {
+            'ts': round(record.created, 3),
+            'level': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage()
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS:
+                entry[key] = value
+        
+        if record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry['exc'] = record.exc_text
+        return json.dumps(entry, default=str, ensure_ascii=False, separators=(',', ':'))
+
+
+class DeferredQueueHandler(QueueHandler):
+    """
+    QueueHandler that leaves formatting to the listener thread
+    
+    The stock handler copies and fully formats every record before
+    enqueueing it. Here the caller only merges the message arguments and
+    renders a traceback (which can't wait), JSON encoding and the stream
+    write happen on the listener thread. The root logger has no other
+    handler, so the record is updated in place.
+    """
+    
+    def __init__(self, queue, fields=None):
+        super().__init__(queue)
+        self.fields = fields  # Added to every record, e.g. {'worker': 2}
+    
+    def prepare(self, record):
+        record.msg = record.getMessage()
+        record.args = None
+        if self.fields:
+            record.__dict__.update(self.fields)
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def setup_logging(level=LOG_LEVEL, log_format=LOG_FORMAT, module_levels=LOG_MODULE_LEVELS, stream=None, fields=None):
+    """
+    Route all logging through a queue drained by a background thread
+    
+    Args:
+        level: Root log level
+        log_format: 'json' (one record per line) or 'text'
+        module_levels: {logger_name: level} overrides, e.g. {'src.tasks': 'DEBUG'}
+        stream: Output stream (stdout by default)
+        fields: Extra fields added to every record
+    
+    Returns:
+        The running QueueListener
+    """
+    global _listener
+    shutdown_logging()
+    
+    output = logging.StreamHandler(stream or sys.stdout)
+    output.setFormatter(JsonLineFormatter() if log_format == 'json' else logging.Formatter(TEXT_FORMAT))
+    
+    log_queue = queue.SimpleQueue()
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(DeferredQueueHandler(log_queue, fields))
+    root.setLevel(level)
+    
+    for name, module_level in module_levels.items():
+        logging.getLogger(name).setLevel(module_level)
+    
+    _listener = QueueListener(log_queue, output, respect_handler_level=True)
+    _listener.start()
+    return _listener
+
+
+def shutdown_logging():
+    """Stop the listener thread after it wrote every queued record"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+atexit.register(shutdown_logging)